@@ -0,0 +1,140 @@
+"""
+Startup Benchmark
+Measures scheduler.py startup per command with `python -X importtime`
+
+Usage:
+    python benchmarks/bench_startup.py [--top 15] [--repeat 3] [--output FILE]
+
+For each command it reports the wall time and the slowest top-level
+imports (beyond those of a bare interpreter), and checks that the command does not import dependencies it has
+no use for (e.g. --help must not load pptx, lxml, requests or yaml).
+Exits with status 1 if any command imports a forbidden module.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SCHEDULER = os.path.join(ROOT_DIR, 'scripts', 'scheduler.py')
+
+# Command -> (arguments, top-level modules it must not import)
+CASES = {
+    'help': (['--help'], ['pptx', 'lxml', 'requests', 'yaml']),
+    'validate': (['validate'], ['pptx', 'lxml', 'requests']),
+    # The sample data source needs no HTTP client
+    'fetch': (['fetch', '-o', '{tmp}/data.json'], ['pptx', 'lxml', 'requests']),
+}
+
+
+def run_case(args: List[str], config_path: Optional[str], tmp: str) -> Dict[str, Any]:
+    """Run scheduler.py once under -X importtime and parse the report (no config: bare interpreter)"""
+    if config_path is None:
+        command = [sys.executable, '-X', 'importtime', '-c', 'pass']
+    else:
+        argv = [a.format(tmp=tmp) for a in args]
+        command = [sys.executable, '-X', 'importtime', SCHEDULER, '--config', config_path] + argv
+    started = time.perf_counter()
+    proc = subprocess.run(command, cwd=tmp, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        package = fields[2].rstrip()
+        imports.append({
+            'module': package.strip(),
+            'depth': (len(package) - len(package.lstrip())) // 2,
+            'self_ms': int(fields[0]) / 1000,
+            'cumulative_ms': int(fields[1]) / 1000,
+        })
+    return {'seconds': seconds, 'returncode': proc.returncode, 'imports': imports}
+
+
+def measure(name: str, repeat: int, config_path: str, tmp: str,
+            baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Startup figures for one command, excluding what the bare interpreter imports"""
+    args, forbidden = CASES[name]
+    runs = [run_case(args, config_path, tmp) for _ in range(repeat)]
+    interpreter = {i['module'] for i in baseline['imports']}
+    imports = [i for i in runs[-1]['imports'] if i['module'] not in interpreter]
+    loaded = {i['module'].split('.')[0] for i in imports}
+    top_level = sorted((i for i in imports if i['depth'] == 1),
+                       key=lambda i: i['cumulative_ms'], reverse=True)
+    return {
+        'args': args,
+        'seconds': round(statistics.median(r['seconds'] for r in runs), 4),
+        'import_ms': round(sum(i['self_ms'] for i in imports), 1),
+        'modules': len(imports),
+        'top_imports': [{'module': i['module'], 'cumulative_ms': round(i['cumulative_ms'], 1)}
+                        for i in top_level],
+        'forbidden': sorted(m for m in forbidden if m in loaded),
+    }
+
+
+def write_config(tmp: str) -> str:
+    """Minimal config using sample data, so no network or template is needed"""
+    config = {
+        'data_source': {'type': 'sample'},
+        'output': {'directory': os.path.join(tmp, 'reports')},
+        'template': {'path': os.path.join(tmp, 'missing_template.pptx')},
+        'logging': {'file': os.path.join(tmp, 'logs', 'startup.log')},
+    }
+    path = os.path.join(tmp, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)  # JSON is valid YAML
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="scheduler.py startup benchmark")
+    parser.add_argument('--commands', default=','.join(CASES),
+                        help="Comma-separated commands (default: all)")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports shown per command")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per command (median is kept)")
+    parser.add_argument('--output', help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    names = [c.strip() for c in args.commands.split(',') if c.strip()]
+    unknown = [c for c in names if c not in CASES]
+    if unknown:
+        parser.error(f"Unknown command(s): {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='vlines_startup_') as tmp:
+        config_path = write_config(tmp)
+        # Site packages may import modules at interpreter start (.pth files); not ours to fix
+        baseline = run_case([], None, tmp)
+        print(f"Bare interpreter: {baseline['seconds'] * 1000:.0f} ms wall")
+        for name in names:
+            results[name] = result = measure(name, max(1, args.repeat), config_path, tmp, baseline)
+            print(f"\n{name}: {result['seconds'] * 1000:.0f} ms wall, "
+                  f"{result['import_ms']:.0f} ms importing {result['modules']} modules")
+            for entry in result['top_imports'][:args.top]:
+                print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    failures = [(name, r['forbidden']) for name, r in results.items() if r['forbidden']]
+    for name, modules in failures:
+        print(f"✗ {name} imports {', '.join(modules)}")
+    if not failures:
+        print("\n✓ No command imports more than it needs")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
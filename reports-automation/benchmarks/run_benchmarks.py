@@ -0,0 +1,415 @@
+"""
+Benchmark Suite
+Times the fetch -> generate -> save pipeline on synthetic data and templates
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scenarios small,medium,large] [--repeat 3]
+                                        [--output benchmarks/results.json]
+    python benchmarks/run_benchmarks.py --compare BASELINE.json CURRENT.json [--threshold 0.10]
+
+Each scenario runs in its own process, so its peak RSS is not inflated
+by earlier scenarios; each stage also records the memory it added on top
+of the RSS at its start (rss_delta_mb). Results are written as JSON; compare mode
+reports every metric that got worse than the threshold and exits with
+status 1 if there is any.
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# slides: template size; ship_rows / weeks / customers: data size
+SCENARIOS = {
+    'small': {'slides': 10, 'ship_rows': 10, 'weeks': 12, 'customers': 10},
+    'medium': {'slides': 100, 'ship_rows': 100, 'weeks': 52, 'customers': 100},
+    'large': {'slides': 500, 'ship_rows': 1000, 'weeks': 104, 'customers': 1000},
+}
+
+SHIP_COLUMNS = ['ship_name', 'voyage', 'route', 'position', 'speed_sb_nb', 'weather', 'status']
+
+# Changes smaller than these are treated as noise in compare mode
+NOISE_FLOOR = {'seconds': 0.01, 'rss_delta_mb': 5.0, 'peak_rss_mb': 5.0, 'output_bytes': 1024}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+def synthetic_data(ship_rows: int, weeks: int, customers: int) -> Dict[str, Any]:
+    """
+    Sample report data scaled to the given sizes
+
+    Starts from DataFetcher._get_sample_data() and repeats its ship
+    schedule, weekly performance series and customer lists, so every
+    section keeps its real shape.
+    """
+    from data_fetcher import DataFetcher
+
+    data = DataFetcher({'data_source': {'type': 'sample'}})._get_sample_data()
+
+    ops = data['ops']
+    base_ships = ops['ship_schedule']
+    ops['ship_schedule'] = []
+    for i in range(ship_rows):
+        row = dict(base_ships[i % len(base_ships)])
+        row['ship_name'] = f"{row['ship_name']} {i + 1}"
+        row['voyage'] = f"25LG{i:04d} S/N"
+        ops['ship_schedule'].append(row)
+
+    profomar = ops['performance']['profomar_vs_actual']
+    ship_count = min(ship_rows, 50)
+    profomar['ships'] = [f"SHIP{i:03d}" for i in range(ship_count)]
+    profomar['profomar_days'] = [_cycle(profomar['profomar_days'], i) for i in range(ship_count)]
+    profomar['actual_days'] = [_cycle(profomar['actual_days'], i) for i in range(ship_count)]
+
+    performance = data['kinh_doanh']['domestic_performance']
+    for key in ('allocated', 'actual', 'percentage'):
+        performance[key] = [_cycle(performance[key], i) for i in range(weeks)]
+    performance['weeks'] = [f"W{i + 1:03d}" for i in range(weeks)]
+
+    data['kinh_doanh']['top_customers'] = {
+        route: [f"{names[i % len(names)]} {i + 1}" for i in range(customers)]
+        for route, names in data['kinh_doanh']['top_customers'].items()
+    }
+
+    fuel = data['tong_quan_tau']['fuel_consumption']
+    for key in list(fuel):
+        fuel[key] = [_cycle(fuel[key], i) for i in range(ship_count)]
+
+    return data
+
+
+def synthetic_template(path: str, slides: int, placeholders: List[str]):
+    """
+    Template with the given number of slides
+
+    Slide 2 holds the ship schedule table and slide 3 the domestic
+    performance chart; every slide carries a title and a text box using
+    the configured placeholders, so placeholder filling scales with the
+    slide count.
+    """
+    from pptx import Presentation
+    from pptx.chart.data import CategoryChartData
+    from pptx.enum.chart import XL_CHART_TYPE
+    from pptx.util import Inches
+
+    prs = Presentation()
+    layout = prs.slide_layouts[5]
+    for i in range(slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {i + 1} - {{{{REPORT_WEEK}}}}"
+
+        if i == 1:
+            frame = slide.shapes.add_table(2, len(SHIP_COLUMNS), Inches(0.3), Inches(1.5),
+                                           Inches(9), Inches(1))
+            frame.name = 'ShipScheduleTable'
+            for c, column in enumerate(SHIP_COLUMNS):
+                frame.table.cell(0, c).text = column
+                frame.table.cell(1, c).text = '-'
+            continue
+        if i == 2:
+            seed = CategoryChartData()
+            seed.categories = ['-']
+            for name in ('Allocated', 'Actual'):
+                seed.add_series(name, [0])
+            frame = slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(0.5), Inches(1.5),
+                                           Inches(9), Inches(5), seed)
+            frame.name = 'DomesticPerformanceChart'
+            continue
+
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(4))
+        text_frame = box.text_frame
+        text_frame.text = "Static commentary that stays as designed in the template."
+        for token in placeholders[i % len(placeholders):] + placeholders[:i % len(placeholders)]:
+            text_frame.add_paragraph().text = f"Value: {token}"
+
+    prs.save(path)
+
+
+def _cycle(values: List[Any], i: int) -> Any:
+    return values[i % len(values)]
+
+
+# ---------------------------------------------------------------------------
+# Running a scenario
+# ---------------------------------------------------------------------------
+
+def run_scenario(name: str, repeat: int) -> Dict[str, Any]:
+    """Run one scenario in this process and return its stage metrics"""
+    import yaml
+    from data_fetcher import DataFetcher
+    from generator import WeeklyReportGenerator
+
+    params = SCENARIOS[name]
+    workdir = tempfile.mkdtemp(prefix=f"vlines_bench_{name}_")
+    try:
+        with open(os.path.join(ROOT_DIR, 'config', 'config.yaml'), 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+
+        data_path = os.path.join(workdir, 'weekly_data.json')
+        template_path = os.path.join(workdir, 'template.pptx')
+        with open(data_path, 'w', encoding='utf-8') as f:
+            json.dump(synthetic_data(params['ship_rows'], params['weeks'], params['customers']),
+                      f, ensure_ascii=False)
+        synthetic_template(template_path, params['slides'],
+                           list(config['template']['placeholders'].values()))
+
+        config['data_source'] = {'type': 'json', 'json_path': data_path, 'json_loader': 'stream'}
+        config['output'] = {'directory': os.path.join(workdir, 'reports'),
+                            'filename_pattern': 'bench_{week}.pptx', 'incremental': False}
+        config['template']['path'] = template_path
+        config['template']['charts'] = {
+            'domestic_performance': {
+                'shape': 'DomesticPerformanceChart',
+                'data': 'kinh_doanh.domestic_performance',
+                'categories': 'weeks',
+                'series': {'Allocated': 'allocated', 'Actual': 'actual'},
+            }
+        }
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            fetch_times = []
+            with _rss_window() as memory:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    data = DataFetcher(config).fetch_data()
+                    fetch_times.append(time.perf_counter() - started)
+            stages['fetch'] = _stage(fetch_times, input_bytes=os.path.getsize(data_path), **memory)
+
+            generator = WeeklyReportGenerator(config)
+            generator.template_cache.clear()
+
+            # First render parses the template; later ones use the cache
+            with _rss_window() as memory:
+                started = time.perf_counter()
+                output_path = generator.generate_report(copy.deepcopy(data))
+                cold = time.perf_counter() - started
+            stages['generate_cold'] = _stage([cold], output_bytes=os.path.getsize(output_path), **memory)
+            stages['template_parse'] = _stage([generator.last_render_summary['timings']['load']])
+
+            totals: List[float] = []
+            per_stage: Dict[str, List[float]] = {'load': [], 'fill': [], 'save': []}
+            with _rss_window() as memory:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    output_path = generator.generate_report(copy.deepcopy(data))
+                    totals.append(time.perf_counter() - started)
+                    for stage, seconds in generator.last_render_summary['timings'].items():
+                        per_stage.setdefault(stage, []).append(seconds)
+
+        for stage, seconds in per_stage.items():
+            stages[stage] = _stage(seconds)
+        stages['save']['output_bytes'] = os.path.getsize(output_path)
+        stages['generate'] = _stage(totals, output_bytes=os.path.getsize(output_path), **memory)
+
+        result = {'params': params, 'repeat': repeat, 'stages': stages}
+        peak = _lifetime_peak_rss_mb()
+        if peak is not None:
+            result['peak_rss_mb'] = peak
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _stage(seconds: List[float], **extra) -> Dict[str, Any]:
+    """Median wall time plus any extra metrics"""
+    result: Dict[str, Any] = {'seconds': round(statistics.median(seconds), 4)}
+    result.update(extra)
+    return result
+
+
+@contextlib.contextmanager
+def _rss_window():
+    """
+    Memory a block adds on top of the RSS at its start, as rss_delta_mb
+
+    On Linux the peak (VmHWM) is reset when the block starts, so this is
+    the block's own peak. Elsewhere only the lifetime peak is available,
+    and the figure is how much the block raised it.
+    """
+    window: Dict[str, Any] = {}
+    if _reset_peak_rss():
+        start = _proc_status_mb('VmRSS')
+    else:
+        start = _lifetime_peak_rss_mb()
+    yield window
+    peak = _proc_status_mb('VmHWM') or _lifetime_peak_rss_mb()
+    if start is not None and peak is not None:
+        window['rss_delta_mb'] = round(max(0.0, peak - start), 1)
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the process's peak RSS to its current RSS (Linux only)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _lifetime_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def run_suite(scenarios: List[str], repeat: int) -> Dict[str, Any]:
+    """Run each scenario in a fresh interpreter and collect the results"""
+    results: Dict[str, Any] = {'meta': _meta(repeat), 'scenarios': {}}
+    for name in scenarios:
+        print(f"Running scenario '{name}' {SCENARIOS[name]}...")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', name, '--repeat', str(repeat)],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(proc.stderr)
+            raise RuntimeError(f"Scenario '{name}' failed")
+        results['scenarios'][name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        _print_scenario(name, results['scenarios'][name])
+    return results
+
+
+def _meta(repeat: int) -> Dict[str, Any]:
+    try:
+        import pptx
+        pptx_version = pptx.__version__
+    except ImportError:
+        pptx_version = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'python_pptx': pptx_version,
+        'commit': commit,
+        'repeat': repeat,
+    }
+
+
+def _print_scenario(name: str, result: Dict[str, Any]):
+    for stage, metrics in result['stages'].items():
+        extra = ''
+        if 'output_bytes' in metrics:
+            extra = f"  {metrics['output_bytes'] / 1024:.0f} KB"
+        rss = f"+{metrics['rss_delta_mb']:.0f} MB" if 'rss_delta_mb' in metrics else '-'
+        print(f"  {name:<8} {stage:<15} {metrics['seconds'] * 1000:>9.1f}ms  rss {rss:>7}{extra}")
+    if 'peak_rss_mb' in result:
+        print(f"  {name:<8} {'peak rss':<15} {result['peak_rss_mb']:>9.0f} MB")
+
+
+# ---------------------------------------------------------------------------
+# Compare mode
+# ---------------------------------------------------------------------------
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Metrics that regressed by more than threshold (a fraction) between runs
+
+    Returns:
+        Human-readable regression lines (empty if none)
+    """
+    regressions = []
+    for scenario, result in current.get('scenarios', {}).items():
+        base_result = baseline.get('scenarios', {}).get(scenario, {})
+        base_stages = dict(base_result.get('stages', {}), process=base_result)
+        for stage, metrics in dict(result.get('stages', {}), process=result).items():
+            for metric, floor in NOISE_FLOOR.items():
+                old = base_stages.get(stage, {}).get(metric)
+                new = metrics.get(metric)
+                if old is None or new is None or new - old <= floor:
+                    continue
+                if old == 0 or (new - old) / old > threshold:
+                    change = f"+{(new - old) / old:.0%}" if old else 'new'
+                    regressions.append(f"{scenario}/{stage} {metric}: {old} -> {new} ({change})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="VLines report pipeline benchmarks")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="Comma-separated scenarios (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage (median is kept)")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two results files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative increase counted as a regression (default 0.10)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker, max(1, args.repeat))))
+        return 0
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  ✗ {line}")
+            return 1
+        print(f"No regressions over {args.threshold:.0%}")
+        return 0
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    results = run_suite(scenarios, max(1, args.repeat))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
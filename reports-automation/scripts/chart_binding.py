@@ -0,0 +1,204 @@
+"""
+Chart Binding
+Replaces the data of native PowerPoint charts in the template with report series
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+from pptx.chart.data import CategoryChartData
+
+
+class ChartBinding:
+    """
+    Writes series from the report data into a native chart
+
+    The chart keeps everything designed in the template (type, colors,
+    axes, labels, combo bar/line plots); only its categories and series
+    values are replaced, through python-pptx's replace_data, which
+    rewrites the chart XML and its embedded workbook. Series are assigned
+    to the chart's series in order, so a combo chart's line plot takes the
+    series listed after the bar plot's.
+    """
+
+    def __init__(self, shape_name: str, data_path: str, series: Dict[str, str],
+                 categories: Any = None, number_format: Optional[str] = None):
+        self.shape_name = shape_name
+        self.data_path = data_path
+        self.series = series
+        self.categories = categories
+        self.number_format = number_format
+
+    @classmethod
+    def from_config(cls, chart_config: Dict[str, Any]) -> 'ChartBinding':
+        return cls(
+            shape_name=chart_config['shape'],
+            data_path=chart_config['data'],
+            series=dict(chart_config['series']),
+            categories=chart_config.get('categories'),
+            number_format=chart_config.get('number_format')
+        )
+
+    @property
+    def section(self) -> str:
+        """Report section the chart data comes from"""
+        return self.data_path.split('.')[0]
+
+    def fill(self, prs, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace the bound chart's data
+
+        Args:
+            prs: Presentation containing a chart shape named shape_name
+            data: Full report data (dict or report_model.ReportData)
+
+        Returns:
+            Dictionary with 'categories' and 'series' counts, or 'error'
+        """
+        found = self._find_chart(prs)
+        if found is None:
+            return {'categories': 0, 'series': 0, 'error': f"chart '{self.shape_name}' not found"}
+        _, frame = found
+
+        source = _lookup(data, self.data_path)
+        if not hasattr(source, 'get'):
+            return {'categories': 0, 'series': 0, 'error': f"no data at '{self.data_path}'"}
+
+        chart_data = self.chart_data(source)
+        frame.chart.replace_data(chart_data)
+        return {'categories': len(chart_data.categories), 'series': len(self.series)}
+
+    def chart_data(self, source: Dict[str, Any]) -> CategoryChartData:
+        """
+        Build the ChartData for one data block
+
+        categories may be a key in the block (e.g. 'weeks'), a literal list
+        of labels, or omitted for 1..n.
+        """
+        # Model series are float arrays with NaN for gaps; charts want None
+        values = {name: [None if isinstance(v, float) and math.isnan(v) else v for v in source.get(key) or []]
+                  for name, key in self.series.items()}
+        length = max((len(v) for v in values.values()), default=0)
+
+        if isinstance(self.categories, str):
+            categories = list(source.get(self.categories) or [])
+        elif self.categories:
+            categories = list(self.categories)
+        else:
+            categories = [str(i + 1) for i in range(length)]
+
+        chart_data = CategoryChartData(number_format=self.number_format) if self.number_format \
+            else CategoryChartData()
+        chart_data.categories = categories
+        for name, series_values in values.items():
+            # Pad short series so every series spans all categories
+            padded = series_values[:len(categories)]
+            padded += [None] * (len(categories) - len(padded))
+            chart_data.add_series(name, padded)
+        return chart_data
+
+    def slide_index(self, prs) -> Optional[int]:
+        """0-based index of the slide holding the bound chart, or None"""
+        found = self._find_chart(prs)
+        if found is None:
+            return None
+        slide, _ = found
+        return prs.slides.index(slide)
+
+    def _find_chart(self, prs) -> Optional[Tuple[Any, Any]]:
+        for slide in prs.slides:
+            for shape in slide.shapes:
+                if shape.name == self.shape_name and getattr(shape, 'has_chart', False):
+                    return slide, shape
+        return None
+
+
+def chart_bindings(charts_config: Optional[Dict[str, Any]]) -> List[ChartBinding]:
+    """Bindings for every chart under template.charts"""
+    return [ChartBinding.from_config(cfg) for cfg in (charts_config or {}).values() if cfg]
+
+
+def _lookup(data: Dict[str, Any], path: str) -> Any:
+    value: Any = data
+    for key in path.split('.'):
+        if not hasattr(value, 'get'):
+            return None
+        value = value.get(key)
+    return value
+
+
+if __name__ == "__main__":
+    # Compare native chart data replacement with rendering a matplotlib image
+    import time
+    from io import BytesIO
+    from pptx import Presentation
+    from pptx.chart.data import CategoryChartData as _ChartData
+    from pptx.enum.chart import XL_CHART_TYPE
+    from pptx.util import Inches
+
+    weeks = [f"W{i:02d}" for i in range(1, 13)]
+    block = {
+        'weeks': weeks,
+        'allocated': [460, 620] * 6,
+        'actual': [520, 662, 462, 560, 460, 620, 460, 620, 420, 600, 720, 680],
+    }
+    binding = ChartBinding('DomesticPerformanceChart', 'kinh_doanh.domestic_performance',
+                           {'Allocated': 'allocated', 'Actual': 'actual'}, categories='weeks')
+    runs = 20
+
+    def _template():
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        seed = _ChartData()
+        seed.categories = ['-']
+        seed.add_series('Allocated', [0])
+        seed.add_series('Actual', [0])
+        frame = slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(0.5), Inches(1.5),
+                                       Inches(9), Inches(5), seed)
+        frame.name = 'DomesticPerformanceChart'
+        return prs
+
+    def _saved_size(prs) -> int:
+        buffer = BytesIO()
+        prs.save(buffer)
+        return len(buffer.getvalue())
+
+    native = 0.0
+    for _ in range(runs):
+        prs = _template()
+        started = time.perf_counter()
+        binding.fill(prs, {'kinh_doanh': {'domestic_performance': block}})
+        native += (time.perf_counter() - started) / runs
+    native_size = _saved_size(prs)
+
+    started = time.perf_counter()
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        plt = None
+    import_seconds = time.perf_counter() - started
+
+    print(f"Native chart (replace_data): {native * 1000:.1f}ms per chart, deck {native_size / 1024:.0f} KB")
+    if plt is None:
+        print("matplotlib not installed; image path not measured")
+    else:
+        started = time.perf_counter()
+        for _ in range(runs):
+            prs = Presentation()
+            slide = prs.slides.add_slide(prs.slide_layouts[5])
+            fig, ax = plt.subplots(figsize=(9, 5), dpi=150)
+            positions = range(len(weeks))
+            ax.bar([p - 0.2 for p in positions], block['allocated'], width=0.4, label='Allocated')
+            ax.bar([p + 0.2 for p in positions], block['actual'], width=0.4, label='Actual')
+            ax.set_xticks(list(positions), weeks)
+            ax.legend()
+            image = BytesIO()
+            fig.savefig(image, format='png')
+            plt.close(fig)
+            image.seek(0)
+            slide.shapes.add_picture(image, Inches(0.5), Inches(1.5), Inches(9), Inches(5))
+        image_time = (time.perf_counter() - started) / runs
+        print(f"matplotlib image:            {image_time * 1000:.1f}ms per chart, deck "
+              f"{_saved_size(prs) / 1024:.0f} KB (+{import_seconds * 1000:.0f}ms import)")
@@ -0,0 +1,329 @@
+"""
+Cron Scheduler
+Runs cron-style jobs on a worker pool, sleeping until the next due time
+"""
+
+import heapq
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
+
+from instrumentation import emit, log_error
+
+
+_ALIASES = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+_DAYS = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+# Give up looking for a next run after this many years (e.g. "0 0 30 2 *")
+_SEARCH_YEARS = 5
+
+
+class CronExpression:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week
+
+    Fields accept *, lists (1,15), ranges (1-5), steps (*/15, 8-18/2) and
+    month/day names (jan, mon). Day-of-week 0 and 7 are Sunday. As in
+    cron, when both day fields are restricted a day matching either runs.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = _ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, _MONTHS, 1)
+        weekdays = _parse_field(fields[4], 0, 7, _DAYS, 0)
+        self.weekdays = {d % 7 for d in weekdays}
+        # Unrestricted by value, so '*/1' and '0-6' count as '*'
+        self._any_day = self.days == set(range(1, 32))
+        self._any_weekday = self.weekdays == set(range(7))
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment"""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t.year + _SEARCH_YEARS
+
+        while t.year <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+    def runs_between(self, start: datetime, end: datetime, limit: int = 1000) -> List[datetime]:
+        """Due times in (start, end], at most limit of them (the latest ones)"""
+        runs: List[datetime] = []
+        t = self.next_after(start)
+        while t <= end:
+            runs.append(t)
+            if len(runs) > limit:
+                runs.pop(0)
+            t = self.next_after(t)
+        return runs
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        # Python: Monday=0; cron: Sunday=0
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[List[str]] = None,
+                 name_offset: int = 0) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.lower().split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: '{field}'")
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = _value(start_text, names, name_offset), _value(end_text, names, name_offset)
+        else:
+            start = _value(part, names, name_offset)
+            end = high if step > 1 else start
+
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f"Cron field out of range {low}-{high}: '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _value(text: str, names: Optional[List[str]], offset: int) -> int:
+    if names and text[:3] in names:
+        return names.index(text[:3]) + offset
+    return int(text)
+
+
+class Job:
+    """
+    A scheduled job
+
+    Attributes:
+        name: Unique job name (key in the state file)
+        cron: When the job is due
+        action: Callable run on the worker pool; a False return or an
+            exception marks the run as failed
+        max_concurrent: Runs of this job allowed at the same time; a due
+            run beyond the limit is skipped rather than queued
+        catch_up: Runs missed while the scheduler was down: 'latest' runs
+            the most recent one, 'all' runs each (up to max_catch_up),
+            'none' skips them
+    """
+
+    CATCH_UP = ('latest', 'all', 'none')
+
+    def __init__(self, name: str, cron: str, action: Callable[[], Any], max_concurrent: int = 1,
+                 catch_up: str = 'latest', max_catch_up: int = 10):
+        if catch_up not in self.CATCH_UP:
+            raise ValueError(f"Job {name}: catch_up must be one of {', '.join(self.CATCH_UP)}")
+        self.name = name
+        self.cron = CronExpression(cron)
+        self.action = action
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.catch_up = catch_up
+        self.max_catch_up = max(1, int(max_catch_up))
+
+
+class CronScheduler:
+    """
+    Runs jobs when due on a bounded thread pool
+
+    The loop waits on an event with a timeout equal to the time left until
+    the earliest due job, so it wakes exactly when needed (or when stopped)
+    instead of polling. The scheduled time of each run is written to the
+    state file before the run starts, so a restart neither repeats a run
+    nor treats it as missed.
+    """
+
+    def __init__(self, jobs: List[Job], state_path: str, workers: int = 2,
+                 clock: Callable[[], datetime] = datetime.now):
+        names = [job.name for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError("Job names must be unique")
+        self.jobs = {job.name: job for job in jobs}
+        self.state_path = state_path
+        self.workers = max(1, int(workers))
+        self.clock = clock
+
+        self._state: Dict[str, Dict[str, Any]] = self._load_state()
+        self._running: Dict[str, int] = {name: 0 for name in self.jobs}
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._queue: List[Tuple[datetime, str]] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Set[Any] = set()
+
+    def next_runs(self) -> Dict[str, datetime]:
+        """Next due time of each job"""
+        return {name: due for due, name in sorted(self._queue)}
+
+    def run_forever(self):
+        """Run due jobs until stop() is called (or KeyboardInterrupt)"""
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        try:
+            self._start()
+            while not self._stopping:
+                due, name = self._queue[0]
+                delay = (due - self.clock()).total_seconds()
+                if delay > 0:
+                    # Wake early on stop(); also re-check at least hourly in case
+                    # the wall clock jumps (suspend, DST, NTP adjustments)
+                    self._wake.wait(min(delay, 3600))
+                    self._wake.clear()
+                    continue
+
+                heapq.heappop(self._queue)
+                self._dispatch(self.jobs[name], [due])
+                heapq.heappush(self._queue, (self.jobs[name].cron.next_after(max(due, self.clock())), name))
+        finally:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def stop(self):
+        """Stop the loop; running jobs are allowed to finish"""
+        self._stopping = True
+        self._wake.set()
+
+    def _start(self):
+        """Queue every job and dispatch runs missed since the last recorded one"""
+        now = self.clock()
+        self._queue = []
+        for name, job in self.jobs.items():
+            last = self._state.get(name, {}).get('last_scheduled')
+            if last:
+                missed = job.cron.runs_between(datetime.fromisoformat(last), now, job.max_catch_up)
+                if missed and job.catch_up != 'none':
+                    runs = missed if job.catch_up == 'all' else missed[-1:]
+                    emit('job_catch_up', job=name, missed=len(missed), running=len(runs))
+                    print(f"Job {name}: {len(missed)} missed run(s), catching up {len(runs)}")
+                    self._dispatch(job, runs)
+                elif missed:
+                    self._record(name, last_scheduled=missed[-1].isoformat())
+            else:
+                # First start: nothing is missed, but remember where we began
+                self._record(name, last_scheduled=now.replace(second=0, microsecond=0).isoformat())
+            heapq.heappush(self._queue, (job.cron.next_after(now), name))
+
+    def _dispatch(self, job: Job, dues: List[datetime]):
+        """Run a job for one or more due times (in order) on one pool slot"""
+        with self._lock:
+            if self._running[job.name] >= job.max_concurrent:
+                emit('job_skipped', job=job.name, scheduled=dues[-1].isoformat(),
+                     reason='max_concurrent reached')
+                print(f"Job {job.name}: skipped run due {dues[-1]:%Y-%m-%d %H:%M} "
+                      f"({self._running[job.name]} still running)")
+                self._record(job.name, last_scheduled=dues[-1].isoformat(), last_status='skipped')
+                return
+            self._running[job.name] += 1
+
+        # Record the first run before submitting, so a restart cannot repeat it
+        self._record(job.name, last_scheduled=dues[0].isoformat(), last_status='running',
+                     last_started=self.clock().isoformat(timespec='seconds'))
+        future = self._pool.submit(self._run, job, dues)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def _run(self, job: Job, dues: List[datetime]):
+        try:
+            for i, due in enumerate(dues):
+                if i:
+                    if self._stopping:
+                        break
+                    self._record(job.name, last_scheduled=due.isoformat(), last_status='running',
+                                 last_started=self.clock().isoformat(timespec='seconds'))
+                self._run_once(job, due)
+        finally:
+            with self._lock:
+                self._running[job.name] -= 1
+
+    def _run_once(self, job: Job, due: datetime):
+        emit('job_start', job=job.name, scheduled=due.isoformat())
+        status = 'success'
+        try:
+            if job.action() is False:
+                status = 'failed'
+        except Exception as e:
+            status = 'failed'
+            log_error(e, job=job.name)
+            print(f"Job {job.name} failed: {e}")
+        finally:
+            self._record(job.name, last_status=status,
+                         last_finished=self.clock().isoformat(timespec='seconds'))
+            emit('job_end', job=job.name, scheduled=due.isoformat(), status=status)
+
+    def _record(self, name: str, **fields):
+        with self._lock:
+            entry = self._state.setdefault(name, {})
+            # Never move last_scheduled backwards (a catch-up run may overlap a new one)
+            if 'last_scheduled' in fields and entry.get('last_scheduled', '') > fields['last_scheduled']:
+                fields.pop('last_scheduled')
+            entry.update(fields)
+            self._save_state()
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        for name, entry in state.items():
+            if entry.get('last_status') == 'running':
+                # The process stopped mid-run; the run is not repeated
+                entry['last_status'] = 'interrupted'
+        return state
+
+    def _save_state(self):
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -3,11 +3,32 @@ Data Fetcher Module
 Handles fetching data from various sources (API, JSON, Database)
 """
 
-import requests
 import json
-from typing import Dict, Any
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 
+from db_source import DatabaseSource
+from http_cache import HttpCache
+from json_stream import load_sections, measure_load
+from snapshot_store import SnapshotStore, open_store
+
+# requests is imported by the API code paths only, so JSON, database and
+# sample sources start without it
+if TYPE_CHECKING:
+    import requests
+
+
+# Report sections, in the order the slides present them
+REPORT_SECTIONS = ('tckt', 'ops', 'kinh_doanh', 'eqc', 'thuong_vu', 'tong_quan_tau')
+
+
+class DataFetchError(RuntimeError):
+    """The API or database source failed and no cached response could stand in"""
+
 
 class DataFetcher:
     """Fetches data for weekly reports from various sources"""
@@ -16,6 +37,12 @@ class DataFetcher:
         self.config = config
         self.data_source_type = config.get('data_source', {}).get('type', 'json')
         self.data_source_url = config.get('data_source', {}).get('url', '')
+        self.last_fetch_metrics: Dict[str, Any] = {}
+        self._session: Optional['requests.Session'] = None
+        self._session_lock = threading.Lock()
+        self._http_cache: Optional[HttpCache] = None
+        self._db_sources: Dict[str, DatabaseSource] = {}
+        self._snapshot_store: Optional[SnapshotStore] = None
 
     def fetch_data(self) -> Dict[str, Any]:
         """
@@ -24,47 +51,388 @@ class DataFetcher:
         Returns:
             Dictionary containing all report data
         """
-        if self.data_source_type == 'api':
-            return self._fetch_from_api()
+        self.last_fetch_metrics = {}
+        if self.data_source_type == 'multi' or self.config.get('data_source', {}).get('sections'):
+            data = self._fetch_from_sources()
+        elif self.data_source_type == 'api':
+            data = self._fetch_from_api()
         elif self.data_source_type == 'json':
-            return self._fetch_from_json()
+            data = self._fetch_from_json()
         elif self.data_source_type == 'database':
-            return self._fetch_from_database()
+            data = self._fetch_from_database()
+        elif self.data_source_type == 'snapshot':
+            return self._fetch_from_snapshot()
         else:
             return self._get_sample_data()
 
+        self._save_snapshot(data)
+        return data
+
+    def _fetch_from_snapshot(self) -> Dict[str, Any]:
+        """
+        Read a stored week from the snapshot store instead of the source
+
+        data_source.week selects the week (default: the latest stored one).
+        A missing week is an error rather than a sample-data fallback, since
+        snapshots are used for backfills. The data is marked with
+        metadata.from_snapshot.
+        """
+        store = self._get_snapshot_store(required=True)
+        week = self.config.get('data_source', {}).get('week') or store.latest_week()
+        data = store.load(week) if week else None
+        if data is None:
+            raise ValueError(f"No snapshot stored for week {week or '(none stored)'} in {store.path}")
+        # Tells the generator to date the output after the week rather than today
+        data['metadata']['from_snapshot'] = True
+        return data
+
+    def _save_snapshot(self, data: Dict[str, Any]):
+        """Keep the fetched payload in the snapshot store (sample/stale fallbacks excluded)"""
+        metadata = data.get('metadata') or {}
+        all_stale = metadata.get('stale') and not metadata.get('stale_sections')
+        if metadata.get('sample_data') or all_stale:
+            return
+        store = self._get_snapshot_store()
+        if store is None:
+            return
+        skip = list(metadata.get('sample_sections') or []) + list(metadata.get('stale_sections') or {})
+        try:
+            result = store.save(data, skip_sections=skip)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Warning: snapshot not saved: {e}")
+            return
+        self.last_fetch_metrics['snapshot'] = result
+
     def _fetch_from_api(self) -> Dict[str, Any]:
         """Fetch data from REST API"""
+        import requests
+
+        source = self.config.get('data_source', {})
         try:
-            response = requests.get(
-                self.data_source_url,
-                timeout=30,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            return response.json()
+            payload, info = self._http_get_json(self.data_source_url, source)
+            if info.get('cache') == 'stale' and isinstance(payload, dict):
+                payload = dict(payload)
+                payload['metadata'] = {**payload.get('metadata', {}), **self._stale_metadata(info)}
+            return payload
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching from API: {e}")
-            print("Falling back to sample data...")
-            return self._get_sample_data()
+            # No sample-data stand-in: a report of made-up numbers must not go out
+            raise DataFetchError(f"API fetch failed and no cached response is available: {e}") from e
 
     def _fetch_from_json(self) -> Dict[str, Any]:
         """Fetch data from local JSON file"""
         try:
             json_path = self.config.get('data_source', {}).get('json_path', 'data/weekly_data.json')
-            with open(json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._read_json_file(json_path, ('metadata',) + REPORT_SECTIONS)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error reading JSON file: {e}")
             print("Falling back to sample data...")
-            return self._get_sample_data()
+            data = self._get_sample_data()
+            data['metadata']['sample_data'] = True
+            return data
+
+    def _read_json_file(self, json_path: str, sections: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """
+        Read a JSON document from disk
+
+        With data_source.json_loader 'stream' (always for .ndjson/.jsonl)
+        only the given top-level sections are materialized, via the
+        memory-mapped loader in json_stream. Load time (and, with
+        json_profile, peak memory) is kept in last_fetch_metrics['json_load'].
+        """
+        source = self.config.get('data_source', {})
+        streaming = (source.get('json_loader', 'full') == 'stream'
+                     or json_path.endswith(('.ndjson', '.jsonl')))
+
+        if streaming:
+            data, stats = measure_load(load_sections, json_path, sections,
+                                       trace_memory=bool(source.get('json_profile', False)))
+        else:
+            def _full_load(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            data, stats = measure_load(_full_load, json_path,
+                                       trace_memory=bool(source.get('json_profile', False)))
+
+        stats['loader'] = 'stream' if streaming else 'full'
+        self.last_fetch_metrics.setdefault('json_load', {})[json_path] = stats
+        return data
+
+    def _fetch_from_sources(self) -> Dict[str, Any]:
+        """
+        Fetch each report section from its own source, concurrently
+
+        data_source.sections maps a section name to a source definition
+        (type api/json/database/sample plus url/json_path and optional
+        timeout/retries/backoff, or queries for database). All sources are fetched on a thread pool,
+        so the total latency is that of the slowest source. A section whose
+        source fails falls back to sample data and is flagged in
+        last_fetch_metrics.
+        """
+        source_config = self.config.get('data_source', {})
+        sections = source_config.get('sections', {}) or {}
+        started = time.perf_counter()
+
+        max_workers = source_config.get('max_workers') or max(1, len(sections))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch') as pool:
+            futures = {
+                name: pool.submit(self._fetch_section, name, source or {})
+                for name, source in sections.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+        sample = None
+        data: Dict[str, Any] = {}
+        metrics: Dict[str, Any] = {}
+        for name, (payload, section_metrics) in results.items():
+            if payload is None:
+                if sample is None:
+                    sample = self._get_sample_data()
+                payload = sample.get(name, {})
+                print(f"Error fetching section '{name}': {section_metrics['error']}")
+                print(f"Falling back to sample data for '{name}'...")
+            data[name] = payload
+            metrics[name] = section_metrics
+
+        data['metadata'] = {
+            **{
+                "week": self._get_current_week(),
+                "generated_at": datetime.now().isoformat(),
+                "report_type": "weekly"
+            },
+            **data.get('metadata', {})
+        }
+        fallback = [name for name, m in metrics.items() if m['status'] == 'fallback']
+        if fallback:
+            data['metadata']['sample_sections'] = fallback
+        stale = {name: m for name, m in metrics.items() if m.get('cache') == 'stale'}
+        if stale:
+            data['metadata']['stale'] = True
+            data['metadata']['stale_sections'] = {
+                name: self._stale_metadata(m) for name, m in stale.items()
+            }
+
+        self.last_fetch_metrics.update({
+            'total_seconds': round(time.perf_counter() - started, 3),
+            'sections': metrics
+        })
+        return data
+
+    def _fetch_section(self, name: str, source: Dict[str, Any]) -> Tuple[Optional[Any], Dict[str, Any]]:
+        """
+        Fetch one section from its source
+
+        Returns:
+            Tuple of (section payload or None on failure, timing metrics)
+        """
+        source_type = source.get('type', 'json')
+        started = time.perf_counter()
+        metrics: Dict[str, Any] = {'source': source_type, 'attempts': 1, 'status': 'ok', 'error': None}
+
+        try:
+            if source_type == 'api':
+                payload, info = self._http_get_json(source.get('url', ''), source)
+                metrics.update(info)
+            elif source_type == 'json':
+                payload = self._read_json_file(source.get('json_path', f"data/{name}.json"))
+            elif source_type == 'database':
+                db_source = self._get_database_source(source)
+                payload = db_source.fetch(self._get_current_week(), section=name)
+            elif source_type == 'snapshot':
+                store = self._get_snapshot_store(required=True)
+                week = source.get('week') or store.latest_week()
+                payload = (store.load(week, [name]) or {}).get(name) if week else None
+                if payload is None:
+                    raise ValueError(f"No snapshot of '{name}' for week {week}")
+            elif source_type == 'sample':
+                payload = self._get_sample_data()
+            else:
+                raise ValueError(f"Unsupported source type for section '{name}': {source_type}")
+
+            # A source may return the bare section or a document containing it
+            if isinstance(payload, dict) and name in payload:
+                payload = payload[name]
+        except Exception as e:
+            payload = None
+            metrics['status'] = 'fallback'
+            metrics['error'] = f"{type(e).__name__}: {e}"
+
+        metrics['seconds'] = round(time.perf_counter() - started, 3)
+        return payload, metrics
+
+    def _http_get_json(self, url: str, source: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        GET a JSON document with per-source timeout, retries and caching
+
+        Retries connection errors, timeouts and 5xx responses with
+        exponential backoff (backoff, 2*backoff, 4*backoff, ...); a response
+        whose body is not valid JSON is not retried. When the response
+        cache is enabled, fresh entries are served without a request, older
+        ones are revalidated with ETag/Last-Modified, and a cached copy is
+        served as stale if every attempt fails.
+
+        Returns:
+            Tuple of (decoded JSON, info) where info has 'attempts' and
+            'cache' (None, 'fresh', 'revalidated', 'miss' or 'stale')
+        """
+        import requests
+
+        timeout = source.get('timeout', 30)
+        retries = int(source.get('retries', 0))
+        backoff = float(source.get('backoff', 0.5))
+        session = self._get_session()
+        cache = self._get_http_cache()
+
+        entry = cache.get(url) if cache else None
+        if entry is not None and cache.is_fresh(entry):
+            return json.loads(entry.body), {'attempts': 0, 'cache': 'fresh'}
+
+        headers = {'Content-Type': 'application/json'}
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+
+        refetched = False
+        for attempt in range(retries + 1):
+            try:
+                response = session.get(url, timeout=timeout, headers=headers)
+                if response.status_code == 304 and entry is None and not refetched:
+                    # Not modified, but there is no cached body to reuse: ask for it once more
+                    refetched = True
+                    response = session.get(url, timeout=timeout, headers={
+                        'Content-Type': 'application/json', 'Cache-Control': 'no-cache'})
+                if response.status_code == 304:
+                    if entry is None:
+                        raise requests.exceptions.HTTPError(
+                            f"304 Not Modified without a cached copy of {url}", response=response)
+                    cache.revalidated(entry, response.headers)
+                    return json.loads(entry.body), {'attempts': attempt + 1, 'cache': 'revalidated'}
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                status = getattr(e.response, 'status_code', None)
+                retryable = status is None or status >= 500
+                if not retryable or attempt == retries:
+                    return self._serve_stale(url, entry, attempt + 1, e)
+                time.sleep(backoff * (2 ** attempt))
+                continue
+
+            try:
+                payload = json.loads(response.content)
+            except ValueError as e:
+                # A complete response that is not JSON: retrying would fetch the same body
+                error = requests.exceptions.RequestException(f"Invalid JSON from {url}: {e}",
+                                                             response=response)
+                return self._serve_stale(url, entry, attempt + 1, error)
+            if cache:
+                cache.store(url, response.content, response.headers)
+            return payload, {'attempts': attempt + 1, 'cache': 'miss' if cache else None}
+
+    @staticmethod
+    def _serve_stale(url: str, entry, attempts: int,
+                     error: Exception) -> Tuple[Any, Dict[str, Any]]:
+        """Cached copy of a failed request, re-raising the error when nothing is cached"""
+        if entry is None:
+            raise error
+        print(f"Backend unavailable ({error}), serving cached response for {url}")
+        return json.loads(entry.body), {
+            'attempts': attempts,
+            'cache': 'stale',
+            'cached_at': entry.stored_at,
+            'stale_reason': str(error)
+        }
+
+    def _get_http_cache(self) -> Optional[HttpCache]:
+        """On-disk response cache, or None when data_source.cache is disabled"""
+        cache_config = self.config.get('data_source', {}).get('cache', {}) or {}
+        if not cache_config.get('enabled', False):
+            return None
+        with self._session_lock:
+            if self._http_cache is None:
+                self._http_cache = HttpCache(
+                    cache_config.get('directory', 'data/http_cache'),
+                    ttl_seconds=cache_config.get('ttl_seconds', 300),
+                    max_size_mb=cache_config.get('max_size_mb', 200)
+                )
+            return self._http_cache
+
+    @staticmethod
+    def _stale_metadata(info: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata fields marking data served from a stale cache entry"""
+        return {
+            'stale': True,
+            'cached_at': datetime.fromtimestamp(info.get('cached_at', 0)).isoformat(),
+            'stale_reason': info.get('stale_reason')
+        }
+
+    def _get_snapshot_store(self, required: bool = False) -> Optional[SnapshotStore]:
+        """Snapshot store from config snapshots.* (opened even when disabled if required)"""
+        with self._session_lock:
+            if self._snapshot_store is None:
+                self._snapshot_store = open_store(self.config)
+                if self._snapshot_store is None and required:
+                    snapshot_config = self.config.get('snapshots', {}) or {}
+                    self._snapshot_store = SnapshotStore(snapshot_config.get('path', 'data/snapshots.db'))
+            return self._snapshot_store
+
+    def _get_session(self) -> 'requests.Session':
+        """Shared keep-alive session, pooled to the number of concurrent sources"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with self._session_lock:
+            if self._session is None:
+                source_config = self.config.get('data_source', {})
+                pool_size = max(4, len(source_config.get('sections', {}) or {}))
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        """Close pooled HTTP and database connections"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            for db_source in self._db_sources.values():
+                db_source.close()
+            self._db_sources = {}
+            if self._snapshot_store is not None:
+                self._snapshot_store.close()
+                self._snapshot_store = None
 
     def _fetch_from_database(self) -> Dict[str, Any]:
         """Fetch data from database"""
-        # TODO: Implement database connection
-        # Example: PostgreSQL, MySQL, etc.
-        print("Database fetching not yet implemented. Using sample data.")
-        return self._get_sample_data()
+        try:
+            data = self._get_database_source(self.config.get('data_source', {})).fetch(self._get_current_week())
+        except Exception as e:
+            raise DataFetchError(f"Database fetch failed: {e}") from e
+
+        data['metadata'] = {
+            "week": self._get_current_week(),
+            "generated_at": datetime.now().isoformat(),
+            "report_type": "weekly",
+            **data.get('metadata', {})
+        }
+        return data
+
+    def _get_database_source(self, source: Dict[str, Any]) -> DatabaseSource:
+        """
+        Pooled database source for a data_source (or section source) entry
+
+        Connection settings come from data_source.database, overridden by
+        the entry's own 'database' block; sources with the same settings
+        share one connection pool.
+        """
+        db_config = {
+            **(self.config.get('data_source', {}).get('database', {}) or {}),
+            **(source.get('database', {}) or {})
+        }
+        key = json.dumps(db_config, sort_keys=True, default=str)
+        with self._session_lock:
+            if key not in self._db_sources:
+                self._db_sources[key] = DatabaseSource(db_config)
+            return self._db_sources[key]
 
     def _get_sample_data(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,319 @@
+"""
+Database Source
+Runs per-section SQL queries on pooled connections and streams rows into report structures
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Any, List, Optional
+
+
+# How rows are folded when a query does not set 'shape'
+DEFAULT_SHAPES = {
+    'tckt.overview.receivables': 'record',
+    'tckt.overview.payables': 'record',
+    'tckt.overview.cash_flow': 'record',
+    'ops.ship_schedule': 'rows',
+    'ops.performance.profomar_vs_actual': 'columns',
+    'kinh_doanh.domestic_performance': 'group_sum',
+    'kinh_doanh.market_notes': 'values',
+    'eqc.overview': 'record',
+    'thuong_vu.production_volume': 'sum',
+    'tong_quan_tau.fuel_consumption': 'columns',
+}
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of DB-API connections
+
+    Connections are opened lazily up to `size` and handed out one per
+    thread. A connection that raised during use is closed instead of being
+    returned, so a broken connection never goes back into the pool; a
+    thread waiting for a connection is woken and opens the replacement.
+    Waiting longer than `timeout` seconds raises TimeoutError.
+    """
+
+    def __init__(self, connect, size: int = 4, timeout: float = 30):
+        self._connect = connect
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self._idle: List[Any] = []
+        self._opened = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            self._discard(conn)
+            raise
+        else:
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def close(self):
+        """Close all idle connections"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while not self._idle and self._opened >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No database connection free after {self.timeout:g}s "
+                                       f"(pool_size {self.size})")
+                self._cond.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+    def _discard(self, conn):
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class DatabaseSource:
+    """
+    Report data from SQL queries
+
+    Each entry of database.queries maps a dotted data path (e.g.
+    'ops.ship_schedule') to a query. Queries run concurrently, one pooled
+    connection each, with named parameters :week, :week_start and
+    :week_end (%(week)s etc. for Postgres/MySQL drivers). Rows are read
+    with fetchmany through a server-side cursor where the driver has one
+    and folded into the target structure as they arrive:
+
+        rows       list of row dicts
+        columns    dict of column name -> list of values
+        record     first row as a dict
+        values     list of the first column
+        sum        dict of column -> sum over all rows
+        group_sum  columns dict grouped by the first column, other columns summed
+
+    so large voyage/booking tables are aggregated without holding the
+    full result set in memory.
+    """
+
+    def __init__(self, db_config: Dict[str, Any]):
+        self.db_config = db_config
+        self.driver = db_config.get('driver', 'sqlite')
+        self.fetch_size = int(db_config.get('fetch_size', 1000))
+        self.queries = self._normalize_queries(db_config.get('queries', {}) or {})
+        self.pool = ConnectionPool(self._connect, db_config.get('pool_size', 4),
+                                   db_config.get('pool_timeout', 30))
+        self.last_query_metrics: Dict[str, Any] = {}
+
+    def fetch(self, week: str, section: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the configured queries and build the report data
+
+        Args:
+            week: ISO week ('YYYY-WXX') passed to the queries
+            section: Only run queries for this section
+
+        Returns:
+            Nested report data dict (only paths with queries are filled)
+        """
+        params = self._week_params(week)
+        queries = {
+            path: query for path, query in self.queries.items()
+            if section is None or path.split('.')[0] == section
+        }
+
+        with ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix='db') as pool:
+            futures = {
+                path: pool.submit(self._run_query, path, query, params)
+                for path, query in queries.items()
+            }
+            results = {path: future.result() for path, future in futures.items()}
+
+        data: Dict[str, Any] = {}
+        metrics = {}
+        for path, (value, query_metrics) in results.items():
+            _set_path(data, path.split('.'), value)
+            metrics[path] = query_metrics
+        self.last_query_metrics = metrics
+        return data
+
+    def close(self):
+        self.pool.close()
+
+    def _run_query(self, path: str, query: Dict[str, Any], params: Dict[str, Any]):
+        started = time.perf_counter()
+        folder = _Folder(query['shape'])
+
+        with self.pool.connection() as conn:
+            cursor = self._cursor(conn)
+            try:
+                cursor.execute(query['sql'], params)
+                columns = None
+                row_count = 0
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if columns is None:
+                        # Named (server-side) psycopg2 cursors only describe
+                        # their columns once the first rows are fetched
+                        columns = [d[0] for d in cursor.description or []]
+                    if not rows:
+                        break
+                    for row in rows:
+                        folder.add(columns, row)
+                    row_count += len(rows)
+                    if folder.done:
+                        break
+            finally:
+                cursor.close()
+            conn.rollback()  # end the read transaction so the connection is reusable
+
+        return folder.result(columns), {
+            'rows': row_count,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+    def _cursor(self, conn):
+        """Server-side cursor where the driver supports one"""
+        if self.driver == 'postgresql':
+            cursor = conn.cursor(name=f"vlines_{uuid.uuid4().hex}")
+            cursor.itersize = self.fetch_size
+            return cursor
+        if self.driver == 'mysql':
+            import pymysql.cursors
+            return conn.cursor(pymysql.cursors.SSCursor)
+        return conn.cursor()
+
+    def _connect(self):
+        cfg = {key: os.path.expandvars(str(value)) if isinstance(value, str) else value
+               for key, value in self.db_config.items()}
+
+        if self.driver == 'sqlite':
+            import sqlite3
+            return sqlite3.connect(cfg.get('path', cfg.get('name', 'data/vlines.db')),
+                                   check_same_thread=False)
+        if self.driver == 'postgresql':
+            import psycopg2
+            return psycopg2.connect(
+                host=cfg.get('host', 'localhost'),
+                port=cfg.get('port', 5432),
+                dbname=cfg.get('name'),
+                user=cfg.get('user'),
+                password=cfg.get('password')
+            )
+        if self.driver == 'mysql':
+            import pymysql
+            return pymysql.connect(
+                host=cfg.get('host', 'localhost'),
+                port=int(cfg.get('port', 3306)),
+                database=cfg.get('name'),
+                user=cfg.get('user'),
+                password=cfg.get('password')
+            )
+        raise ValueError(f"Unsupported database driver: {self.driver}")
+
+    @staticmethod
+    def _normalize_queries(queries: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        normalized = {}
+        for path, query in queries.items():
+            if isinstance(query, str):
+                query = {'sql': query}
+            shape = query.get('shape') or DEFAULT_SHAPES.get(path, 'rows')
+            if shape not in _Folder.SHAPES:
+                raise ValueError(f"Unknown shape '{shape}' for query {path}")
+            normalized[path] = {'sql': query['sql'], 'shape': shape}
+        return normalized
+
+    @staticmethod
+    def _week_params(week: str) -> Dict[str, Any]:
+        year, week_num = week.split('-W')
+        start = date.fromisocalendar(int(year), int(week_num), 1)
+        end = date.fromisocalendar(int(year), int(week_num), 7)
+        return {'week': week, 'week_start': start.isoformat(), 'week_end': end.isoformat()}
+
+
+class _Folder:
+    """Incrementally folds rows into one of the supported shapes"""
+
+    SHAPES = ('rows', 'columns', 'record', 'values', 'sum', 'group_sum')
+
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.done = False
+        self._rows: List[Dict[str, Any]] = []
+        self._columns: Dict[str, List[Any]] = {}
+        self._record: Optional[Dict[str, Any]] = None
+        self._values: List[Any] = []
+        self._sums: Dict[str, Any] = {}
+        self._groups: Dict[Any, List[Any]] = {}
+
+    def add(self, columns: List[str], row):
+        if self.shape == 'rows':
+            self._rows.append(dict(zip(columns, row)))
+        elif self.shape == 'columns':
+            for name, value in zip(columns, row):
+                self._columns.setdefault(name, []).append(value)
+        elif self.shape == 'record':
+            self._record = dict(zip(columns, row))
+            self.done = True
+        elif self.shape == 'values':
+            self._values.append(row[0])
+        elif self.shape == 'sum':
+            for name, value in zip(columns, row):
+                self._sums[name] = self._sums.get(name, 0) + (value or 0)
+        elif self.shape == 'group_sum':
+            group = self._groups.get(row[0])
+            if group is None:
+                self._groups[row[0]] = [value or 0 for value in row[1:]]
+            else:
+                for i, value in enumerate(row[1:]):
+                    group[i] += value or 0
+
+    def result(self, columns: List[str]):
+        if self.shape == 'rows':
+            return self._rows
+        if self.shape == 'columns':
+            return self._columns or {name: [] for name in columns}
+        if self.shape == 'record':
+            return self._record or {}
+        if self.shape == 'values':
+            return self._values
+        if self.shape == 'sum':
+            return self._sums or {name: 0 for name in columns}
+        # group_sum: insertion order of the first column is kept
+        result = {name: [] for name in columns}
+        for key, sums in self._groups.items():
+            result[columns[0]].append(key)
+            for name, value in zip(columns[1:], sums):
+                result[name].append(value)
+        return result
+
+
+def _set_path(data: Dict[str, Any], path: List[str], value: Any):
+    node = data
+    for key in path[:-1]:
+        node = node.setdefault(key, {})
+    node[path[-1]] = value
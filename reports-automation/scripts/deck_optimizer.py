@@ -0,0 +1,340 @@
+"""
+Deck Optimizer
+Shrinks a saved .pptx package (duplicate media, unused layouts, oversized images) before it is written
+"""
+
+import hashlib
+import os
+import posixpath
+import shutil
+import time
+import uuid
+import zipfile
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from lxml import etree
+
+
+_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+_P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+_R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_LAYOUT_REL = _R_NS + '/slideLayout'
+_MASTER_REL = _R_NS + '/slideMaster'
+
+# Media already compressed; deflating them again costs time and saves nothing
+_STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.mp4', '.m4a', '.mp3', '.wmv', '.wdp')
+_RECOMPRESSED_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+DEFAULT_OPTIONS = {
+    'dedupe_media': True,
+    'drop_unused_layouts': True,
+    'recompress_images_kb': 200,
+    'jpeg_quality': 85,
+    'max_image_px': 2560,
+    'compression_level': 6,
+}
+
+
+def optimize_package(package: bytes, options: Optional[Dict[str, Any]] = None) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Optimize a .pptx package in memory
+
+    - identical media parts are merged (relationships point at one copy)
+    - slide layouts no slide uses are removed, and masters left without
+      layouts, along with parts nothing references any more
+    - JPEG/PNG images above recompress_images_kb are re-encoded (and
+      downscaled beyond max_image_px); a result is kept only if smaller
+    - parts are deflated at compression_level; compressed media is stored
+
+    Args:
+        package: Bytes of the saved .pptx
+        options: Keys of DEFAULT_OPTIONS (config.yaml output.optimize)
+
+    Returns:
+        Tuple of (optimized bytes, stats)
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    started = time.perf_counter()
+
+    with zipfile.ZipFile(BytesIO(package)) as source:
+        infos = source.infolist()
+        parts = {info.filename: source.read(info.filename) for info in infos}
+    stats: Dict[str, Any] = {'bytes_before': len(package), 'media_deduplicated': 0, 'layouts_removed': 0,
+                             'masters_removed': 0, 'parts_removed': 0, 'images_recompressed': 0}
+
+    if options['dedupe_media']:
+        stats['media_deduplicated'] = _dedupe_media(parts)
+    if options['drop_unused_layouts']:
+        stats['layouts_removed'], stats['masters_removed'] = _drop_unused_layouts(parts)
+    removed = _remove_unreachable(parts)
+    stats['parts_removed'] = len(removed)
+    if int(options['recompress_images_kb'] or 0) > 0:
+        stats['images_recompressed'] = _recompress_images(parts, options)
+
+    level = min(9, max(0, int(options['compression_level'])))
+    out = BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as target:
+        for info in infos:
+            if info.filename not in parts:
+                continue
+            stored = level == 0 or info.filename.lower().endswith(_STORED_EXTENSIONS)
+            target.writestr(zipfile.ZipInfo(info.filename, info.date_time), parts[info.filename],
+                            compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+
+    result = out.getvalue()
+    stats['bytes_after'] = len(result)
+    stats['seconds'] = round(time.perf_counter() - started, 4)
+    return result, stats
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """One-line size report, e.g. '3.1 MB -> 1.2 MB (-61%) in 0.20s (...)'"""
+    before, after = stats['bytes_before'], stats['bytes_after']
+    saved = (1 - after / before) * 100 if before else 0.0
+    details = [f"{stats[key]} {label}" for key, label in (
+        ('media_deduplicated', 'duplicate media'), ('layouts_removed', 'unused layouts'),
+        ('masters_removed', 'unused masters'), ('images_recompressed', 'images recompressed')) if stats[key]]
+    return (f"{_size(before)} -> {_size(after)} (-{saved:.0f}%) in {stats['seconds']:.2f}s"
+            + (f" ({', '.join(details)})" if details else ''))
+
+
+def write_atomic(path: str, data: bytes):
+    """
+    Write through a temporary file in the same directory, so readers never see a partial deck
+
+    A replaced deck keeps its permissions; a new one gets the usual ones
+    for the process umask (the temp file is created with mode 0666, which
+    the umask narrows).
+    """
+    path = os.path.abspath(path)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _dedupe_media(parts: Dict[str, bytes]) -> int:
+    """Point relationships at the first of identical media parts; the copies become unreachable"""
+    canonical: Dict[str, str] = {}
+    replace: Dict[str, str] = {}
+    for name in sorted(n for n in parts if n.startswith('ppt/media/')):
+        digest = hashlib.sha256(parts[name]).hexdigest()
+        first = canonical.setdefault(digest, name)
+        if first != name:
+            replace[name] = first
+    if not replace:
+        return 0
+
+    for rels_name in [n for n in parts if n.endswith('.rels')]:
+        source_dir = _source_dir(rels_name)
+        root = etree.fromstring(parts[rels_name])
+        changed = False
+        for rel in root.iter(f'{{{_RELS_NS}}}Relationship'):
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = _resolve(source_dir, rel.get('Target', ''))
+            if target in replace:
+                rel.set('Target', _relative(source_dir, replace[target]))
+                changed = True
+        if changed:
+            parts[rels_name] = _serialize(root)
+    return len(replace)
+
+
+def _drop_unused_layouts(parts: Dict[str, bytes]) -> Tuple[int, int]:
+    """Remove layouts no slide uses from their masters, then masters left without layouts"""
+    slides = [n for n in parts if n.startswith('ppt/slides/slide') and n.endswith('.xml')]
+    if not slides:
+        return 0, 0
+
+    used_layouts: Set[str] = set()
+    for slide in slides:
+        for rel in _relationships(parts, slide):
+            if rel.get('Type') == _LAYOUT_REL:
+                used_layouts.add(_resolve(_part_dir(slide), rel.get('Target', '')))
+
+    layouts_removed = 0
+    empty_masters: List[str] = []
+    for master in sorted(n for n in parts if n.startswith('ppt/slideMasters/') and n.endswith('.xml')):
+        rels_name = _rels_name(master)
+        if rels_name not in parts:
+            continue
+        rels = etree.fromstring(parts[rels_name])
+        unused_ids = set()
+        for rel in list(rels):
+            target = _resolve(_part_dir(master), rel.get('Target', ''))
+            if rel.get('Type') == _LAYOUT_REL and target not in used_layouts:
+                unused_ids.add(rel.get('Id'))
+                rels.remove(rel)
+        if not unused_ids:
+            continue
+
+        root = etree.fromstring(parts[master])
+        id_list = root.find(f'{{{_P_NS}}}sldLayoutIdLst')
+        for entry in list(id_list if id_list is not None else []):
+            if entry.get(f'{{{_R_NS}}}id') in unused_ids:
+                id_list.remove(entry)
+        if id_list is not None and len(id_list) == 0:
+            empty_masters.append(master)
+        parts[master] = _serialize(root)
+        parts[rels_name] = _serialize(rels)
+        layouts_removed += len(unused_ids)
+
+    masters_removed = 0
+    if empty_masters:
+        presentation = 'ppt/presentation.xml'
+        rels_name = _rels_name(presentation)
+        rels = etree.fromstring(parts[rels_name])
+        root = etree.fromstring(parts[presentation])
+        id_list = root.find(f'{{{_P_NS}}}sldMasterIdLst')
+        remaining = len(id_list) if id_list is not None else 0
+        for rel in list(rels):
+            target = _resolve('ppt', rel.get('Target', ''))
+            # A presentation needs one master, even if no slide uses it
+            if rel.get('Type') != _MASTER_REL or target not in empty_masters or remaining <= 1:
+                continue
+            rels.remove(rel)
+            for entry in list(id_list):
+                if entry.get(f'{{{_R_NS}}}id') == rel.get('Id'):
+                    id_list.remove(entry)
+            remaining -= 1
+            masters_removed += 1
+        parts[presentation] = _serialize(root)
+        parts[rels_name] = _serialize(rels)
+
+    return layouts_removed, masters_removed
+
+
+def _remove_unreachable(parts: Dict[str, bytes]) -> List[str]:
+    """Drop ppt/ parts no relationship leads to, and their content type overrides"""
+    reachable: Set[str] = set()
+    pending = ['']  # '' is the package itself (_rels/.rels)
+    while pending:
+        name = pending.pop()
+        for rel in _relationships(parts, name):
+            if rel.get('TargetMode') == 'External':
+                continue
+            target = _resolve(_part_dir(name), rel.get('Target', ''))
+            if target not in reachable:
+                reachable.add(target)
+                pending.append(target)
+
+    removed = [n for n in parts if n.startswith('ppt/') and not n.endswith('.rels') and n not in reachable]
+    removed += [_rels_name(n) for n in removed if _rels_name(n) in parts]
+    if not removed:
+        return []
+    for name in removed:
+        del parts[name]
+
+    content_types = etree.fromstring(parts['[Content_Types].xml'])
+    gone = {'/' + name for name in removed}
+    for override in list(content_types.iter(f'{{{_CT_NS}}}Override')):
+        if override.get('PartName') in gone:
+            content_types.remove(override)
+    parts['[Content_Types].xml'] = _serialize(content_types)
+    return removed
+
+
+def _recompress_images(parts: Dict[str, bytes], options: Dict[str, Any]) -> int:
+    """Re-encode large JPEG/PNG media in place (same format and name)"""
+    from PIL import Image
+
+    threshold = int(options['recompress_images_kb']) * 1024
+    max_px = int(options['max_image_px'] or 0)
+    count = 0
+    for name in [n for n in parts if n.startswith('ppt/media/') and n.lower().endswith(_RECOMPRESSED_EXTENSIONS)]:
+        original = parts[name]
+        if len(original) <= threshold:
+            continue
+        try:
+            with Image.open(BytesIO(original)) as image:
+                image.load()
+                image_format = image.format
+                info = image.info
+                if max_px and max(image.size) > max_px:
+                    image.thumbnail((max_px, max_px), Image.LANCZOS)
+                buffer = BytesIO()
+                if image_format == 'JPEG':
+                    image.save(buffer, 'JPEG', quality=int(options['jpeg_quality']), optimize=True,
+                               icc_profile=info.get('icc_profile'))
+                elif image_format == 'PNG':
+                    image.save(buffer, 'PNG', optimize=True)
+                else:
+                    continue
+        except (OSError, ValueError):
+            continue  # not decodable by Pillow; keep as is
+        if buffer.tell() < len(original):
+            parts[name] = buffer.getvalue()
+            count += 1
+    return count
+
+
+def _relationships(parts: Dict[str, bytes], name: str) -> List[Any]:
+    rels_name = _rels_name(name) if name else '_rels/.rels'
+    if rels_name not in parts:
+        return []
+    return list(etree.fromstring(parts[rels_name]).iter(f'{{{_RELS_NS}}}Relationship'))
+
+
+def _rels_name(name: str) -> str:
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, '_rels', filename + '.rels')
+
+
+def _part_dir(name: str) -> str:
+    return posixpath.dirname(name)
+
+
+def _source_dir(rels_name: str) -> str:
+    """Directory relationship targets in a .rels file are relative to"""
+    return posixpath.dirname(posixpath.dirname(rels_name))
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _relative(base_dir: str, name: str) -> str:
+    return posixpath.relpath(name, base_dir or '.')
+
+
+def _serialize(root) -> bytes:
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _size(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.0f} KB"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Optimize a .pptx and report the size saved')
+    parser.add_argument('deck', help='.pptx to optimize')
+    parser.add_argument('-o', '--output', help='Write here instead of replacing the deck')
+    parser.add_argument('--level', type=int, default=DEFAULT_OPTIONS['compression_level'],
+                        help='zip compression level 0-9')
+    parser.add_argument('--keep-layouts', action='store_true', help='Keep unused slide layouts')
+    parser.add_argument('--no-images', action='store_true', help='Do not recompress images')
+    args = parser.parse_args()
+
+    with open(args.deck, 'rb') as f:
+        optimized, result = optimize_package(f.read(), {
+            'compression_level': args.level,
+            'drop_unused_layouts': not args.keep_layouts,
+            'recompress_images_kb': 0 if args.no_images else DEFAULT_OPTIONS['recompress_images_kb'],
+        })
+    write_atomic(args.output or args.deck, optimized)
+    print(f"{args.output or args.deck}: {format_stats(result)}")
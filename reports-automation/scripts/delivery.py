@@ -0,0 +1,622 @@
+"""
+Delivery
+Sends finished reports (email, Slack/Teams, uploads) in the background with retries and a durable outbox
+"""
+
+import base64
+import json
+import os
+import re
+import shutil
+import smtplib
+import socket
+import ssl
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.header import Header
+from email.utils import formatdate, make_msgid, encode_rfc2231
+from typing import Dict, Any, Iterator, List, Optional
+
+from instrumentation import emit, log_error
+
+
+PPTX_MIME = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+# 57 input bytes make one 76-character base64 line
+_B64_CHUNK = 57 * 1024
+
+
+def _expand(value: Any) -> str:
+    """Expand $VAR/${VAR} from the environment; '' if the value is just an unset ${VAR}"""
+    text = str(value or '')
+    reference = re.fullmatch(r'\$\{(\w+)\}', text.strip())
+    if reference and reference.group(1) not in os.environ:
+        return ''
+    return os.path.expandvars(text)
+
+
+class Outbox:
+    """
+    Delivery tasks stored as one JSON file each
+
+    pending/ holds tasks still to be sent (including ones waiting for a
+    retry), inflight/ those being sent and failed/ those that ran out of
+    attempts. A sender claims a task by renaming it into inflight/, which
+    only one process can do, so a daemon and a one-shot run sharing the
+    outbox never send the same task twice. Claim files carry the host and
+    pid of their owner; claims of a process that is gone (or older than
+    stale_seconds) are moved back to pending/. Files are written
+    atomically, so a crash never leaves a half-written task, and pending
+    tasks are picked up again when the process restarts.
+    """
+
+    def __init__(self, directory: str, stale_seconds: float = 3600):
+        self.directory = directory
+        self.stale_seconds = float(stale_seconds)
+        self.pending_dir = os.path.join(directory, 'pending')
+        self.inflight_dir = os.path.join(directory, 'inflight')
+        self.failed_dir = os.path.join(directory, 'failed')
+        for path in (self.pending_dir, self.inflight_dir, self.failed_dir):
+            os.makedirs(path, exist_ok=True)
+        self._owner = f"{socket.gethostname()}~{os.getpid()}"
+
+    def add(self, channel: str, kind: str, **fields) -> Dict[str, Any]:
+        task = {
+            'id': f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+            'channel': channel,
+            'kind': kind,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'attempts': 0,
+            'next_attempt': 0.0,
+            'last_error': None,
+            **fields
+        }
+        self._write(self._pending_path(task['id']), task)
+        return task
+
+    def claim(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Take a pending task for sending; None if another sender got it first"""
+        claim_path = self._claim_path(task_id)
+        try:
+            os.rename(self._pending_path(task_id), claim_path)
+        except FileNotFoundError:
+            return None
+        os.utime(claim_path)  # claim time, for the stale check
+        try:
+            with open(claim_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._remove(claim_path)
+            return None
+
+    def retry(self, task: Dict[str, Any]):
+        """Put a claimed task back in pending/ (with its new attempt count and due time)"""
+        self._write(self._pending_path(task['id']), task)
+        self._remove(self._claim_path(task['id']))
+
+    def complete(self, task: Dict[str, Any]):
+        self._remove(self._claim_path(task['id']))
+
+    def fail(self, task: Dict[str, Any]):
+        self._write(os.path.join(self.failed_dir, f"{task['id']}.json"), task)
+        self._remove(self._claim_path(task['id']))
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Pending tasks, oldest first (unreadable files are skipped)"""
+        tasks = []
+        for filename in sorted(os.listdir(self.pending_dir)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.pending_dir, filename), 'r', encoding='utf-8') as f:
+                    tasks.append(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return tasks
+
+    def requeue_stale(self) -> int:
+        """Move claims whose sender is gone back to pending/; returns how many"""
+        requeued = 0
+        for filename in os.listdir(self.inflight_dir):
+            parts = filename[:-len('.json')].split('~') if filename.endswith('.json') else []
+            if len(parts) != 3:
+                continue
+            task_id, host, pid = parts
+            path = os.path.join(self.inflight_dir, filename)
+            try:
+                age = time.time() - os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            if age < self.stale_seconds and _process_alive(host, pid):
+                continue
+            try:
+                os.rename(path, self._pending_path(task_id))
+                requeued += 1
+            except FileNotFoundError:
+                pass
+        return requeued
+
+    def failed_count(self) -> int:
+        return sum(1 for name in os.listdir(self.failed_dir) if name.endswith('.json'))
+
+    def _pending_path(self, task_id: str) -> str:
+        return os.path.join(self.pending_dir, f"{task_id}.json")
+
+    def _claim_path(self, task_id: str) -> str:
+        return os.path.join(self.inflight_dir, f"{task_id}~{self._owner}.json")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write(path: str, task: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(task, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _process_alive(host: str, pid: str) -> bool:
+    """Whether a claim's owner may still be running (assumed so on other hosts and Windows)"""
+    if host != socket.gethostname() or os.name == 'nt' or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Channel:
+    """
+    A delivery target
+
+    notify_on lists the task kinds the channel takes: 'report' (a new
+    deck) and/or 'error' (a failed run). timeout is the socket timeout of
+    each network operation.
+    """
+
+    def __init__(self, name: str, channel_config: Dict[str, Any], default_notify_on: List[str]):
+        self.name = name
+        self.timeout = float(channel_config.get('timeout', 30))
+        self.notify_on = list(channel_config.get('notify_on') or default_notify_on)
+
+    def send(self, task: Dict[str, Any]):
+        raise NotImplementedError
+
+
+class EmailChannel(Channel):
+    """
+    SMTP email, with the report attached
+
+    The message is written to the server in chunks (the attachment is
+    base64-encoded 57 KB at a time), so a large deck is never held in
+    memory as a whole. Decks over max_attachment_mb are announced without
+    the attachment.
+    """
+
+    def __init__(self, channel_config: Dict[str, Any]):
+        super().__init__('email', channel_config, ['report'])
+        self.server = channel_config.get('smtp_server', 'localhost')
+        self.port = int(channel_config.get('smtp_port', 587))
+        self.use_ssl = bool(channel_config.get('use_ssl', self.port == 465))
+        self.starttls = bool(channel_config.get('starttls', not self.use_ssl and self.port == 587))
+        self.username = _expand(channel_config.get('username'))
+        self.password = _expand(channel_config.get('password'))
+        self.sender = channel_config.get('sender', 'reports@localhost')
+        self.recipients = list(channel_config.get('recipients') or [])
+        self.subject = channel_config.get('subject', 'VLines Weekly Report - Week {week}')
+        self.error_subject = channel_config.get('error_subject', 'VLines Weekly Report failed')
+        self.max_attachment_bytes = int(float(channel_config.get('max_attachment_mb', 20)) * 1024 * 1024)
+
+    def send(self, task: Dict[str, Any]):
+        if not self.recipients:
+            raise ValueError("email: no recipients configured")
+
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        with smtp_class(self.server, self.port, timeout=self.timeout) as smtp:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+
+            code, reply = smtp.mail(self.sender)
+            if code != 250:
+                raise smtplib.SMTPSenderRefused(code, reply, self.sender)
+            for recipient in self.recipients:
+                code, reply = smtp.rcpt(recipient)
+                if code not in (250, 251):
+                    raise smtplib.SMTPRecipientsRefused({recipient: (code, reply)})
+
+            code, reply = smtp.docmd('DATA')
+            if code != 354:
+                raise smtplib.SMTPDataError(code, reply)
+            for chunk in self._message(task):
+                smtp.send(chunk)
+            smtp.send(b'\r\n.\r\n')
+            code, reply = smtp.getreply()
+            if code != 250:
+                raise smtplib.SMTPDataError(code, reply)
+
+    def _message(self, task: Dict[str, Any]) -> Iterator[bytes]:
+        """MIME message as CRLF byte chunks (base64 parts need no dot-stuffing)"""
+        report = task.get('report') or {}
+        boundary = f"=_vlines_{uuid.uuid4().hex}"
+        if task['kind'] == 'error':
+            subject = self.error_subject.format(week=report.get('week', ''))
+        else:
+            subject = self.subject.format(week=report.get('week', ''))
+
+        path = report.get('path')
+        attach = (task['kind'] == 'report' and path and os.path.exists(path)
+                  and os.path.getsize(path) <= self.max_attachment_bytes)
+        body = _message_text(task)
+        if task['kind'] == 'report' and path and not attach:
+            body += "\n\nThe report is too large to attach; it is available at the location above."
+
+        headers = [
+            f"From: {self.sender}",
+            f"To: {', '.join(self.recipients)}",
+            f"Subject: {Header(subject, 'utf-8').encode()}",
+            f"Date: {formatdate(localtime=True)}",
+            f"Message-ID: {make_msgid()}",
+            "MIME-Version: 1.0",
+            f'Content-Type: multipart/mixed; boundary="{boundary}"',
+            "",
+            f"--{boundary}",
+            "Content-Type: text/plain; charset=utf-8",
+            "Content-Transfer-Encoding: base64",
+            "",
+        ]
+        yield ('\r\n'.join(headers) + '\r\n').encode('ascii')
+        yield base64.encodebytes(body.encode('utf-8')).replace(b'\n', b'\r\n')
+
+        if attach:
+            filename = os.path.basename(path)
+            yield ('\r\n'.join([
+                f"--{boundary}",
+                f"Content-Type: {PPTX_MIME}",
+                f"Content-Disposition: attachment; filename*={encode_rfc2231(filename, 'utf-8')}",
+                "Content-Transfer-Encoding: base64",
+                "", ""
+            ])).encode('ascii')
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(_B64_CHUNK), b''):
+                    yield base64.encodebytes(block).replace(b'\n', b'\r\n')
+
+        yield f"--{boundary}--".encode('ascii')
+
+
+class WebhookChannel(Channel):
+    """Slack or Microsoft Teams incoming webhook"""
+
+    def __init__(self, name: str, channel_config: Dict[str, Any]):
+        super().__init__(name, channel_config, ['report', 'error'])
+        self.url = _expand(channel_config.get('webhook_url'))
+        self.channel = channel_config.get('channel')
+
+    def send(self, task: Dict[str, Any]):
+        if not self.url:
+            raise ValueError(f"{self.name}: webhook_url not set")
+        payload: Dict[str, Any] = {'text': _message_text(task)}
+        if self.name == 'slack' and self.channel:
+            payload['channel'] = self.channel
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class DirectoryUpload(Channel):
+    """Copies the report into a directory (e.g. a mounted file share)"""
+
+    def __init__(self, name: str, channel_config: Dict[str, Any]):
+        super().__init__(name, channel_config, ['report'])
+        self.path = _expand(channel_config.get('path'))
+
+    def send(self, task: Dict[str, Any]):
+        source = task['report']['path']
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, os.path.basename(source))
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.part')
+        try:
+            with open(source, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            # mkstemp creates the file owner-only; copies on a share are for others too
+            shutil.copymode(source, tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class HttpUpload(Channel):
+    """Uploads the report with an HTTP PUT/POST, streaming the file body"""
+
+    def __init__(self, name: str, channel_config: Dict[str, Any]):
+        super().__init__(name, channel_config, ['report'])
+        self.url = _expand(channel_config.get('url'))
+        self.method = channel_config.get('method', 'PUT').upper()
+        self.headers = {k: _expand(v) for k, v in (channel_config.get('headers') or {}).items()}
+
+    def send(self, task: Dict[str, Any]):
+        report = task['report']
+        path = report['path']
+        url = self.url.format(filename=os.path.basename(path), week=report.get('week', ''))
+        headers = {'Content-Type': PPTX_MIME, 'Content-Length': str(os.path.getsize(path)), **self.headers}
+        with open(path, 'rb') as f:
+            # http.client sends a file body in blocks rather than reading it whole
+            request = urllib.request.Request(url, data=f, headers=headers, method=self.method)
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+
+
+def _message_text(task: Dict[str, Any]) -> str:
+    report = task.get('report') or {}
+    if task['kind'] == 'error':
+        return f"VLines weekly report generation failed: {task.get('error', 'unknown error')}"
+    size_mb = (report.get('bytes') or 0) / 1024 / 1024
+    return (f"VLines weekly report {report.get('week', '')} is ready: "
+            f"{os.path.basename(report.get('path', ''))} ({size_mb:.1f} MB)\n{report.get('path', '')}")
+
+
+def build_channels(notifications_config: Dict[str, Any]) -> Dict[str, Channel]:
+    """Enabled channels from config.yaml notifications.*"""
+    channels: Dict[str, Channel] = {}
+    if (notifications_config.get('email') or {}).get('enabled'):
+        channels['email'] = EmailChannel(notifications_config['email'])
+    for name in ('slack', 'teams'):
+        if (notifications_config.get(name) or {}).get('enabled'):
+            channels[name] = WebhookChannel(name, notifications_config[name])
+    for i, upload in enumerate(notifications_config.get('uploads') or []):
+        if not upload or not upload.get('enabled', True):
+            continue
+        name = f"upload:{upload.get('name') or i + 1}"
+        if upload.get('type', 'directory') == 'http':
+            channels[name] = HttpUpload(name, upload)
+        else:
+            channels[name] = DirectoryUpload(name, upload)
+    return channels
+
+
+class DeliveryPipeline:
+    """
+    Delivers reports and error notices on a thread pool, in the background
+
+    Each enabled channel gets its own outbox task, so channels run
+    concurrently and a slow or failing one (say, an SMTP server timing
+    out) neither delays the others nor the next report. A failed send is
+    retried after backoff_seconds, doubling each time, up to max_attempts;
+    then the task moves to the outbox's failed/ directory. Pending tasks
+    survive restarts.
+    """
+
+    def __init__(self, config: Dict[str, Any], channels: Optional[Dict[str, Channel]] = None):
+        notifications = config.get('notifications', {}) or {}
+        self.channels = channels if channels is not None else build_channels(notifications)
+        self.outbox = Outbox(notifications.get('outbox', 'data/outbox'),
+                             notifications.get('stale_claim_seconds', 3600))
+        self.workers = max(1, int(notifications.get('workers', 4)))
+        self.max_attempts = max(1, int(notifications.get('max_attempts', 5)))
+        self.backoff_seconds = float(notifications.get('backoff_seconds', 30))
+        self.poll_seconds = float(notifications.get('poll_seconds', 5))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight: set = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._stopping = False
+
+    def deliver_report(self, output_path: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Queue the report for every channel taking reports; returns the channel names"""
+        report = {
+            'path': os.path.abspath(output_path),
+            'week': (metadata or {}).get('week', ''),
+            'bytes': os.path.getsize(output_path) if os.path.exists(output_path) else None,
+        }
+        return self._queue('report', report=report)
+
+    def notify_error(self, error: BaseException) -> List[str]:
+        """Queue a failure notice for every channel taking errors"""
+        return self._queue('error', error=f"{type(error).__name__}: {error}")
+
+    def start(self):
+        """Start the background sender (also resumes tasks left from earlier runs)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self.outbox.requeue_stale()
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='delivery')
+            self._thread = threading.Thread(target=self._loop, name='delivery', daemon=True)
+            self._thread.start()
+
+    def drain(self, timeout: float) -> bool:
+        """Wait until the outbox is empty (or timeout); True if everything was sent or gave up"""
+        self.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._in_flight and not self.outbox.pending():
+                    return True
+                self._idle.wait(min(0.5, max(0.0, deadline - time.monotonic())))
+        return False
+
+    def stop(self):
+        """Stop sending; in-flight sends finish, the rest stay in the outbox"""
+        with self._lock:
+            self._stopping = True
+            thread, pool = self._thread, self._pool
+            self._thread = self._pool = None
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _queue(self, kind: str, **fields) -> List[str]:
+        names = [name for name, channel in self.channels.items() if kind in channel.notify_on]
+        for name in names:
+            self.outbox.add(name, kind, **fields)
+        if names:
+            self.start()
+            self._wake.set()
+        return names
+
+    def _loop(self):
+        while not self._stopping:
+            self.outbox.requeue_stale()
+            now = time.time()
+            next_due = now + self.poll_seconds
+            for task in self.outbox.pending():
+                with self._lock:
+                    if self._stopping:
+                        break
+                    if task['id'] in self._in_flight:
+                        continue
+                    if task.get('next_attempt', 0) > now:
+                        next_due = min(next_due, task['next_attempt'])
+                        continue
+                    # Re-read on claiming: another sender may have updated it since
+                    claimed = self.outbox.claim(task['id'])
+                    if claimed is None:
+                        continue
+                    if claimed.get('next_attempt', 0) > now:
+                        self.outbox.retry(claimed)
+                        next_due = min(next_due, claimed['next_attempt'])
+                        continue
+                    self._in_flight.add(task['id'])
+                    # Submitted under the lock, as stop() clears _pool under it
+                    self._pool.submit(self._attempt, claimed)
+            self._wake.wait(max(0.05, next_due - time.time()))
+            self._wake.clear()
+
+    def _attempt(self, task: Dict[str, Any]):
+        channel = self.channels.get(task['channel'])
+        task['attempts'] += 1
+        started = time.perf_counter()
+        try:
+            if channel is None:
+                raise ValueError(f"channel '{task['channel']}' is no longer configured")
+            channel.send(task)
+            status = 'sent'
+            self.outbox.complete(task)
+        except Exception as e:
+            task['last_error'] = f"{type(e).__name__}: {e}"
+            if channel is None or task['attempts'] >= self.max_attempts:
+                status = 'failed'
+                self.outbox.fail(task)
+                log_error(e, component='delivery', channel=task['channel'], task=task['id'])
+                print(f"Delivery to {task['channel']} failed after {task['attempts']} attempt(s): {e}")
+            else:
+                status = 'retry'
+                task['next_attempt'] = time.time() + self.backoff_seconds * 2 ** (task['attempts'] - 1)
+                self.outbox.retry(task)
+        finally:
+            with self._lock:
+                self._in_flight.discard(task['id'])
+                self._idle.notify_all()
+            self._wake.set()
+
+        emit('delivery', channel=task['channel'], kind=task['kind'], task=task['id'], status=status,
+             attempt=task['attempts'], seconds=round(time.perf_counter() - started, 3),
+             error=task['last_error'] if status != 'sent' else None)
+
+
+if __name__ == "__main__":
+    # Deliver a file through local SMTP/HTTP stand-ins: a slow SMTP server
+    # must not hold up the webhook or upload
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    received: Dict[str, Any] = {}
+
+    class _SmtpSink(socketserver.StreamRequestHandler):
+        delay = 2.0
+
+        def handle(self):
+            self.wfile.write(b"220 stand-in\r\n")
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.strip().upper()
+                if command.startswith((b'EHLO', b'HELO')):
+                    self.wfile.write(b"250 stand-in\r\n")
+                elif command == b'DATA':
+                    self.wfile.write(b"354 go ahead\r\n")
+                    size = 0
+                    for data_line in iter(self.rfile.readline, b''):
+                        if data_line == b'.\r\n':
+                            break
+                        size += len(data_line)
+                    time.sleep(self.delay)
+                    received['smtp_bytes'] = size
+                    self.wfile.write(b"250 queued\r\n")
+                elif command == b'QUIT':
+                    self.wfile.write(b"221 bye\r\n")
+                    return
+                else:
+                    self.wfile.write(b"250 ok\r\n")
+
+    class _HttpSink(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received[self.path] = len(self.rfile.read(int(self.headers['Content-Length'])))
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        do_PUT = do_POST
+
+        def log_message(self, *args):
+            pass
+
+    smtp_server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SmtpSink)
+    http_server = ThreadingHTTPServer(('127.0.0.1', 0), _HttpSink)
+    for server in (smtp_server, http_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_url = 'http://127.0.0.1:{}'.format(http_server.server_address[1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'VLines_Weekly_Report_demo.pptx')
+        with open(report_path, 'wb') as f:
+            f.write(os.urandom(5 * 1024 * 1024))
+
+        demo_config = {'notifications': {
+            'outbox': os.path.join(tmp, 'outbox'),
+            'email': {'enabled': True, 'smtp_server': '127.0.0.1', 'smtp_port': smtp_server.server_address[1],
+                      'starttls': False, 'recipients': ['team@example.com']},
+            'slack': {'enabled': True, 'webhook_url': f"{http_url}/slack"},
+            'uploads': [{'type': 'http', 'url': f"{http_url}/upload/{{filename}}"}],
+        }}
+        pipeline = DeliveryPipeline(demo_config)
+        started = time.perf_counter()
+        print(f"Queued: {', '.join(pipeline.deliver_report(report_path, {'week': '2025-W43'}))} "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        while '/slack' not in received or '/upload/VLines_Weekly_Report_demo.pptx' not in received:
+            time.sleep(0.01)
+        print(f"Slack and upload done after {time.perf_counter() - started:.2f}s")
+        pipeline.drain(30)
+        print(f"Email ({received.get('smtp_bytes', 0) / 1024 / 1024:.1f} MB message) done after "
+              f"{time.perf_counter() - started:.2f}s; pending: {len(pipeline.outbox.pending())}")
+        pipeline.stop()
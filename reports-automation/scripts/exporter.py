@@ -0,0 +1,285 @@
+"""
+Exporter
+Converts generated decks to PDF and per-slide PNG images with LibreOffice and poppler
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from instrumentation import span
+
+
+FORMATS = ('pdf', 'png')
+_SLIDE_PNG = re.compile(r'slide-(\d+)\.png')
+
+
+class ExportError(RuntimeError):
+    """A conversion failed, timed out or its converter is not installed"""
+
+
+def deck_fingerprint(deck_path: str) -> str:
+    """
+    Digest of a deck's content from its zip directory (names, CRC-32, sizes)
+
+    Nothing is decompressed, and two saves of the same content match even
+    though their zip timestamps differ.
+    """
+    with zipfile.ZipFile(deck_path) as deck:
+        entries = sorted((info.filename, info.CRC, info.file_size) for info in deck.infolist())
+    return hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()
+
+
+def _slide_order(name: str):
+    """Sort key putting slide PNGs in page order, whatever their padding"""
+    match = _SLIDE_PNG.fullmatch(name)
+    return (int(match.group(1)), name) if match else (0, name)
+
+
+class DeckExporter:
+    """
+    PDF (LibreOffice, headless) and PNG per slide (pdftoppm from the PDF)
+
+    Conversions are cached under cache.directory by deck fingerprint and
+    export settings, so an unchanged deck is copied from the cache instead
+    of converted again. Several decks are converted at once on up to
+    `workers` threads; each runs its own LibreOffice process with a
+    separate user profile, as soffice instances sharing one profile block
+    each other.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        export_config = config.get('export', {}) or {}
+        cache_config = export_config.get('cache', {}) or {}
+        self.formats = [f for f in (export_config.get('formats') or FORMATS) if f in FORMATS]
+        self.directory = export_config.get('directory', './reports/exports')
+        self.workers = max(1, int(export_config.get('workers', 2)))
+        self.timeout = float(export_config.get('timeout', 180))
+        self.png_dpi = int(export_config.get('png_dpi', 96))
+        self.png_max_px = int(export_config.get('png_max_px', 1600) or 0)
+        self.soffice = export_config.get('soffice', 'soffice')
+        self.pdftoppm = export_config.get('pdftoppm', 'pdftoppm')
+        self.cache_dir = cache_config.get('directory', 'data/export_cache')
+        self.cache_max_entries = int(cache_config.get('max_entries', 20))
+
+        # One LibreOffice profile per worker slot, reused between conversions
+        self._profiles: queue.Queue = queue.Queue()
+        for slot in range(self.workers):
+            self._profiles.put(os.path.abspath(os.path.join(self.cache_dir, 'profiles', str(slot))))
+
+    def missing_tools(self) -> List[str]:
+        """Converters needed for the configured formats that are not installed"""
+        tools = [self.soffice]
+        if 'png' in self.formats:
+            tools.append(self.pdftoppm)
+        return [tool for tool in tools if shutil.which(tool) is None]
+
+    def export(self, deck_path: str) -> Dict[str, Any]:
+        """
+        Export one deck to <directory>/<deck name>/
+
+        Returns:
+            Dictionary with deck, fingerprint, cached, pdf (path), png
+            (paths in slide order), timings (seconds per format) and seconds
+        """
+        started = time.perf_counter()
+        fingerprint = deck_fingerprint(deck_path)
+        entry = os.path.join(self.cache_dir, self._cache_key(fingerprint))
+        timings: Dict[str, float] = {}
+        cached = os.path.isdir(entry)
+
+        if cached:
+            os.utime(entry)  # most recently used, for cache pruning
+        else:
+            missing = self.missing_tools()
+            if missing:
+                raise ExportError(f"Converter not found: {', '.join(missing)}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            work = tempfile.mkdtemp(dir=self.cache_dir, prefix='.convert-')
+            try:
+                with span('export.pdf') as pdf_span:
+                    pdf = self._convert_pdf(deck_path, work)
+                timings['pdf'] = pdf_span['seconds']
+                if 'png' in self.formats:
+                    with span('export.png') as png_span:
+                        self._convert_png(pdf, work)
+                    timings['png'] = png_span['seconds']
+                if 'pdf' not in self.formats:
+                    os.remove(pdf)
+                try:
+                    os.rename(work, entry)
+                except OSError:
+                    shutil.rmtree(work)  # converted concurrently by another run
+            except BaseException:
+                shutil.rmtree(work, ignore_errors=True)
+                raise
+            self._prune_cache()
+
+        result = self._publish(entry, deck_path)
+        result.update({
+            'fingerprint': fingerprint,
+            'cached': cached,
+            'timings': {fmt: round(seconds, 3) for fmt, seconds in timings.items()},
+            'seconds': round(time.perf_counter() - started, 3),
+        })
+        return result
+
+    def export_many(self, deck_paths: List[str]) -> List[Dict[str, Any]]:
+        """Export several decks on the worker pool; failures are returned with an 'error'"""
+        def run(path):
+            try:
+                return self.export(path)
+            except Exception as e:
+                return {'deck': path, 'error': f"{type(e).__name__}: {e}"}
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(deck_paths) or 1),
+                                thread_name_prefix='export') as pool:
+            return list(pool.map(run, deck_paths))
+
+    def remove_exports(self, deck_path: str):
+        """Delete the exported files of a deck (e.g. when retention removes it)"""
+        shutil.rmtree(self._target_dir(deck_path), ignore_errors=True)
+
+    def _convert_pdf(self, deck_path: str, work: str) -> str:
+        profile = self._profiles.get()
+        try:
+            self._run([
+                self.soffice, '--headless', '--norestore', '--nolockcheck', '--nodefault',
+                f"-env:UserInstallation={Path(profile).as_uri()}",
+                '--convert-to', 'pdf', '--outdir', work, os.path.abspath(deck_path)
+            ])
+        finally:
+            self._profiles.put(profile)
+
+        pdf = os.path.join(work, Path(deck_path).stem + '.pdf')
+        if not os.path.exists(pdf):
+            raise ExportError(f"LibreOffice produced no PDF for {deck_path}")
+        final = os.path.join(work, 'deck.pdf')
+        os.rename(pdf, final)
+        return final
+
+    def _convert_png(self, pdf: str, work: str):
+        command = [self.pdftoppm, '-png', '-r', str(self.png_dpi)]
+        if self.png_max_px:
+            command += ['-scale-to', str(self.png_max_px)]
+        self._run(command + [pdf, os.path.join(work, 'slide')])
+
+        # pdftoppm pads page numbers to the page count's width; use at least
+        # two digits, and as many as the page count has so names sort in order
+        pages = {}
+        for name in os.listdir(work):
+            match = _SLIDE_PNG.fullmatch(name)
+            if match:
+                pages[name] = int(match.group(1))
+        width = max([2] + [len(str(page)) for page in pages.values()])
+        for name, page in pages.items():
+            os.rename(os.path.join(work, name), os.path.join(work, f"slide-{page:0{width}d}.png"))
+
+    def _run(self, command: List[str]):
+        try:
+            completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise ExportError(f"{os.path.basename(command[0])} timed out after {self.timeout:g}s")
+        except FileNotFoundError:
+            raise ExportError(f"Converter not found: {command[0]}")
+        if completed.returncode != 0:
+            detail = completed.stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise ExportError(f"{os.path.basename(command[0])} failed ({completed.returncode})"
+                              + (f": {detail[-1]}" if detail else ''))
+
+    def _publish(self, entry: str, deck_path: str) -> Dict[str, Any]:
+        """Link (or copy) a cache entry to the deck's export directory"""
+        target = self._target_dir(deck_path)
+        stem = Path(deck_path).stem
+        shutil.rmtree(target, ignore_errors=True)
+        os.makedirs(target)
+
+        result: Dict[str, Any] = {'deck': deck_path, 'pdf': None, 'png': []}
+        for name in sorted(os.listdir(entry), key=_slide_order):
+            if name == 'deck.pdf':
+                destination = os.path.join(target, stem + '.pdf')
+                result['pdf'] = destination
+            else:
+                destination = os.path.join(target, name)
+                result['png'].append(destination)
+            try:
+                os.link(os.path.join(entry, name), destination)
+            except OSError:
+                shutil.copy2(os.path.join(entry, name), destination)
+        return result
+
+    def _target_dir(self, deck_path: str) -> str:
+        return os.path.join(self.directory, Path(deck_path).stem)
+
+    def _cache_key(self, fingerprint: str) -> str:
+        settings = json.dumps([fingerprint, sorted(self.formats), self.png_dpi, self.png_max_px])
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:32]
+
+    def _prune_cache(self):
+        """Keep the cache_max_entries most recently used conversions"""
+        entries = [e for e in os.scandir(self.cache_dir)
+                   if e.is_dir() and not e.name.startswith('.') and e.name != 'profiles']
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for stale in entries[self.cache_max_entries:]:
+            shutil.rmtree(stale.path, ignore_errors=True)
+
+
+def format_export(result: Dict[str, Any]) -> str:
+    """One-line summary of an export result"""
+    name = os.path.basename(result['deck'])
+    if result.get('error'):
+        return f"{name}: export failed: {result['error']}"
+    parts = []
+    if result['pdf']:
+        parts.append('pdf' + (f" {result['timings']['pdf']:.2f}s" if 'pdf' in result['timings'] else ''))
+    if result['png']:
+        parts.append(f"{len(result['png'])} png" + (f" {result['timings']['png']:.2f}s"
+                                                      if 'png' in result['timings'] else ''))
+    source = 'from cache' if result['cached'] else 'converted'
+    return f"{name}: {', '.join(parts)} ({source}, {result['seconds']:.2f}s)"
+
+
+def open_exporter(config: Dict[str, Any]) -> Optional[DeckExporter]:
+    """Exporter from config.yaml export.*, or None when disabled"""
+    if not (config.get('export', {}) or {}).get('enabled', False):
+        return None
+    return DeckExporter(config)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export decks to PDF and per-slide PNG')
+    parser.add_argument('decks', nargs='+', help='.pptx files')
+    parser.add_argument('--config', default='config/config.yaml', help='Settings from export.* (optional)')
+    parser.add_argument('--formats', help='Comma-separated: pdf,png')
+    parser.add_argument('--workers', type=int, help='Decks converted at the same time')
+    args = parser.parse_args()
+
+    settings: Dict[str, Any] = {}
+    if os.path.exists(args.config):
+        import yaml
+        with open(args.config, 'r', encoding='utf-8') as f:
+            settings = dict((yaml.safe_load(f) or {}).get('export') or {})
+    if args.formats:
+        settings['formats'] = args.formats.split(',')
+    if args.workers:
+        settings['workers'] = args.workers
+
+    exporter = DeckExporter({'export': settings})
+    started = time.perf_counter()
+    results = exporter.export_many(args.decks)
+    for export_result in results:
+        print(format_export(export_result))
+    print(f"{len(results)} deck(s) in {time.perf_counter() - started:.2f}s with {exporter.workers} worker(s)")
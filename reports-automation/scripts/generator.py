@@ -5,9 +5,51 @@ Generates weekly reports in PowerPoint format while preserving formatting
 
 from pptx import Presentation
 from pptx.util import Inches, Pt
-from datetime import datetime
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from io import BytesIO
+from typing import Dict, Any, List, Optional, Set
 import os
+import time
+
+from template_index import PlaceholderIndex, PLACEHOLDER_PATTERN
+from template_cache import get_template_cache
+from table_binding import TableBinding
+from chart_binding import chart_bindings
+from metrics import add_metrics, inputs_key as metrics_inputs_key
+from report_model import ReportData, Tckt, Ops, KinhDoanh, parse_report, ReportValidationError
+from instrumentation import span
+from deck_optimizer import optimize_package, format_stats, write_atomic
+from output_catalog import open_catalog, render_key
+from incremental import (section_fingerprints, changed_sections, load_manifest, write_manifest,
+                         manifest_path, splice_slides, slide_partnames, RENDERED_SECTION)
+
+
+# Data location of each placeholder key in config.yaml template.placeholders
+PLACEHOLDER_SOURCES = {
+    'total_receivables': ('tckt', 'overview', 'receivables', 'total'),
+    'within_term_receivables': ('tckt', 'overview', 'receivables', 'within_term'),
+    'overdue_receivables': ('tckt', 'overview', 'receivables', 'overdue'),
+    'total_payables': ('tckt', 'overview', 'payables', 'total'),
+    'within_term_payables': ('tckt', 'overview', 'payables', 'within_term'),
+    'overdue_payables': ('tckt', 'overview', 'payables', 'overdue'),
+    'current_month_cash': ('tckt', 'overview', 'cash_flow', 'current_month'),
+    'previous_month_cash': ('tckt', 'overview', 'cash_flow', 'previous_month'),
+    'report_week': ('metadata', 'week'),
+    'overdue_receivables_pct': ('metrics', 'tckt', 'overdue_receivables_pct'),
+    'overdue_payables_pct': ('metrics', 'tckt', 'overdue_payables_pct'),
+    'cash_flow_delta': ('metrics', 'tckt', 'cash_flow_delta'),
+    'utilization_pct': ('metrics', 'kinh_doanh', 'utilization_pct'),
+    'fo_over_pct': ('metrics', 'tong_quan_tau', 'fo_over_pct'),
+}
+
+# Placeholder keys computed at render time rather than read from the data
+RENDERED_PLACEHOLDERS = ('report_date', 'generated_date')
+
+# Data section filled into each table configured under template.tables
+TABLE_SECTIONS = {
+    'ship_schedule': 'ops',
+}
 
 
 class WeeklyReportGenerator:
@@ -18,41 +60,145 @@ class WeeklyReportGenerator:
         self.template_path = config.get('template', {}).get('path', './templates/weekly_report_template.pptx')
         self.output_dir = config.get('output', {}).get('directory', './reports')
         self.filename_pattern = config.get('output', {}).get('filename_pattern', 'VLines_Weekly_Report_{date}.pptx')
-
-    def generate_report(self, data: Dict[str, Any]) -> str:
+        self.placeholders = config.get('template', {}).get('placeholders', {}) or {}
+        self.charts = chart_bindings(config.get('template', {}).get('charts'))
+        self.last_placeholder_report: Dict[str, Any] = {}
+        self.template_cache = get_template_cache(config.get('template', {}).get('cache_size', 4))
+        self.incremental = config.get('output', {}).get('incremental', False)
+        self.optimize = config.get('output', {}).get('optimize', {}) or {}
+        self.validation = config.get('validation', {}) or {}
+        self.last_render_summary: Dict[str, Any] = {}
+
+    def generate_report(self, data: Dict[str, Any], name: Optional[str] = None) -> str:
         """
         Generate PowerPoint report from data
 
         Args:
             data: Dictionary containing all report data
+            name: Optional variant name added to the output filename
 
         Returns:
             Path to generated PowerPoint file
         """
+        started = time.perf_counter()
+        data = dict(data)  # KPIs are added to this copy, not to the caller's data
         try:
-            # Load template
-            if os.path.exists(self.template_path):
-                prs = Presentation(self.template_path)
-                print(f"Loaded template: {self.template_path}")
-            else:
-                print(f"Template not found: {self.template_path}")
-                print("Creating blank presentation (create template for production use)")
-                prs = Presentation()
-                self._create_sample_slides(prs, data)
-
-            # Update slides with data
-            self._update_tckt_slide(prs, data.get('tckt', {}))
-            self._update_ops_slide(prs, data.get('ops', {}))
-            self._update_kinh_doanh_slide(prs, data.get('kinh_doanh', {}))
-
-            # Generate output filename
-            output_path = self._get_output_path(data)
+            # Check the data before any template work, so bad data fails fast
+            with span('generate.validate'):
+                report = self.validate_data(data)
+
+            # An identical deck (same data, template, settings, shown dates
+            # and path) is reused as is; the KPI inputs are keyed instead of
+            # computing the KPIs
+            output_path = self._get_output_path(data, name)
+            rendered = self._rendered_values()
+            catalog_key = self._catalog_key(data, rendered, output_path)
+            duplicate = self._find_duplicate(catalog_key, name)
+            if duplicate is not None:
+                print(f"✓ Identical report already generated, render skipped: {duplicate['path']}")
+                self.last_render_summary = {
+                    'mode': 'duplicate',
+                    'duplicate_of': duplicate['path'],
+                    'changed_sections': [],
+                    'skipped_sections': [],
+                    'rebuilt_slides': 0,
+                    'copied_slides': 0,
+                    'timings': {}
+                }
+                return duplicate['path']
+
+            with span('generate.metrics'):
+                metrics = add_metrics(data, self.config)
+            if metrics is not None:
+                # Derived KPIs are data too, so charts can bind to them
+                report.extra['metrics'] = metrics
+
+            fingerprints = section_fingerprints(data, rendered)
+            previous = load_manifest(output_path) if self.incremental else None
+            while True:
+                timings = {}
+
+                with span('generate.load') as load_span:
+                    prs, index, template_key = self._load_template(data)
+                timings['load'] = load_span['seconds']
+                bindings = self._slide_bindings(prs, index)
+
+                # Sections changed since the previous render of this output, or
+                # None for a full render (first run, template edited, no manifest)
+                changed = None
+                if previous is not None and template_key and previous.get('template') == template_key:
+                    changed = changed_sections(previous.get('fingerprints', {}), fingerprints)
+
+                rebuild = None
+                if changed is not None:
+                    rebuild = {i for i, sections in bindings.items() if sections & changed}
+
+                with span('generate.fill') as fill_span:
+                    # Fill all {{...}} placeholders in one pass over the template
+                    with span('generate.placeholders'):
+                        self._fill_placeholders(prs, index, data, slides=rebuild, rendered=rendered)
+
+                    # Update slides with data. Updaters that paginate onto extra
+                    # slides always run, so the slide structure matches the previous
+                    # render even when their section is unchanged.
+                    template_slides = slide_partnames(prs)
+                    paginated = self._paginated_sections()
+                    for section, updater in self._section_updaters():
+                        if changed is None or section in changed or section in paginated:
+                            with span('generate.update', section=section):
+                                updater(prs, getattr(report, section))
+                    with span('generate.charts'):
+                        self._update_charts(prs, report, changed)
+                timings['fill'] = fill_span['seconds']
+
+                partnames = slide_partnames(prs)
+                bindings = self._inherit_bindings(bindings, template_slides, partnames)
+                if changed is not None:
+                    rebuild = {i for i, sections in bindings.items() if sections & changed}
+                if changed is None or partnames == previous.get('slides'):
+                    break
+                # Slide structure differs (e.g. a table paginated differently):
+                # render again in full, keeping the key computed above
+                print("Slide layout changed since last render, rebuilding all slides")
+                self._invalidate_manifest(output_path)
+                previous = None
 
             # Ensure output directory exists
             os.makedirs(self.output_dir, exist_ok=True)
 
-            # Save presentation
-            prs.save(output_path)
+            # Save presentation (through a temp file, so the previous deck
+            # stays intact until the new one is complete)
+            with span('generate.save', slides=len(partnames)) as save_span:
+                buffer = BytesIO()
+                prs.save(buffer)
+                package = buffer.getvalue()
+                copied = []
+                if changed is not None:
+                    copied = [partnames[i] for i in range(len(partnames)) if i not in rebuild]
+                    package = splice_slides(package, output_path, copied)
+                optimize_stats = None
+                if self.optimize.get('enabled', False):
+                    with span('generate.optimize') as optimize_span:
+                        package, optimize_stats = optimize_package(package, self.optimize)
+                        optimize_span.update(optimize_stats)
+                    print(f"Optimized deck: {format_stats(optimize_stats)}")
+                write_atomic(output_path, package)
+                save_span['output_bytes'] = len(package)
+            timings['save'] = save_span['seconds']
+
+            if template_key:
+                write_manifest(output_path, {
+                    'template': template_key,
+                    'fingerprints': fingerprints,
+                    'slides': partnames,
+                    'bindings': {str(i): sorted(s) for i, s in bindings.items()}
+                })
+
+            self._report_render_summary(changed, fingerprints, partnames, copied, timings)
+            if optimize_stats is not None:
+                self.last_render_summary['optimize'] = optimize_stats
+            self._catalog_output(output_path, fingerprints, catalog_key, time.perf_counter() - started,
+                                 data, name)
             print(f"✓ Report generated successfully: {output_path}")
 
             return output_path
@@ -61,44 +207,399 @@ class WeeklyReportGenerator:
             print(f"✗ Error generating report: {e}")
             raise
 
-    def _update_tckt_slide(self, prs: Presentation, tckt_data: Dict[str, Any]):
+    def validate_data(self, data: Dict[str, Any]) -> ReportData:
+        """
+        Build the typed report model from the data
+
+        Raises ReportValidationError listing every problem, unless
+        validation.enabled is false, in which case the problems are printed
+        and the fields concerned are left empty.
+        """
+        report, errors = parse_report(data, self.validation.get('required_sections', ['metadata']))
+        if errors:
+            if self.validation.get('enabled', True):
+                raise ReportValidationError(errors)
+            print(f"  ! {len(errors)} data problem(s), rendering anyway:")
+            for error in errors:
+                print(f"    - {error}")
+        return report
+
+    def _load_template(self, data: Dict[str, Any]):
+        """
+        Load the template from the cache, or build sample slides without one
+
+        Returns:
+            Tuple of (Presentation, PlaceholderIndex, template key or None)
+        """
+        if os.path.exists(self.template_path):
+            misses = self.template_cache.misses
+            prs, index = self.template_cache.load(self.template_path)
+            source = 'parsed' if self.template_cache.misses > misses else 'cached'
+            print(f"Loaded template: {self.template_path} ({source})")
+            return prs, index, self.template_cache.key_for(self.template_path)[2]
+
+        print(f"Template not found: {self.template_path}")
+        print("Creating blank presentation (create template for production use)")
+        prs = Presentation()
+        self._create_sample_slides(prs, data)
+        return prs, PlaceholderIndex.build(prs), None
+
+    def _catalog_key(self, data: Dict[str, Any], rendered: Dict[str, str],
+                     output_path: str) -> Optional[str]:
+        """
+        render_key of this render for the output catalog (None when the catalog is off)
+
+        Of the rendered dates only those the template shows are keyed, so a
+        template without {{generated_date}} still matches later the same day.
+        """
+        if not (self.config.get('output', {}).get('catalog', {}) or {}).get('enabled', False):
+            return None
+        template_key = None
+        shown = rendered  # sample slides show the generation time
+        if os.path.exists(self.template_path):
+            template_key = self.template_cache.key_for(self.template_path)[2]
+            names = set(self.template_cache.index(self.template_path).names)
+            shown = {key: value for key, value in rendered.items()
+                     if self._placeholder_name(key) in names}
+        return render_key(section_fingerprints(data, shown), template_key, self.config,
+                          metrics_inputs_key(data, self.config), target=os.path.abspath(output_path))
+
+    def _placeholder_name(self, key: str) -> Optional[str]:
+        """Token name (without braces) of a template.placeholders key"""
+        match = PLACEHOLDER_PATTERN.fullmatch(str(self.placeholders.get(key, '')).strip())
+        return match.group(1) if match else None
+
+    def _find_duplicate(self, key: Optional[str], name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Catalog entry of an intact deck rendered with the same key, if skipping is on"""
+        catalog_config = self.config.get('output', {}).get('catalog', {}) or {}
+        if key is None or not catalog_config.get('skip_duplicates', True):
+            return None
+        catalog = open_catalog(self.config)
+        if catalog is None:
+            return None
+        with catalog:
+            entry = catalog.find(key, name)
+            if entry is not None:
+                catalog.touch(entry['path'])
+        return entry
+
+    def _catalog_output(self, output_path: str, fingerprints: Dict[str, str], key: Optional[str],
+                        seconds: float, data: Dict[str, Any], name: Optional[str]):
+        catalog = open_catalog(self.config) if key is not None else None
+        if catalog is None:
+            return
+        with catalog:
+            catalog.record(output_path, fingerprints, key, seconds,
+                           week=(data.get('metadata') or {}).get('week'), name=name)
+
+    def _section_updaters(self):
+        """Slide updaters for non-placeholder content, by data section"""
+        return [
+            ('tckt', self._update_tckt_slide),
+            ('ops', self._update_ops_slide),
+            ('kinh_doanh', self._update_kinh_doanh_slide),
+        ]
+
+    def _slide_bindings(self, prs: Presentation, index: PlaceholderIndex) -> Dict[int, Set[str]]:
+        """
+        Data sections each slide depends on
+
+        Derived from the placeholders on the slide, plus template.slide_sections
+        (1-based slide number -> section list) for slides filled by updaters,
+        such as tables and charts.
+        """
+        bindings: Dict[int, Set[str]] = {i: set() for i in range(len(prs.slides))}
+
+        token_sections = {}
+        for key, token in self.placeholders.items():
+            match = PLACEHOLDER_PATTERN.fullmatch(str(token).strip())
+            if match and key in RENDERED_PLACEHOLDERS:
+                token_sections[match.group(1)] = RENDERED_SECTION
+            elif match:
+                token_sections[match.group(1)] = PLACEHOLDER_SOURCES.get(key, ('metadata',))[0]
+
+        for name, locations in index.locations.items():
+            section = token_sections.get(name) or (name.split('.')[0] if '.' in name else None)
+            if section:
+                for loc in locations:
+                    bindings[loc.slide].add(section)
+
+        for slide_no, sections in (self.config.get('template', {}).get('slide_sections') or {}).items():
+            if isinstance(sections, str):
+                sections = [sections]
+            if 0 < int(slide_no) <= len(bindings):
+                bindings[int(slide_no) - 1].update(sections)
+
+        for table, section in TABLE_SECTIONS.items():
+            table_config = self._table_config(table)
+            if table_config:
+                slide_index = TableBinding.from_config(table_config).slide_index(prs)
+                if slide_index is not None:
+                    bindings[slide_index].add(section)
+
+        for chart in self.charts:
+            slide_index = chart.slide_index(prs)
+            if slide_index is not None:
+                bindings[slide_index].add(chart.section)
+
+        return bindings
+
+    @staticmethod
+    def _inherit_bindings(bindings: Dict[int, Set[str]], template_slides: List[str],
+                          partnames: List[str]) -> Dict[int, Set[str]]:
+        """
+        Re-key slide bindings after updaters inserted slides
+
+        Inserted (continuation) slides take the bindings of the slide before them.
+        """
+        by_partname = {name: bindings[i] for i, name in enumerate(template_slides)}
+        result: Dict[int, Set[str]] = {}
+        for i, name in enumerate(partnames):
+            inherited = result[i - 1] if i else set()
+            result[i] = set(by_partname.get(name, inherited))
+        return result
+
+    def _paginated_sections(self) -> Set[str]:
+        """Sections whose tables may add continuation slides"""
+        return {
+            section for table, section in TABLE_SECTIONS.items()
+            if (self._table_config(table) or {}).get('rows_per_slide')
+        }
+
+    def _table_config(self, table: str) -> Optional[Dict[str, Any]]:
+        return (self.config.get('template', {}).get('tables') or {}).get(table)
+
+    def _report_render_summary(self, changed: Optional[Set[str]], fingerprints: Dict[str, str],
+                               partnames: List[str], copied: List[str],
+                               timings: Optional[Dict[str, float]] = None):
+        """Record and print what an (incremental) render rebuilt and skipped"""
+        if changed is None:
+            summary = {
+                'mode': 'full',
+                'changed_sections': sorted(fingerprints),
+                'skipped_sections': [],
+                'rebuilt_slides': len(partnames),
+                'copied_slides': 0
+            }
+        else:
+            summary = {
+                'mode': 'incremental',
+                'changed_sections': sorted(changed),
+                'skipped_sections': sorted(set(fingerprints) - changed),
+                'rebuilt_slides': len(partnames) - len(copied),
+                'copied_slides': len(copied)
+            }
+            print(f"Incremental render: rebuilt {summary['rebuilt_slides']}/{len(partnames)} slides, "
+                  f"copied {summary['copied_slides']} unchanged")
+            if summary['skipped_sections']:
+                print(f"  - Unchanged sections skipped: {', '.join(summary['skipped_sections'])}")
+        summary['timings'] = {stage: round(seconds, 4) for stage, seconds in (timings or {}).items()}
+        self.last_render_summary = summary
+
+    @staticmethod
+    def _invalidate_manifest(output_path: str):
+        if os.path.exists(manifest_path(output_path)):
+            os.remove(manifest_path(output_path))
+
+    def generate_batch(self, specs: List[Dict[str, Any]],
+                       max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render many reports on a process pool
+
+        Each spec is a dict with 'name', 'data' and optionally 'sections'
+        (only those sections are kept) and 'filename'. A spec that fails,
+        or that arrives with an 'error' instead of 'data', is reported as
+        failed without stopping the rest of the batch.
+
+        Args:
+            specs: Report specs to render
+            max_workers: Pool size; defaults to config batch.workers.
+                1 renders in-process without a pool.
+
+        Returns:
+            Dictionary with per-report results and batch statistics
+        """
+        if max_workers is None:
+            max_workers = self.config.get('batch', {}).get('workers') or os.cpu_count() or 1
+        max_workers = max(1, min(int(max_workers), len(specs) or 1))
+
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = [None] * len(specs)
+        print(f"Rendering {len(specs)} reports with {max_workers} worker(s)...")
+
+        if max_workers == 1:
+            for i, spec in enumerate(specs):
+                results[i] = _render_batch_spec(self.config, spec, i)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(_render_batch_spec, self.config, spec, i): i
+                    for i, spec in enumerate(specs)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        # Worker process died (e.g. killed, unpicklable spec)
+                        results[i] = _batch_result(specs[i], i, error=e)
+
+        wall = time.perf_counter() - started
+        succeeded = sum(1 for r in results if r['status'] == 'success')
+        summary = {
+            'reports': results,
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'workers': max_workers,
+            'wall_seconds': round(wall, 3),
+            'render_seconds': round(sum(r['seconds'] for r in results), 3),
+            'reports_per_minute': round(len(results) / wall * 60, 2) if wall > 0 else 0.0
+        }
+
+        for r in results:
+            mark = '✓' if r['status'] == 'success' else '✗'
+            detail = r['output_path'] if r['status'] == 'success' else r['error']
+            print(f"  {mark} {r['name']} ({r['seconds']:.2f}s): {detail}")
+        print(f"Batch finished: {succeeded}/{len(results)} succeeded in {wall:.2f}s "
+              f"({summary['reports_per_minute']} reports/min)")
+
+        return summary
+
+    def _fill_placeholders(self, prs: Presentation, index: PlaceholderIndex, data: Dict[str, Any],
+                           slides: Optional[Set[int]] = None, rendered: Optional[Dict[str, str]] = None):
+        """Substitute every indexed placeholder and report the leftovers"""
+        values = self._resolve_placeholder_values(data, index, rendered)
+        report = index.render(prs, values, slides=slides)
+        self.last_placeholder_report = report
+
+        filled = len(index.names) - len(report['unresolved'])
+        print(f"Filled {filled}/{len(index.names)} placeholders")
+        if report['unresolved']:
+            print(f"  ! Unresolved placeholders: {', '.join(report['unresolved'])}")
+        if report['unused']:
+            print(f"  - Unused placeholder values: {', '.join(report['unused'])}")
+
+    def _resolve_placeholder_values(self, data: Dict[str, Any],
+                                    index: Optional[PlaceholderIndex] = None,
+                                    rendered: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Resolve placeholder values from report data
+
+        Keys come from config.yaml template.placeholders; placeholders
+        written as a dotted data path (e.g. {{tckt.overview.receivables.total}})
+        are resolved directly against the data.
+
+        Returns:
+            Placeholder name (without braces) -> formatted value
+        """
+        computed = rendered if rendered is not None else self._rendered_values()
+
+        values = {}
+        for key, token in self.placeholders.items():
+            match = PLACEHOLDER_PATTERN.fullmatch(str(token).strip())
+            if not match:
+                continue
+            if key in computed:
+                values[match.group(1)] = computed[key]
+            elif key in PLACEHOLDER_SOURCES:
+                value = self._lookup(data, PLACEHOLDER_SOURCES[key])
+                if value is not None:
+                    values[match.group(1)] = self._format_value(value)
+
+        if index is not None:
+            for name in index.names:
+                if '.' in name and name not in values:
+                    value = self._lookup(data, name.split('.'))
+                    if value is not None:
+                        values[name] = self._format_value(value)
+
+        return values
+
+    @staticmethod
+    def _rendered_values() -> Dict[str, str]:
+        """Values of RENDERED_PLACEHOLDERS for a render starting now"""
+        now = datetime.now()
+        return {
+            'report_date': now.strftime('%Y-%m-%d'),
+            'generated_date': now.strftime('%Y-%m-%d %H:%M'),
+        }
+
+    @staticmethod
+    def _lookup(data: Dict[str, Any], path) -> Any:
+        """Follow a key path through nested dicts, None if any key is missing"""
+        node = data
+        for key in path:
+            if not isinstance(node, dict) or key not in node:
+                return None
+            node = node[key]
+        return node
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        """Format a data value for display in a slide"""
+        if isinstance(value, bool):
+            return str(value)
+        if isinstance(value, int):
+            return f"{value:,}"
+        if isinstance(value, float):
+            return f"{value:,.2f}".rstrip('0').rstrip('.')
+        if isinstance(value, list):
+            return ', '.join(str(v) for v in value)
+        return str(value)
+
+    def _update_tckt_slide(self, prs: Presentation, tckt: Optional[Tckt]):
         """Update TCKT (Accounting) slide with data"""
         print("Updating TCKT slide...")
 
-        # If you have a template, you would find shapes by name and update them
-        # Example approach for template-based updates:
-        # for slide in prs.slides:
-        #     for shape in slide.shapes:
-        #         if shape.has_text_frame:
-        #             self._replace_text_in_runs(shape, '{{TOTAL_RECEIVABLES}}',
-        #                                       f"{tckt_data.get('overview', {}).get('receivables', {}).get('total', 0):,}")
-
-        # For now, just log the data that would be updated
-        overview = tckt_data.get('overview', {})
-        if overview:
-            receivables = overview.get('receivables', {})
-            print(f"  - Total Receivables: {receivables.get('total', 0):,}")
-            print(f"  - Within Term: {receivables.get('within_term', 0):,}")
-            print(f"  - Overdue: {receivables.get('overdue', 0):,}")
-
-    def _update_ops_slide(self, prs: Presentation, ops_data: Dict[str, Any]):
+        # Text placeholders such as {{TOTAL_RECEIVABLES}} are already filled by
+        # _fill_placeholders; this hook is for non-text content (tables, charts)
+
+        # For now, just log the data that was filled
+        receivables = tckt.overview.receivables if tckt and tckt.overview else None
+        if receivables:
+            print(f"  - Total Receivables: {receivables.total or 0:,}")
+            print(f"  - Within Term: {receivables.within_term or 0:,}")
+            print(f"  - Overdue: {receivables.overdue or 0:,}")
+
+    def _update_ops_slide(self, prs: Presentation, ops: Optional[Ops]):
         """Update OPS (Operations) slide with ship schedule data"""
         print("Updating OPS slide...")
 
-        ship_schedule = ops_data.get('ship_schedule', [])
+        ship_schedule = [row for row in (ops.ship_schedule if ops else None) or [] if row is not None]
         print(f"  - Processing {len(ship_schedule)} ships")
 
-        # Template-based update would go here
-        # You would find the table shape and update cells
+        table_config = self._table_config('ship_schedule')
+        if not table_config:
+            return
+
+        result = TableBinding.from_config(table_config).fill(prs, ship_schedule)
+        if 'error' in result:
+            print(f"  ! Ship schedule table skipped: {result['error']}")
+        else:
+            print(f"  - Wrote {result['rows']} rows on {result['slides']} slide(s)")
+
+    def _update_charts(self, prs: Presentation, report: ReportData, changed: Optional[Set[str]]):
+        """Replace the data of native charts bound under template.charts"""
+        charts = [c for c in self.charts if changed is None or c.section in changed]
+        if not charts:
+            return
 
-    def _update_kinh_doanh_slide(self, prs: Presentation, kinh_doanh_data: Dict[str, Any]):
+        print("Updating charts...")
+        for chart in charts:
+            result = chart.fill(prs, report)
+            if 'error' in result:
+                print(f"  ! Chart {chart.shape_name} skipped: {result['error']}")
+            else:
+                print(f"  - {chart.shape_name}: {result['series']} series x {result['categories']} points")
+
+    def _update_kinh_doanh_slide(self, prs: Presentation, kinh_doanh: Optional[KinhDoanh]):
         """Update Kinh Doanh (Business) slide with market data"""
         print("Updating Kinh Doanh slide...")
 
-        market_overview = kinh_doanh_data.get('market_overview', {})
-        if market_overview:
-            hph_hcm = market_overview.get('hph_hcm_route', {})
-            print(f"  - HPH-HCM VLines share: {hph_hcm.get('vlines_share', 0)}%")
+        hph_hcm = (kinh_doanh.market_overview or {}).get('hph_hcm_route') if kinh_doanh else None
+        if hph_hcm:
+            print(f"  - HPH-HCM VLines share: {hph_hcm.vlines_share or 0}%")
 
     def _replace_text_in_runs(self, shape, old_text: str, new_text: str):
         """
@@ -145,16 +646,31 @@ class WeeklyReportGenerator:
         p.text = "Create a template file (weekly_report_template.pptx) for production use"
         p.level = 1
 
-    def _get_output_path(self, data: Dict[str, Any]) -> str:
-        """Generate output file path"""
+    def _get_output_path(self, data: Dict[str, Any], name: Optional[str] = None) -> str:
+        """
+        Generate output file path
+
+        {date} is today, except for data re-rendered from the snapshot store
+        (backfills), where it is the Monday of the report's week, so a
+        backfill never replaces the deck generated today.
+        """
+        metadata = data.get('metadata', {})
+        week = metadata.get('week', 'unknown')
         date_str = datetime.now().strftime('%Y-%m-%d')
-        week = data.get('metadata', {}).get('week', 'unknown')
+        if metadata.get('from_snapshot'):
+            date_str = _week_start(week) or str(week)
 
         filename = self.filename_pattern.format(
             date=date_str,
-            week=week
+            week=week,
+            name=name or ''
         )
 
+        # Variants must not overwrite each other when the pattern has no {name}
+        if name and '{name}' not in self.filename_pattern:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{name}{ext}"
+
         return os.path.join(self.output_dir, filename)
 
     def _format_currency(self, value: int) -> str:
@@ -162,6 +678,59 @@ class WeeklyReportGenerator:
         return f"{value:,} VNĐ"
 
 
+def _week_start(week: Any) -> Optional[str]:
+    """Monday of an ISO week ('YYYY-Www') as YYYY-MM-DD, None if not a week"""
+    try:
+        year, number = str(week).split('-W')
+        return date.fromisocalendar(int(year), int(number), 1).isoformat()
+    except ValueError:
+        return None
+
+
+def _batch_result(spec: Any, position: int, output_path: Optional[str] = None,
+                  error: Optional[Exception] = None, seconds: float = 0.0) -> Dict[str, Any]:
+    """Result record for one report of a batch"""
+    name = spec.get('name') if isinstance(spec, dict) else None
+    return {
+        'name': name or f"report_{position + 1}",
+        'status': 'failed' if error is not None else 'success',
+        'output_path': output_path,
+        'error': f"{type(error).__name__}: {error}" if error is not None else None,
+        'seconds': round(seconds, 3)
+    }
+
+
+def _render_batch_spec(config: Dict[str, Any], spec: Any, position: int) -> Dict[str, Any]:
+    """Render one batch spec (runs inside a pool worker)"""
+    started = time.perf_counter()
+    try:
+        if not isinstance(spec, dict):
+            raise ValueError(f"Report spec must be a mapping, got {type(spec).__name__}")
+        if spec.get('error'):
+            raise RuntimeError(spec['error'])
+        data = spec.get('data')
+        if not isinstance(data, dict):
+            raise ValueError("Report spec has no data")
+
+        sections = spec.get('sections')
+        if sections:
+            data = {key: value for key, value in data.items()
+                    if key == 'metadata' or key in sections}
+
+        generator = WeeklyReportGenerator(config)
+        name = spec.get('name') or f"report_{position + 1}"
+        if spec.get('filename'):
+            # An explicit filename is used as given, without the name suffix
+            generator.filename_pattern = spec['filename']
+            if '{name}' not in spec['filename']:
+                name = None
+        output_path = generator.generate_report(data, name=name)
+        return _batch_result(spec, position, output_path=output_path,
+                             seconds=time.perf_counter() - started)
+    except Exception as e:
+        return _batch_result(spec, position, error=e, seconds=time.perf_counter() - started)
+
+
 if __name__ == "__main__":
     # Test the generator
     from data_fetcher import DataFetcher
@@ -0,0 +1,160 @@
+"""
+HTTP Response Cache
+On-disk cache for API payloads with ETag/Last-Modified revalidation
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class CacheEntry:
+    """One cached response: body plus the validators needed to revalidate it"""
+
+    __slots__ = ('url', 'body', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, url: str, body: bytes, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, stored_at: float = 0.0):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers turning a GET into a conditional request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Size-bounded on-disk cache of HTTP GET responses
+
+    Each URL is stored as <sha256>.body with a <sha256>.json sidecar for the
+    validators. Entries younger than the TTL are served without a request;
+    older ones are revalidated with If-None-Match / If-Modified-Since, and
+    any entry can be served as stale when the backend is unreachable. When
+    the directory grows past max_size_mb the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = 300, max_size_mb: float = 200):
+        self.directory = directory
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_size_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Cached entry for a URL, or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        try:
+            os.utime(meta_path)  # mark as recently used for eviction
+        except FileNotFoundError:
+            pass
+        return CacheEntry(url, body, meta.get('etag'), meta.get('last_modified'),
+                          meta.get('stored_at', 0.0))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if the entry is within the TTL and can be used without a request"""
+        return time.time() - entry.stored_at < self.ttl_seconds
+
+    def store(self, url: str, body: bytes, headers: Dict[str, str]) -> CacheEntry:
+        """Save a 200 response"""
+        entry = CacheEntry(url, body, headers.get('ETag'), headers.get('Last-Modified'), time.time())
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            self._atomic_write(body_path, body)
+            self._write_meta(meta_path, entry)
+            self._evict()
+        return entry
+
+    def revalidated(self, entry: CacheEntry, headers: Dict[str, str]) -> CacheEntry:
+        """Record a 304: the cached body is current again"""
+        entry.etag = headers.get('ETag', entry.etag)
+        entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+        entry.stored_at = time.time()
+        meta_path, _ = self._paths(entry.url)
+        with self._lock:
+            self._write_meta(meta_path, entry)
+        return entry
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def _write_meta(self, meta_path: str, entry: CacheEntry):
+        meta = {
+            'url': entry.url,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'stored_at': entry.stored_at,
+            'size': len(entry.body)
+        }
+        self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def _atomic_write(self, path: str, content: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size limit"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            body_path = meta_path[:-len('.json')] + '.body'
+            try:
+                size = os.path.getsize(body_path) + os.path.getsize(meta_path)
+                used = os.path.getmtime(meta_path)
+            except FileNotFoundError:
+                continue
+            entries.append((used, size, meta_path, body_path))
+            total += size
+
+        for used, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            for path in (meta_path, body_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of entries and bytes on disk"""
+        count = 0
+        size = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.json'):
+                count += 1
+            if os.path.isfile(path):
+                size += os.path.getsize(path)
+        return {'entries': count, 'bytes': size, 'max_bytes': self.max_size_bytes}
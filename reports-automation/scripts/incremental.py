@@ -0,0 +1,151 @@
+"""
+Incremental Re-render
+Section fingerprints and slide-level reuse of a previously generated deck
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import zipfile
+from io import BytesIO
+from typing import Dict, Any, Iterable, List, Optional, Set
+from xml.etree import ElementTree
+
+
+# Sections fingerprinted separately; a slide is rebuilt when one it is bound to changes
+FINGERPRINT_SECTIONS = ('metadata', 'tckt', 'ops', 'kinh_doanh', 'eqc', 'thuong_vu', 'tong_quan_tau',
+                        'metrics')
+
+# Pseudo-section of the values computed at render time (report/generated
+# dates), so slides showing them are rebuilt when the date moves on
+RENDERED_SECTION = 'rendered'
+
+# Metadata keys that change on every fetch without changing report content
+VOLATILE_METADATA = ('generated_at', 'cached_at', 'stale_reason', 'from_snapshot')
+
+# Parts owned by a slide that are copied along with it (shared layouts,
+# masters and media are identical between renders of the same template)
+_SLIDE_OWNED_PREFIXES = ('ppt/charts/', 'ppt/embeddings/')
+
+_RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def section_fingerprints(data: Dict[str, Any],
+                         rendered: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """
+    SHA-256 of each report section's canonical JSON
+
+    Args:
+        data: Report data
+        rendered: Values computed at render time, fingerprinted as the
+            RENDERED_SECTION pseudo-section when given
+
+    Returns:
+        Section name -> hex digest (missing sections hash as null)
+    """
+    fingerprints = {}
+    for section in FINGERPRINT_SECTIONS:
+        value = data.get(section)
+        if section == 'metadata' and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k not in VOLATILE_METADATA}
+        fingerprints[section] = _digest(value)
+    if rendered is not None:
+        fingerprints[RENDERED_SECTION] = _digest(rendered)
+    return fingerprints
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False,
+                           separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def manifest_path(output_path: str) -> str:
+    """Sidecar file storing the fingerprints of a generated deck"""
+    return output_path + '.manifest.json'
+
+
+def load_manifest(output_path: str) -> Optional[Dict[str, Any]]:
+    """Manifest of a previous render, or None if it or its deck is missing"""
+    if not os.path.exists(output_path):
+        return None
+    try:
+        with open(manifest_path(output_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_manifest(output_path: str, manifest: Dict[str, Any]):
+    with open(manifest_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def changed_sections(previous: Dict[str, str], current: Dict[str, str]) -> Set[str]:
+    """Sections whose fingerprint differs (or is new) since the previous render"""
+    return {section for section, digest in current.items() if previous.get(section) != digest}
+
+
+def splice_slides(new_package: bytes, previous_path: str, slide_partnames: Iterable[str]) -> bytes:
+    """
+    Copy unchanged slides from a previous deck into a freshly saved one
+
+    The slide XML, its relationships and the chart/embedding parts it owns
+    are taken byte-for-byte from the previous deck; everything else comes
+    from the new package.
+
+    Args:
+        new_package: Bytes of the newly rendered .pptx
+        previous_path: Previously generated .pptx for the same template
+        slide_partnames: Partnames (e.g. '/ppt/slides/slide3.xml') to reuse
+
+    Returns:
+        Bytes of the merged .pptx
+    """
+    with zipfile.ZipFile(previous_path) as old_zip:
+        old_names = set(old_zip.namelist())
+        reuse: Set[str] = set()
+        for partname in slide_partnames:
+            _collect_owned_parts(old_zip, old_names, partname.lstrip('/'), reuse, top=True)
+
+        out = BytesIO()
+        with zipfile.ZipFile(BytesIO(new_package)) as new_zip, \
+                zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as merged:
+            for info in new_zip.infolist():
+                if info.filename in reuse:
+                    merged.writestr(info, old_zip.read(info.filename))
+                else:
+                    merged.writestr(info, new_zip.read(info.filename))
+
+    return out.getvalue()
+
+
+def _collect_owned_parts(old_zip: zipfile.ZipFile, old_names: Set[str], name: str,
+                         reuse: Set[str], top: bool = False):
+    if name in reuse or name not in old_names:
+        return
+    if not top and not name.startswith(_SLIDE_OWNED_PREFIXES):
+        return
+    reuse.add(name)
+
+    rels_name = _rels_name(name)
+    if rels_name not in old_names:
+        return
+    reuse.add(rels_name)
+
+    base_dir = posixpath.dirname(name)
+    for rel in ElementTree.fromstring(old_zip.read(rels_name)).iter(_RELS_NS + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = posixpath.normpath(posixpath.join(base_dir, rel.get('Target', '')))
+        _collect_owned_parts(old_zip, old_names, target, reuse)
+
+
+def _rels_name(name: str) -> str:
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, '_rels', filename + '.rels')
+
+
+def slide_partnames(prs) -> List[str]:
+    return [str(slide.part.partname) for slide in prs.slides]
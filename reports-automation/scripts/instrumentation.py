@@ -0,0 +1,272 @@
+"""
+Instrumentation
+Structured timing/memory spans for report runs, rotating log file and one-off profiling
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+LOGGER_NAME = 'vlines'
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+
+_local = threading.local()
+
+
+def configure_logging(logging_config: Optional[Dict[str, Any]]) -> logging.Logger:
+    """
+    Send instrumentation records to the configured log file
+
+    Uses logging.file, logging.level, logging.max_size_mb and
+    logging.backup_count from config.yaml. Records are written one JSON
+    object per line. Calling this again replaces the previous file handler.
+
+    Returns:
+        The 'vlines' logger
+    """
+    logging_config = logging_config or {}
+    logger.setLevel(getattr(logging, str(logging_config.get('level', 'INFO')).upper(), logging.INFO))
+    logger.propagate = False
+
+    for handler in list(logger.handlers):
+        if isinstance(handler, RotatingFileHandler):
+            logger.removeHandler(handler)
+            handler.close()
+
+    log_file = logging_config.get('file')
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=int(float(logging_config.get('max_size_mb', 10)) * 1024 * 1024),
+            backupCount=int(logging_config.get('backup_count', 5)),
+            encoding='utf-8'
+        )
+        handler.setFormatter(_JsonFormatter())
+        logger.addHandler(handler)
+    return logger
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            payload.update(fields)
+        else:
+            payload['message'] = record.getMessage()
+        if record.exc_info:
+            payload['traceback'] = ''.join(traceback.format_exception(*record.exc_info))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+@contextmanager
+def run_context(kind: str, **attrs):
+    """
+    Group the spans of one job under a run id
+
+    Yields:
+        List collecting every finished span record of the run
+    """
+    previous = getattr(_local, 'run', None)
+    run = {'run_id': uuid.uuid4().hex[:12], 'kind': kind, 'spans': []}
+    _local.run = run
+    emit('run_start', kind=kind, **attrs)
+    try:
+        with span(kind, **attrs):
+            yield run['spans']
+    finally:
+        _local.run = previous
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a stage and log it as a 'span' record when it ends
+
+    The yielded dict receives 'seconds', 'rss_mb', 'rss_delta_mb' and
+    'status' on exit (plus 'py_peak_mb' while tracemalloc is tracing),
+    so callers can read the duration after the block. Spans nest; each
+    record names its parent, and an outer span's py_peak_mb includes the
+    peaks of the spans inside it.
+    """
+    stack = _stack()
+    record: Dict[str, Any] = {'name': name, 'parent': stack[-1]['name'] if stack else None}
+    record.update(attrs)
+    stack.append(record)
+
+    rss_before = _rss_mb()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        peaks = _peaks()
+        if peaks:
+            # The peak so far belongs to the enclosing span; keep it before resetting
+            peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+        peaks.append(0)
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        yield record
+        record['status'] = 'ok'
+    except BaseException as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['seconds'] = round(time.perf_counter() - started, 4)
+        rss_after = _rss_mb()
+        if rss_after is not None:
+            record['rss_mb'] = rss_after
+            if rss_before is not None:
+                record['rss_delta_mb'] = round(rss_after - rss_before, 1)
+        if tracing:
+            peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            record['py_peak_mb'] = round(peak / 1024 / 1024, 1)
+        stack.pop()
+
+        run = getattr(_local, 'run', None)
+        if run is not None:
+            run['spans'].append(record)
+        emit('span', **record)
+
+
+def emit(event: str, **fields):
+    """Log a structured record (tagged with the current run id)"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    run = getattr(_local, 'run', None)
+    payload = {'event': event}
+    if run is not None:
+        payload['run_id'] = run['run_id']
+    payload.update(fields)
+    logger.info(event, extra={'fields': payload})
+
+
+def log_error(error: BaseException, **fields):
+    """Log an exception with its traceback as an 'error' record"""
+    run = getattr(_local, 'run', None)
+    payload = {'event': 'error', 'error': f"{type(error).__name__}: {error}"}
+    if run is not None:
+        payload['run_id'] = run['run_id']
+    payload.update(fields)
+    logger.error(payload['error'], extra={'fields': payload},
+                 exc_info=(type(error), error, error.__traceback__))
+
+
+def format_spans(spans: List[Dict[str, Any]], parent: Optional[str] = None) -> str:
+    """One-line summary of the spans directly under parent"""
+    parts = [f"{s['name']} {s['seconds']:.2f}s" for s in spans if s.get('parent') == parent]
+    return ', '.join(parts)
+
+
+def profile_run(func: Callable[[], Any], output_dir: str = 'logs',
+                top: int = 30) -> Tuple[Any, str]:
+    """
+    Run func once under cProfile and tracemalloc and write a report
+
+    Writes profile_<timestamp>.prof (load with pstats/snakeviz) and
+    profile_<timestamp>.txt with the top functions by cumulative time and
+    the top allocation sites.
+
+    Returns:
+        Tuple of (func result, path of the text report)
+    """
+    import cProfile
+    import pstats
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    prof_path = os.path.join(output_dir, f"profile_{stamp}.prof")
+    report_path = os.path.join(output_dir, f"profile_{stamp}.txt")
+
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    started = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            result = func()
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    profiler.dump_stats(prof_path)
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(top)
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    allocations = snapshot.statistics('lineno')[:top]
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"Profile of one report run ({datetime.now().isoformat(timespec='seconds')})\n")
+        f.write(f"Wall time: {elapsed:.3f}s (under profiler)\n")
+        f.write(f"Python heap: {current / 1024 / 1024:.1f} MB at end, "
+                f"{peak / 1024 / 1024:.1f} MB peak\n\n")
+        f.write(f"== Top {top} functions by cumulative time ==\n")
+        f.write(stats_text.getvalue())
+        f.write(f"\n== Top {top} allocation sites (live at end of run) ==\n")
+        for stat in allocations:
+            f.write(f"{stat}\n")
+
+    emit('profile', report=report_path, stats=prof_path, seconds=round(elapsed, 3),
+         py_peak_mb=round(peak / 1024 / 1024, 1))
+    return result, report_path
+
+
+def _stack() -> List[Dict[str, Any]]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _peaks() -> List[int]:
+    """tracemalloc peak (bytes) of each open traced span, innermost last"""
+    peaks = getattr(_local, 'peaks', None)
+    if peaks is None:
+        peaks = _local.peaks = []
+    return peaks
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size (peak RSS where the current value is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if os.uname().sysname == 'Darwin' else 1024), 1)
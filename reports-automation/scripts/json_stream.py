@@ -0,0 +1,267 @@
+"""
+Streaming JSON Loader
+Reads only the needed top-level sections of large weekly_data.json / NDJSON exports
+"""
+
+import codecs
+import json
+import mmap
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+
+_WS = re.compile(r'[ \t\r\n]*')
+_NUMBER_CHARS = re.compile(r'[0-9eE.+-]*')
+_DECODER = json.JSONDecoder()
+
+
+def load_sections(path: str, sections: Optional[Iterable[str]] = None,
+                  fmt: str = 'auto', use_mmap: bool = True) -> Dict[str, Any]:
+    """
+    Load the given top-level sections of a JSON or NDJSON file
+
+    JSON documents are read incrementally (memory-mapped by default) and
+    walked one top-level key at a time; unwanted sections are skipped
+    element by element without being kept, so memory stays proportional to
+    the wanted sections rather than the whole document. NDJSON files are
+    read line by line, each line being an object whose keys are deep-merged
+    into the result (dicts merged, lists concatenated), so a ship schedule
+    can be exported as one line per row.
+
+    Args:
+        path: File to read
+        sections: Top-level keys to keep (None keeps everything)
+        fmt: 'json', 'ndjson' or 'auto' (by extension: .ndjson/.jsonl)
+        use_mmap: Read JSON through mmap instead of buffered file reads
+
+    Returns:
+        Dictionary with the requested sections
+    """
+    wanted = set(sections) if sections is not None else None
+    if fmt == 'auto':
+        fmt = 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'json'
+
+    if fmt == 'ndjson':
+        return _load_ndjson(path, wanted)
+    return _load_json_stream(path, wanted, use_mmap)
+
+
+def measure_load(loader: Callable[..., Any], *args, trace_memory: bool = True,
+                 **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run a loader and record parse time and peak Python heap usage
+
+    Args:
+        loader: Function to call with *args/**kwargs
+        trace_memory: Track peak memory with tracemalloc (slows parsing)
+
+    Returns:
+        Tuple of (loader result, stats dict)
+    """
+    stats: Dict[str, Any] = {}
+    already_tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+    started = time.perf_counter()
+    result = loader(*args, **kwargs)
+    stats['parse_seconds'] = round(time.perf_counter() - started, 4)
+
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        stats['peak_memory_bytes'] = peak - baseline
+        if not already_tracing:
+            tracemalloc.stop()
+
+    return result, stats
+
+
+def _load_json_stream(path: str, wanted: Optional[set], use_mmap: bool) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    if os.path.getsize(path) == 0:
+        raise json.JSONDecodeError("Empty file", '', 0)
+
+    with open(path, 'rb') as f:
+        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if use_mmap else f
+        try:
+            reader = _Reader(source)
+            reader.expect('{')
+            if reader.peek() == '}':
+                return result
+
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                keep = wanted is None or key in wanted
+                value = reader.container(keep)
+                if keep:
+                    result[key] = value
+                if reader.expect(',}') == '}':
+                    break
+        finally:
+            if use_mmap:
+                source.close()
+
+    return result
+
+
+class _Reader:
+    """
+    Incremental JSON tokenizer over a file or mmap
+
+    Holds only a sliding window of decoded text. Containers are walked one
+    child at a time and each child is decoded with the C json decoder, so
+    a skipped section never needs more memory than its largest element,
+    and a kept one never needs its full text in memory at once.
+    """
+
+    CHUNK = 1 << 20
+
+    def __init__(self, source):
+        self.source = source
+        self.offset = 0
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._read()
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number running up to the window edge may continue in the
+                # next chunk ('12' of '12.5', '1' of '1e3')
+                truncated = (isinstance(obj, (int, float)) and not isinstance(obj, bool)
+                             and _NUMBER_CHARS.match(self.buf, end).end() == len(self.buf))
+                if not truncated or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read(grow=True)
+
+    def container(self, keep: bool) -> Any:
+        """Walk an object/array child by child; returns it if keep, else None"""
+        opener = self.peek()
+        if opener not in ('{', '['):
+            value = self.value()
+            return value if keep else None
+
+        self.pos += 1
+        closer = '}' if opener == '{' else ']'
+        result: Any = ({} if opener == '{' else []) if keep else None
+
+        if self.peek() == closer:
+            self.pos += 1
+            return result
+
+        while True:
+            if opener == '{':
+                key = self.value()
+                self.expect(':')
+                child = self.value()
+                if keep:
+                    result[key] = child
+            else:
+                child = self.value()
+                if keep:
+                    result.append(child)
+            if self.expect(',' + closer) == closer:
+                return result
+
+    def _read(self, grow: bool = False):
+        """Append the next chunk to the window, dropping consumed text"""
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        # Double the read size for values larger than the window, so a
+        # large child is decoded in O(n) rather than O(n^2) retries
+        size = max(self.CHUNK, len(self.buf)) if grow else self.CHUNK
+
+        if isinstance(self.source, mmap.mmap):
+            chunk = self.source[self.offset:self.offset + size]
+        else:
+            chunk = self.source.read(size)
+        self.offset += len(chunk)
+
+        if not chunk:
+            self.eof = True
+            self.buf += self._utf8.decode(b'', final=True)
+        else:
+            self.buf += self._utf8.decode(chunk)
+
+
+def _load_ndjson(path: str, wanted: Optional[set]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise json.JSONDecodeError(f"Line {line_no} is not an object", line, 0)
+            for key, value in record.items():
+                if wanted is None or key in wanted:
+                    result[key] = _merge(result.get(key), value)
+    return result
+
+
+def _merge(existing: Any, value: Any) -> Any:
+    if isinstance(existing, dict) and isinstance(value, dict):
+        for key, item in value.items():
+            existing[key] = _merge(existing.get(key), item)
+        return existing
+    if isinstance(existing, list) and isinstance(value, list):
+        existing.extend(value)
+        return existing
+    return value
+
+
+if __name__ == "__main__":
+    # Compare the full json.load path with the streaming loader
+    if len(sys.argv) < 2:
+        print("Usage: python json_stream.py DATA_FILE [SECTION ...]")
+        sys.exit(2)
+
+    data_path = sys.argv[1]
+    keep = sys.argv[2:] or ['metadata', 'tckt', 'ops', 'kinh_doanh', 'eqc', 'thuong_vu', 'tong_quan_tau']
+
+    def _full_load(p):
+        with open(p, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    print(f"File: {data_path} ({os.path.getsize(data_path) / 1024 / 1024:.1f} MB)")
+    if not data_path.endswith(('.ndjson', '.jsonl')):
+        _, full_stats = measure_load(_full_load, data_path)
+        print(f"  json.load : {full_stats['parse_seconds']:.3f}s, "
+              f"peak {full_stats['peak_memory_bytes'] / 1024 / 1024:.1f} MB")
+    _, stream_stats = measure_load(load_sections, data_path, keep)
+    print(f"  streaming : {stream_stats['parse_seconds']:.3f}s, "
+          f"peak {stream_stats['peak_memory_bytes'] / 1024 / 1024:.1f} MB "
+          f"(sections: {', '.join(keep)})")
@@ -0,0 +1,333 @@
+"""
+Metrics
+Derives KPIs (ratios, deltas, variances, trends) from the report data and its weekly history
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Any, Iterable, List, Optional
+
+# pandas/NumPy are imported in compute_metrics, so importing this module stays cheap
+
+
+# Weekly inputs taken from each report: column -> data path
+WEEKLY_VALUES = {
+    'receivables_total': ('tckt', 'overview', 'receivables', 'total'),
+    'receivables_overdue': ('tckt', 'overview', 'receivables', 'overdue'),
+    'payables_total': ('tckt', 'overview', 'payables', 'total'),
+    'payables_overdue': ('tckt', 'overview', 'payables', 'overdue'),
+    'cash_current': ('tckt', 'overview', 'cash_flow', 'current_month'),
+    'cash_previous': ('tckt', 'overview', 'cash_flow', 'previous_month'),
+}
+
+# Weekly totals of the column-like series: column -> (data path, series key)
+WEEKLY_SERIES = {
+    'allocated': (('kinh_doanh', 'domestic_performance'), 'allocated'),
+    'actual': (('kinh_doanh', 'domestic_performance'), 'actual'),
+}
+
+# Sections the KPIs read, pulled from the snapshot store for history
+METRIC_SECTIONS = ('tckt', 'kinh_doanh', 'tong_quan_tau')
+
+# Fuel series compared against their standard: name -> (actual key, standard key)
+FUEL_SERIES = {
+    'fo': ('fo_actual', 'fo_standard'),
+    'do': ('do_actual', 'do_standard'),
+}
+
+
+def add_metrics(data: Dict[str, Any], config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compute the KPIs into data['metrics'] (once; existing metrics are kept)
+
+    Uses metrics.enabled, metrics.window, metrics.history_path and
+    metrics.history_weeks (prior weeks read from the snapshot store) from
+    config.yaml. Templates reference the results as dotted placeholders,
+    e.g. {{metrics.tckt.overdue_receivables_pct}}.
+
+    Returns:
+        The metrics dict, or None when disabled
+    """
+    metrics_config = config.get('metrics', {}) or {}
+    if not metrics_config.get('enabled', True):
+        return None
+    if 'metrics' not in data:
+        history = load_history(metrics_config.get('history_path'))
+        history += load_snapshot_history(config, (data.get('metadata') or {}).get('week'),
+                                         metrics_config.get('history_weeks', 52))
+        data['metrics'] = compute_metrics(data, history, metrics_config.get('window', 4))
+    return data['metrics']
+
+
+def inputs_key(data: Dict[str, Any], config: Dict[str, Any]) -> Optional[str]:
+    """
+    Digest of what add_metrics would read besides the report itself (the
+    metrics settings, history_path and the stored history weeks), so an
+    identical render can be recognized without computing the KPIs
+
+    Returns:
+        Hex digest, or None when metrics are disabled or already in data
+    """
+    from snapshot_store import open_store
+
+    metrics_config = config.get('metrics', {}) or {}
+    if not metrics_config.get('enabled', True) or 'metrics' in data:
+        return None
+    week = (data.get('metadata') or {}).get('week')
+    history_path = metrics_config.get('history_path')
+    parts: Dict[str, Any] = {'settings': metrics_config, 'history_file': None, 'snapshots': []}
+    if history_path and os.path.exists(history_path):
+        st = os.stat(history_path)
+        parts['history_file'] = [os.path.abspath(history_path), st.st_mtime_ns, st.st_size]
+    weeks = metrics_config.get('history_weeks', 52)
+    store = open_store(config) if week and weeks else None
+    if store is not None:
+        with store:
+            parts['snapshots'] = store.digests(week, int(weeks), METRIC_SECTIONS)
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def load_history(path: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Past weekly reports from a JSON file (a list, or {"reports": [...]})
+    or an NDJSON file with one report per line; [] when not configured
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        history = json.loads(text)
+    except json.JSONDecodeError:
+        history = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(history, dict):
+        history = history.get('reports', [])
+    return [report for report in history if isinstance(report, dict)]
+
+
+def load_snapshot_history(config: Dict[str, Any], week: Optional[str], weeks: int) -> List[Dict[str, Any]]:
+    """The `weeks` stored weeks before `week` (KPI sections only); [] without a store"""
+    from snapshot_store import open_store
+
+    store = open_store(config) if week and weeks else None
+    if store is None:
+        return []
+    with store:
+        return store.previous(week, int(weeks), METRIC_SECTIONS)
+
+
+def compute_metrics(data: Dict[str, Any], history: Iterable[Dict[str, Any]] = (),
+                    window: int = 4) -> Dict[str, Any]:
+    """
+    KPIs for the current week, with rolling averages over `window` weeks
+
+    The current report and its history become one row per week; every
+    ratio, delta and rolling statistic is then computed for all weeks at
+    once, so the cost grows with the number of weeks, not with Python
+    loops per KPI. A week present in both keeps the current report.
+
+    Returns:
+        Nested dict of plain floats/ints (None where inputs are missing)
+    """
+    import numpy as np
+    import pandas as pd
+
+    window = max(1, int(window))
+    week = (data.get('metadata') or {}).get('week') or 'current'
+    reports = [r for r in history if (r.get('metadata') or {}).get('week') != week] + [data]
+
+    frame = pd.DataFrame([_weekly_row(report) for report in reports])
+    frame['week'] = frame['week'].fillna('current')
+    frame = frame.drop_duplicates('week', keep='last').sort_values('week').set_index('week')
+
+    frame['overdue_receivables_pct'] = _pct(frame['receivables_overdue'], frame['receivables_total'])
+    frame['overdue_payables_pct'] = _pct(frame['payables_overdue'], frame['payables_total'])
+    frame['cash_flow_delta'] = frame['cash_current'] - frame['cash_previous']
+    frame['cash_flow_delta_pct'] = _pct(frame['cash_flow_delta'], frame['cash_previous'])
+    frame['utilization_pct'] = _pct(frame['actual'], frame['allocated'])
+    for fuel in FUEL_SERIES:
+        frame[f'{fuel}_over_pct'] = _pct(frame[f'{fuel}_over'], frame[f'{fuel}_standard'])
+
+    trended = ['overdue_receivables_pct', 'overdue_payables_pct', 'cash_flow_delta',
+               'utilization_pct', 'fo_over', 'do_over']
+    trended += [c for c in frame.columns if c.startswith('share:')]
+    rolling = frame[trended].rolling(window, min_periods=1)
+    averages = rolling.mean()
+    changes = frame[trended].diff()
+    slopes = _rolling_slope(frame[trended], window)
+
+    current = frame.loc[week]
+
+    def value(column):
+        return _plain(current.get(column, np.nan))
+
+    def trend(column):
+        return {
+            'avg': _plain(averages.loc[week, column]),
+            'change': _plain(changes.loc[week, column]),
+            'trend': _plain(slopes.loc[week, column]),
+        }
+
+    kinh_doanh = _domestic_variance(data)
+    kinh_doanh.update({
+        'allocated_total': value('allocated'),
+        'actual_total': value('actual'),
+        'utilization_pct': value('utilization_pct'),
+        'utilization_pct_avg': trend('utilization_pct')['avg'],
+        'utilization_pct_change': trend('utilization_pct')['change'],
+        'routes': {
+            column.split(':', 1)[1]: {'vlines_share': value(column), **trend(column)}
+            for column in frame.columns if column.startswith('share:')
+        },
+    })
+
+    tong_quan_tau = _fuel_overconsumption(data)
+    for fuel in FUEL_SERIES:
+        tong_quan_tau[f'{fuel}_over'] = value(f'{fuel}_over')
+        tong_quan_tau[f'{fuel}_over_pct'] = value(f'{fuel}_over_pct')
+        tong_quan_tau[f'{fuel}_over_avg'] = trend(f'{fuel}_over')['avg']
+
+    return {
+        'week': week,
+        'history_weeks': len(frame),
+        'window': window,
+        'tckt': {
+            'overdue_receivables_pct': value('overdue_receivables_pct'),
+            'overdue_receivables_pct_avg': trend('overdue_receivables_pct')['avg'],
+            'overdue_receivables_pct_change': trend('overdue_receivables_pct')['change'],
+            'overdue_payables_pct': value('overdue_payables_pct'),
+            'overdue_payables_pct_avg': trend('overdue_payables_pct')['avg'],
+            'overdue_payables_pct_change': trend('overdue_payables_pct')['change'],
+            'cash_flow_delta': value('cash_flow_delta'),
+            'cash_flow_delta_pct': value('cash_flow_delta_pct'),
+            'cash_flow_delta_avg': trend('cash_flow_delta')['avg'],
+        },
+        'kinh_doanh': kinh_doanh,
+        'tong_quan_tau': tong_quan_tau,
+    }
+
+
+def _weekly_row(report: Dict[str, Any]) -> Dict[str, Any]:
+    """One row of weekly inputs (NaN where the report lacks a value)"""
+    import numpy as np
+
+    row: Dict[str, Any] = {'week': (report.get('metadata') or {}).get('week')}
+    for column, path in WEEKLY_VALUES.items():
+        row[column] = _number(_lookup(report, path))
+    for column, (path, key) in WEEKLY_SERIES.items():
+        values = _lookup(report, path + (key,))
+        row[column] = np.nan if values is None else np.nansum(_array(values))
+
+    fuel = _lookup(report, ('tong_quan_tau', 'fuel_consumption')) or {}
+    for name, (actual_key, standard_key) in FUEL_SERIES.items():
+        actual, standard = _paired(fuel.get(actual_key), fuel.get(standard_key))
+        if actual is None:
+            row[f'{name}_over'] = row[f'{name}_standard'] = np.nan
+        else:
+            row[f'{name}_over'] = np.nansum(np.clip(actual - standard, 0, None))
+            row[f'{name}_standard'] = np.nansum(standard)
+
+    routes = _lookup(report, ('kinh_doanh', 'market_overview')) or {}
+    for route, shares in routes.items():
+        if isinstance(shares, dict):
+            row[f'share:{route}'] = _number(shares.get('vlines_share'))
+    return row
+
+
+def _domestic_variance(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-voyage actual vs allocated for the current week"""
+    import numpy as np
+
+    block = _lookup(data, ('kinh_doanh', 'domestic_performance')) or {}
+    allocated, actual = _paired(block.get('allocated'), block.get('actual'))
+    if allocated is None:
+        return {'variance': None, 'variance_pct': None, 'voyages_over': 0, 'voyages_under': 0,
+                'variance_by_voyage': [], 'largest_shortfall': None}
+
+    variance = actual - allocated
+    labels = list(block.get('weeks') or [])
+    shortfall = int(np.nanargmin(variance)) if np.any(variance < 0) else None
+    return {
+        'variance': _plain(np.nansum(variance)),
+        'variance_pct': _plain(_ratio(np.nansum(variance), np.nansum(allocated)) * 100),
+        'voyages_over': int(np.sum(variance > 0)),
+        'voyages_under': int(np.sum(variance < 0)),
+        'variance_by_voyage': [_plain(v) for v in variance],
+        'largest_shortfall': (labels[shortfall] if shortfall is not None and shortfall < len(labels)
+                              else shortfall),
+    }
+
+
+def _fuel_overconsumption(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ships consuming more than their standard in the current week"""
+    import numpy as np
+
+    fuel = _lookup(data, ('tong_quan_tau', 'fuel_consumption')) or {}
+    result = {}
+    for name, (actual_key, standard_key) in FUEL_SERIES.items():
+        actual, standard = _paired(fuel.get(actual_key), fuel.get(standard_key))
+        result[f'ships_over_{name}'] = 0 if actual is None else int(np.sum(actual > standard))
+    return result
+
+
+def _rolling_slope(frame, window: int):
+    """Least-squares slope per week over the trailing window (units per week)"""
+    import pandas as pd
+
+    position = pd.Series(range(len(frame)), index=frame.index, dtype=float)
+    x_var = position.rolling(window, min_periods=2).var()
+    return frame.apply(lambda column: position.rolling(window, min_periods=2).cov(column) / x_var)
+
+
+def _pct(numerator, denominator):
+    """numerator / denominator * 100, NaN where the denominator is 0 or missing"""
+    return numerator / denominator.where(denominator != 0) * 100
+
+
+def _paired(first: Any, second: Any):
+    """Two series as float arrays trimmed to a common length, or (None, None)"""
+    if first is None or second is None:
+        return None, None
+    first, second = _array(first), _array(second)
+    length = min(len(first), len(second))
+    return first[:length], second[:length]
+
+
+def _array(values: Any):
+    import numpy as np
+
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    import numpy as np
+
+    return numerator / denominator if denominator else np.nan
+
+
+def _lookup(data: Any, path) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _plain(value: Any) -> Any:
+    """NumPy scalar -> float rounded for display; NaN/inf -> None"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number or number in (float('inf'), float('-inf')):
+        return None
+    return round(number, 4)
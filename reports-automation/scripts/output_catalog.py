@@ -0,0 +1,180 @@
+"""
+Output Catalog
+Index of generated decks in SQLite, for retention pruning and skipping duplicate renders
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from incremental import manifest_path
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS outputs (
+        path TEXT PRIMARY KEY,
+        name TEXT,
+        week TEXT,
+        data_fingerprint TEXT NOT NULL,
+        render_key TEXT NOT NULL,
+        bytes INTEGER NOT NULL,
+        render_seconds REAL NOT NULL,
+        created_at REAL NOT NULL,
+        used_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS outputs_render_key ON outputs (render_key)",
+    "CREATE INDEX IF NOT EXISTS outputs_used_at ON outputs (used_at)",
+)
+
+
+def data_fingerprint(fingerprints: Dict[str, str]) -> str:
+    """One digest of the per-section fingerprints (incremental.section_fingerprints)"""
+    canonical = json.dumps(fingerprints, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def render_key(fingerprints: Dict[str, str], template_key: Optional[str], config: Dict[str, Any],
+               derived_key: Optional[str] = None, target: Optional[str] = None) -> str:
+    """
+    Digest of everything a rendered deck depends on: the data (with the
+    rendered dates the template shows), the template content, the render
+    settings in config.yaml (template.*, output.optimize), derived_key for
+    inputs of data computed at render time (metrics) and the target path
+    """
+    settings = {k: v for k, v in (config.get('template', {}) or {}).items() if k != 'cache_size'}
+    canonical = json.dumps({
+        'data': fingerprints,
+        'template': template_key,
+        'settings': settings,
+        'optimize': (config.get('output', {}) or {}).get('optimize'),
+        'derived': derived_key,
+        'target': target,
+    }, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class OutputCatalog:
+    """
+    One row per generated deck: path, week, fingerprints, size and render time
+
+    Re-rendering to the same path replaces its row, as the file itself is
+    replaced. used_at is the last time a deck was generated or reused in
+    place of a render; retention works from it alone, so pruning never
+    lists the reports directory. Decks not in the catalog are left alone.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def record(self, output_path: str, fingerprints: Dict[str, str], key: str,
+               render_seconds: float, week: Optional[str] = None, name: Optional[str] = None):
+        """Add (or replace) the entry of a deck just written"""
+        path = os.path.abspath(output_path)
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs (path, name, week, data_fingerprint, render_key, bytes, "
+                "render_seconds, created_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, name, week, data_fingerprint(fingerprints), key, os.path.getsize(path),
+                 round(render_seconds, 4), now, now))
+            self._conn.commit()
+
+    def touch(self, path: str):
+        """Mark a deck as used now (it was returned instead of a new render)"""
+        with self._lock:
+            self._conn.execute("UPDATE outputs SET used_at = ? WHERE path = ?", (time.time(), path))
+            self._conn.commit()
+
+    def find(self, key: str, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Newest deck of this variant name rendered with this render_key whose
+        file is still intact
+
+        Entries whose file was deleted or changed size are dropped on the way.
+        """
+        found = None
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM outputs WHERE render_key = ? AND name IS ? ORDER BY created_at DESC",
+                (key, name))
+            columns = [c[0] for c in cursor.description]
+            for row in cursor.fetchall():
+                entry = dict(zip(columns, row))
+                try:
+                    intact = os.path.getsize(entry['path']) == entry['bytes']
+                except OSError:
+                    intact = False
+                if intact:
+                    found = entry
+                    break
+                self._conn.execute("DELETE FROM outputs WHERE path = ?", (entry['path'],))
+            self._conn.commit()
+        return found
+
+    def prune(self, retention_days: float) -> List[str]:
+        """
+        Delete decks (and their manifests) not generated or reused for retention_days
+
+        Returns:
+            Paths of the removed decks
+        """
+        cutoff = time.time() - float(retention_days) * 86400
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute(
+                "SELECT path FROM outputs WHERE used_at < ?", (cutoff,))]
+            for path in paths:
+                for file_path in (path, manifest_path(path)):
+                    try:
+                        os.remove(file_path)
+                    except FileNotFoundError:
+                        pass
+            self._conn.executemany("DELETE FROM outputs WHERE path = ?", [(p,) for p in paths])
+            self._conn.commit()
+        return paths
+
+    def entries(self, week: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Catalogued decks, newest first (only the given week's when set)"""
+        query = "SELECT * FROM outputs"
+        params: tuple = ()
+        if week:
+            query += " WHERE week = ?"
+            params = (week,)
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY created_at DESC", params)
+            columns = [c[0] for c in cursor.description]
+            entries = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for entry in entries:
+            entry['created'] = datetime.fromtimestamp(entry['created_at']).isoformat(timespec='seconds')
+        return entries
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_catalog(config: Dict[str, Any]) -> Optional[OutputCatalog]:
+    """Output catalog from config.yaml output.catalog, or None when disabled"""
+    catalog_config = (config.get('output', {}) or {}).get('catalog', {}) or {}
+    if not catalog_config.get('enabled', False):
+        return None
+    return OutputCatalog(catalog_config.get('path', 'data/outputs.db'))
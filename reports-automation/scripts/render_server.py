@@ -0,0 +1,341 @@
+"""
+Render Server
+Long-running local service that renders reports from a warm process
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+import yaml
+
+from data_fetcher import DataFetcher
+from generator import WeeklyReportGenerator
+from instrumentation import configure_logging, run_context, span, log_error
+
+
+PPTX_MIME = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+CHUNK_SIZE = 64 * 1024
+
+# data_source keys a request may override: stored weeks only, so a request
+# can neither read arbitrary files or URLs nor move the cache/snapshot paths
+SOURCE_OVERRIDES = {'type': ('snapshot',), 'week': None}
+
+# Request values that end up in the output filename
+_FILENAME_PART = re.compile(r'[A-Za-z0-9][A-Za-z0-9_.-]*')
+
+
+class RenderService:
+    """
+    Renders reports for requests, keeping config and templates warm
+
+    At most `workers` renders run at once; up to `queue_size` more wait
+    for a slot. Requests beyond that are refused straight away (the HTTP
+    layer answers 503 with Retry-After), so a burst cannot pile up
+    unbounded work or memory.
+    """
+
+    def __init__(self, config: Dict[str, Any], workers: int = 1, queue_size: int = 8):
+        self.config = config
+        self.workers = max(1, int(workers))
+        self.queue_size = max(0, int(queue_size))
+        self._admission = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def warm_up(self) -> Optional[float]:
+        """Parse the template into the shared cache; returns seconds taken (None without a template)"""
+        generator = WeeklyReportGenerator(self.config)
+        if not os.path.exists(generator.template_path):
+            return None
+        started = time.perf_counter()
+        generator.template_cache.load(generator.template_path)
+        return time.perf_counter() - started
+
+    def try_admit(self) -> bool:
+        """Reserve a queue place, or return False if the queue is full"""
+        if not self._admission.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._admission.release()
+
+    def render(self, request: Dict[str, Any], workdir: str) -> Dict[str, Any]:
+        """
+        Render one report into workdir (caller must hold an admission)
+
+        Request keys (all optional):
+            data:        Report data inline
+            data_source: Overrides for the configured data source, limited
+                         to SOURCE_OVERRIDES (e.g. {"type": "snapshot",
+                         "week": "2025-W40"})
+            metadata:    Values merged into data['metadata']
+            name:        Variant name added to the filename
+
+        Returns:
+            Dictionary with output_path, queue_seconds and render_seconds
+        """
+        self.check_request(request)
+        queued = time.perf_counter()
+        with self._slots:
+            started = time.perf_counter()
+            try:
+                with run_context('render', report=request.get('name')):
+                    with span('fetch'):
+                        data = self._request_data(request)
+                    with span('generate'):
+                        config = copy.deepcopy(self.config)
+                        config.setdefault('output', {})['directory'] = workdir
+                        config['output']['incremental'] = False
+                        # The work directory is deleted after the response, so
+                        # its decks must not be catalogued or reused
+                        config['output']['catalog'] = {'enabled': False}
+                        output_path = WeeklyReportGenerator(config).generate_report(data, request.get('name'))
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+
+        with self._lock:
+            self.completed += 1
+        return {
+            'output_path': output_path,
+            'queue_seconds': round(started - queued, 4),
+            'render_seconds': round(time.perf_counter() - started, 4),
+        }
+
+    @staticmethod
+    def check_request(request: Dict[str, Any]):
+        """Raise ValueError if a request overrides more than it may"""
+        source = request.get('data_source')
+        if source is not None:
+            if not isinstance(source, dict):
+                raise ValueError("data_source must be an object")
+            for key, value in source.items():
+                if key not in SOURCE_OVERRIDES:
+                    raise ValueError(f"data_source.{key} cannot be set by a request "
+                                     f"(allowed: {', '.join(SOURCE_OVERRIDES)})")
+                allowed = SOURCE_OVERRIDES[key]
+                if allowed is not None and value not in allowed:
+                    raise ValueError(f"data_source.{key} must be one of: {', '.join(allowed)}")
+
+        metadata = request.get('metadata')
+        if metadata is not None and not isinstance(metadata, dict):
+            raise ValueError("metadata must be an object")
+        data = request.get('data')
+        inline_metadata = data.get('metadata') if isinstance(data, dict) else None
+        for field, value in (('name', request.get('name')),
+                             ('metadata.week', (metadata or {}).get('week')),
+                             ('data.metadata.week', (inline_metadata if isinstance(inline_metadata, dict)
+                                                     else {}).get('week')),
+                             ('data_source.week', (source or {}).get('week'))):
+            if value is not None and not _FILENAME_PART.fullmatch(str(value)):
+                raise ValueError(f"{field} may only contain letters, digits, '_', '.' and '-'")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+    def _request_data(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(request.get('data'), dict):
+            data = request['data']
+        else:
+            config = self.config
+            if request.get('data_source'):
+                config = copy.deepcopy(self.config)
+                config.setdefault('data_source', {}).update(request['data_source'])
+            data = DataFetcher(config).fetch_data()
+
+        if request.get('metadata'):
+            data.setdefault('metadata', {}).update(request['metadata'])
+        return data
+
+
+def make_handler(service: RenderService):
+    """Request handler class bound to a RenderService"""
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/health':
+                from template_cache import get_template_cache
+                self._reply_json(200, {'status': 'ok', **service.stats(),
+                                       'template_cache': get_template_cache().stats()})
+            else:
+                self._reply_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/render':
+                self._reply_json(404, {'error': 'not found'})
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            try:
+                request = json.loads(body) if body.strip() else {}
+                if not isinstance(request, dict):
+                    raise ValueError("request body must be a JSON object")
+                service.check_request(request)
+            except ValueError as e:
+                self._reply_json(400, {'error': str(e)})
+                return
+
+            if not service.try_admit():
+                self._reply_json(503, {'error': 'render queue full'}, {'Retry-After': '5'})
+                return
+
+            workdir = tempfile.mkdtemp(prefix='vlines_render_')
+            try:
+                try:
+                    result = service.render(request, workdir)
+                except Exception as e:
+                    log_error(e, component='render_server')
+                    self._reply_json(500, {'error': str(e)})
+                    return
+                self._send_file(result)
+            finally:
+                service.release()
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        def _send_file(self, result: Dict[str, Any]):
+            path = result['output_path']
+            self.send_response(200)
+            self.send_header('Content-Type', PPTX_MIME)
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            self.send_header('Content-Disposition', f'attachment; filename="{os.path.basename(path)}"')
+            self.send_header('X-Queue-Seconds', str(result['queue_seconds']))
+            self.send_header('X-Render-Seconds', str(result['render_seconds']))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    self.wfile.write(chunk)
+
+        def _reply_json(self, status: int, payload: Dict[str, Any],
+                        headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # Unix socket clients have no address
+            return self.client_address[0] if self.client_address else 'unix'
+
+        def log_message(self, format, *args):
+            print(f"[render-server] {self.address_string()} {format % args}")
+
+    return _Handler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix domain socket (one thread per connection)"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def create_server(service: RenderService, host: str = '127.0.0.1', port: int = 8766,
+                  socket_path: Optional[str] = None):
+    """HTTP server on host:port, or on a Unix socket when socket_path is set"""
+    handler = make_handler(service)
+    if socket_path:
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="VLines report render server")
+    parser.add_argument('--config', default='config/config.yaml', help="Configuration file")
+    parser.add_argument('--host', help="Bind address (default: server.host or 127.0.0.1)")
+    parser.add_argument('--port', type=int, help="Port (default: server.port or 8766)")
+    parser.add_argument('--socket', help="Serve on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, help="Concurrent renders (default: server.workers)")
+    parser.add_argument('--queue-size', type=int, help="Requests waiting for a worker before 503s")
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    return serve(config, host=args.host, port=args.port, socket_path=args.socket,
+                 workers=args.workers, queue_size=args.queue_size)
+
+
+def serve(config: Dict[str, Any], host: Optional[str] = None, port: Optional[int] = None,
+          socket_path: Optional[str] = None, workers: Optional[int] = None,
+          queue_size: Optional[int] = None) -> int:
+    """Run the render server until interrupted (arguments override config server.*)"""
+    configure_logging(config.get('logging'))
+    server_config = config.get('server', {}) or {}
+    service = RenderService(
+        config,
+        workers=workers or server_config.get('workers', 1),
+        queue_size=queue_size if queue_size is not None else server_config.get('queue_size', 8)
+    )
+
+    warm = service.warm_up()
+    if warm is not None:
+        print(f"Template parsed and cached in {warm:.2f}s")
+
+    socket_path = socket_path or server_config.get('socket')
+    server = create_server(service, host or server_config.get('host', '127.0.0.1'),
+                           port or server_config.get('port', 8766), socket_path)
+    where = socket_path or 'http://{}:{}'.format(*server.server_address[:2])
+    print(f"Render server listening on {where} "
+          f"({service.workers} worker(s), queue {service.queue_size})")
+    print("  POST /render   JSON body: {data | data_source, metadata, name} -> .pptx")
+    print("  GET  /health")
+    print("Press Ctrl+C to stop\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nRender server stopped by user")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
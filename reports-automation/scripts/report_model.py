@@ -0,0 +1,324 @@
+"""
+Report Model
+Typed, compact model of the report data, validated before any PowerPoint work
+"""
+
+import math
+import numbers
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+# Field kinds (a Record subclass, ('list', Record) or ('map', kind) are also kinds)
+TEXT = 'text'        # str
+NUMBER = 'number'    # int/float/Decimal (not bool), kept as given
+SCALAR = 'scalar'    # any JSON scalar (table cells)
+SERIES = 'series'    # list of numbers, stored as array('d'); nulls become NaN
+LABELS = 'labels'    # list of scalars, stored as a tuple of str
+
+
+class ReportValidationError(ValueError):
+    """Report data does not match the model; errors lists every problem found"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = list(errors)
+        lines = '\n'.join(f"  - {error}" for error in self.errors)
+        super().__init__(f"Report data has {len(self.errors)} error(s):\n{lines}")
+
+
+class Record:
+    """
+    Base of the model records
+
+    Subclasses declare FIELDS (attribute -> (kind, required)) and
+    __slots__ = tuple(FIELDS), so records carry no per-instance dict.
+    COLUMNS names fields that form one table and must have equal length.
+    Keys not in FIELDS are kept in `extra`. get() gives mapping-style
+    access, so data paths from config.yaml resolve on records too.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS: Dict[str, Tuple[Any, bool]] = {}
+    COLUMNS: Tuple[str, ...] = ()
+
+    @classmethod
+    def parse(cls, value: Any, path: str, errors: List[str]) -> Optional['Record']:
+        """Build a record from a dict, appending problems to errors"""
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object, got {_type_name(value)}")
+            return None
+
+        record = cls.__new__(cls)
+        for name, (kind, required) in cls.FIELDS.items():
+            field_path = f"{path}.{name}"
+            raw = value.get(name)
+            if raw is None:
+                if required:
+                    errors.append(f"{field_path}: missing")
+                setattr(record, name, None)
+            else:
+                setattr(record, name, _parse(kind, raw, field_path, errors))
+        record.extra = {k: v for k, v in value.items() if k not in cls.FIELDS}
+
+        lengths = {name: len(getattr(record, name)) for name in cls.COLUMNS
+                   if getattr(record, name) is not None}
+        if len(set(lengths.values())) > 1:
+            sizes = ', '.join(f"{name}={n}" for name, n in lengths.items())
+            errors.append(f"{path}: columns differ in length ({sizes})")
+        return record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+def _parse(kind: Any, value: Any, path: str, errors: List[str]) -> Any:
+    if isinstance(kind, type) and issubclass(kind, Record):
+        return kind.parse(value, path, errors)
+
+    if isinstance(kind, tuple):
+        container, item_kind = kind
+        if container == 'list':
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected a list, got {_type_name(value)}")
+                return None
+            return [_parse(item_kind, item, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object, got {_type_name(value)}")
+            return None
+        return {str(k): _parse(item_kind, v, f"{path}.{k}", errors) for k, v in value.items()}
+
+    if kind == TEXT:
+        if not isinstance(value, str):
+            errors.append(f"{path}: expected text, got {_type_name(value)}")
+            return None
+        return value
+
+    if kind == NUMBER:
+        if not _is_number(value):
+            errors.append(f"{path}: expected a number, got {_type_name(value)}")
+            return None
+        return value
+
+    if kind == SCALAR:
+        if isinstance(value, (dict, list)):
+            errors.append(f"{path}: expected a single value, got {_type_name(value)}")
+            return None
+        return value
+
+    if kind == SERIES:
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected a list of numbers, got {_type_name(value)}")
+            return None
+        bad = [i for i, v in enumerate(value) if v is not None and not _is_number(v)]
+        if bad:
+            errors.append(f"{path}: non-numeric values at {_positions(bad)}")
+            return None
+        return array('d', (math.nan if v is None else float(v) for v in value))
+
+    if kind == LABELS:
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected a list, got {_type_name(value)}")
+            return None
+        bad = [i for i, v in enumerate(value) if isinstance(v, (dict, list))]
+        if bad:
+            errors.append(f"{path}: nested values at {_positions(bad)}")
+            return None
+        return tuple('' if v is None else str(v) for v in value)
+
+    raise ValueError(f"Unknown field kind: {kind!r}")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, numbers.Number) and not isinstance(value, (bool, complex))
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return 'null'
+    return {dict: 'object', list: 'list', str: 'text', bool: 'boolean'}.get(type(value), type(value).__name__)
+
+
+def _positions(indexes: List[int], limit: int = 5) -> str:
+    shown = ', '.join(str(i) for i in indexes[:limit])
+    return shown + (f" (+{len(indexes) - limit} more)" if len(indexes) > limit else '')
+
+
+# --- metadata -----------------------------------------------------------------
+
+class Metadata(Record):
+    FIELDS = {'week': (TEXT, True), 'generated_at': (TEXT, False), 'report_type': (TEXT, False)}
+    __slots__ = tuple(FIELDS)
+
+
+# --- tckt (accounting) --------------------------------------------------------
+
+class Balance(Record):
+    FIELDS = {'total': (NUMBER, True), 'within_term': (NUMBER, True), 'overdue': (NUMBER, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class CashFlow(Record):
+    FIELDS = {'current_month': (NUMBER, True), 'previous_month': (NUMBER, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class TcktOverview(Record):
+    FIELDS = {'receivables': (Balance, True), 'payables': (Balance, False), 'cash_flow': (CashFlow, False)}
+    __slots__ = tuple(FIELDS)
+
+
+class Tckt(Record):
+    FIELDS = {'overview': (TcktOverview, True), 'explanations': (('map', LABELS), False)}
+    __slots__ = tuple(FIELDS)
+
+
+# --- ops (operations) ---------------------------------------------------------
+
+class ShipScheduleRow(Record):
+    FIELDS = {
+        'ship_name': (SCALAR, True),
+        'voyage': (SCALAR, False),
+        'route': (SCALAR, False),
+        'position': (SCALAR, False),
+        'speed_sb_nb': (SCALAR, False),
+        'weather': (SCALAR, False),
+        'days_notes': (SCALAR, False),
+        'status': (SCALAR, False),
+        'actual_ports': (SCALAR, False),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class ProfomarVsActual(Record):
+    FIELDS = {'ships': (LABELS, True), 'profomar_days': (SERIES, True), 'actual_days': (SERIES, True)}
+    COLUMNS = tuple(FIELDS)
+    __slots__ = tuple(FIELDS)
+
+
+class OpsPerformance(Record):
+    FIELDS = {'profomar_vs_actual': (ProfomarVsActual, False)}
+    __slots__ = tuple(FIELDS)
+
+
+class Ops(Record):
+    FIELDS = {'ship_schedule': (('list', ShipScheduleRow), True), 'performance': (OpsPerformance, False)}
+    __slots__ = tuple(FIELDS)
+
+
+# --- kinh_doanh (business) ----------------------------------------------------
+
+class RouteShare(Record):
+    FIELDS = {'vlines_share': (NUMBER, True), 'others_share': (NUMBER, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class DomesticPerformance(Record):
+    FIELDS = {
+        'weeks': (LABELS, True),
+        'allocated': (SERIES, True),
+        'actual': (SERIES, True),
+        'percentage': (SERIES, False),
+    }
+    COLUMNS = tuple(FIELDS)
+    __slots__ = tuple(FIELDS)
+
+
+class KinhDoanh(Record):
+    FIELDS = {
+        'market_overview': (('map', RouteShare), False),
+        'domestic_performance': (DomesticPerformance, True),
+        'top_customers': (('map', LABELS), False),
+        'market_notes': (LABELS, False),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+# --- eqc, thuong_vu, tong_quan_tau ----------------------------------------------
+
+class EqcOverview(Record):
+    FIELDS = {'revenue': (NUMBER, True), 'cost': (NUMBER, True), 'profit_margin': (NUMBER, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class Eqc(Record):
+    FIELDS = {'overview': (EqcOverview, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class ProductionVolume(Record):
+    FIELDS = {'total_teus': (NUMBER, True), 'revenue': (NUMBER, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class ThuongVu(Record):
+    FIELDS = {'production_volume': (ProductionVolume, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class FuelConsumption(Record):
+    FIELDS = {
+        'fo_actual': (SERIES, True),
+        'fo_standard': (SERIES, True),
+        'do_actual': (SERIES, True),
+        'do_standard': (SERIES, True),
+    }
+    COLUMNS = tuple(FIELDS)
+    __slots__ = tuple(FIELDS)
+
+
+class TongQuanTau(Record):
+    FIELDS = {'fuel_consumption': (FuelConsumption, True)}
+    __slots__ = tuple(FIELDS)
+
+
+class ReportData(Record):
+    """A whole report; sections are optional here (see validate_report's required_sections)"""
+
+    FIELDS = {
+        'metadata': (Metadata, False),
+        'tckt': (Tckt, False),
+        'ops': (Ops, False),
+        'kinh_doanh': (KinhDoanh, False),
+        'eqc': (Eqc, False),
+        'thuong_vu': (ThuongVu, False),
+        'tong_quan_tau': (TongQuanTau, False),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+def parse_report(data: Any, required_sections: Iterable[str] = ('metadata',)) -> Tuple[ReportData, List[str]]:
+    """
+    Build the model, collecting every problem instead of stopping at the first
+
+    Returns:
+        Tuple of (ReportData, list of errors); fields with errors are None
+    """
+    errors: List[str] = []
+    report = ReportData.parse(data, 'data', errors)
+    if report is None:
+        return ReportData.parse({}, 'data', []), errors
+
+    for section in required_sections:
+        if getattr(report, section, None) is None and data.get(section) is None:
+            errors.append(f"data.{section}: missing")
+    return report, errors
+
+
+def validate_report(data: Any, required_sections: Iterable[str] = ('metadata',)) -> ReportData:
+    """
+    Build the model or raise ReportValidationError listing all problems
+
+    Sections absent from data are allowed (e.g. a batch entry rendering a
+    subset) unless named in required_sections.
+    """
+    report, errors = parse_report(data, required_sections)
+    if errors:
+        raise ReportValidationError(errors)
+    return report
@@ -3,13 +3,28 @@ Report Scheduler
 Handles automated scheduling of weekly report generation
 """
 
-import schedule
+# Heavy dependencies (yaml, requests via DataFetcher, pptx/lxml via
+# WeeklyReportGenerator) are imported in the code paths that use them, so
+# --help, validate or an idle scheduler do not load them.
+import copy
+import json
+import os
+import threading
 import time
 from datetime import datetime
-from typing import Dict, Any
-import yaml
-from data_fetcher import DataFetcher
-from generator import WeeklyReportGenerator
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+from instrumentation import configure_logging, run_context, span, log_error, format_spans, profile_run
+
+if TYPE_CHECKING:
+    from data_fetcher import DataFetcher
+    from delivery import DeliveryPipeline
+    from exporter import DeckExporter
+    from generator import WeeklyReportGenerator
+
+
+# Accepted values of schedule.day (or their first three letters)
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
 
 
 class ReportScheduler:
@@ -18,11 +33,47 @@ class ReportScheduler:
     def __init__(self, config_path: str = 'config/config.yaml'):
         self.config_path = config_path
         self.config = self._load_config()
-        self.data_fetcher = DataFetcher(self.config)
-        self.report_generator = WeeklyReportGenerator(self.config)
+        configure_logging(self.config.get('logging'))
+        self._data_fetcher = None
+        self._report_generator = None
+        self._delivery = None
+        self._exporter = None
+
+    @property
+    def data_fetcher(self) -> 'DataFetcher':
+        if self._data_fetcher is None:
+            from data_fetcher import DataFetcher
+            self._data_fetcher = DataFetcher(self.config)
+        return self._data_fetcher
+
+    @property
+    def report_generator(self) -> 'WeeklyReportGenerator':
+        if self._report_generator is None:
+            from generator import WeeklyReportGenerator
+            self._report_generator = WeeklyReportGenerator(self.config)
+        return self._report_generator
+
+    @property
+    def delivery(self) -> Optional['DeliveryPipeline']:
+        """Background delivery of reports and error notices, or None when notifications are off"""
+        notifications = self.config.get('notifications', {}) or {}
+        if self._delivery is None and notifications.get('enabled'):
+            from delivery import DeliveryPipeline
+            self._delivery = DeliveryPipeline(self.config)
+        return self._delivery
+
+    @property
+    def exporter(self) -> Optional['DeckExporter']:
+        """PDF/PNG export of generated decks, or None when export is off"""
+        if self._exporter is None and (self.config.get('export', {}) or {}).get('enabled'):
+            from exporter import DeckExporter
+            self._exporter = DeckExporter(self.config)
+        return self._exporter
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file"""
+        import yaml
+
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
@@ -51,131 +102,636 @@ class ReportScheduler:
             },
             'template': {
                 'path': './templates/weekly_report_template.pptx'
+            },
+            'batch': {
+                'workers': 4
             }
         }
 
-    def generate_report_job(self):
-        """Job that generates the weekly report"""
+    def generate_report_job(self, data_fetcher: Optional['DataFetcher'] = None,
+                            report_generator: Optional['WeeklyReportGenerator'] = None) -> bool:
+        """
+        Job that generates the weekly report
+
+        Returns:
+            True if the report was generated
+        """
+        data_fetcher = data_fetcher or self.data_fetcher
+        report_generator = report_generator or self.report_generator
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             print(f"\n{'='*60}")
             print(f"Starting weekly report generation at {timestamp}")
             print(f"{'='*60}")
 
-            # Fetch data
-            print("\n[1/3] Fetching data...")
-            data = self.data_fetcher.fetch_data()
-            print(f"✓ Data fetched successfully")
+            steps = 4 if self.exporter else 3
+            with run_context('job') as spans:
+                # Fetch data
+                print(f"\n[1/{steps}] Fetching data...")
+                with span('fetch', source=data_fetcher.data_source_type) as fetch_span:
+                    data = data_fetcher.fetch_data()
+                    fetch_span['metrics'] = data_fetcher.last_fetch_metrics
+                print(f"✓ Data fetched successfully")
 
-            # Generate report
-            print("\n[2/3] Generating PowerPoint report...")
-            output_path = self.report_generator.generate_report(data)
-            print(f"✓ Report generated: {output_path}")
+                # Generate report
+                print(f"\n[2/{steps}] Generating PowerPoint report...")
+                with span('generate') as generate_span:
+                    output_path = report_generator.generate_report(data)
+                    generate_span['output_path'] = output_path
+                    generate_span['render'] = report_generator.last_render_summary
+                print(f"✓ Report generated: {output_path}")
 
-            # Optional: Send notification, upload to cloud, etc.
-            print("\n[3/3] Post-processing...")
-            self._post_process(output_path)
+                if self.exporter:
+                    print(f"\n[3/{steps}] Exporting PDF/PNG...")
+                    self._export([output_path])
+
+                # Optional: Send notification, upload to cloud, etc.
+                print(f"\n[{steps}/{steps}] Post-processing...")
+                with span('post_process'):
+                    self._post_process(output_path, data.get('metadata'))
+                    self.apply_retention()
 
             print(f"\n{'='*60}")
             print(f"✓ Weekly report generation completed successfully!")
+            print(f"Stage timings: {format_spans(spans, 'job')}")
             print(f"{'='*60}\n")
+            return True
 
         except Exception as e:
             print(f"\n✗ Error during report generation: {e}")
             # Optional: Send error notification
             self._handle_error(e)
+            return False
+
+    def run_batch(self, spec_path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Generate many reports from a spec file in one job
+
+        The spec file (YAML or JSON) holds a list of reports, or a mapping
+        with a 'reports' list. Each report may set:
+            name:        Variant name, added to the output filename
+            sections:    Only render these sections (e.g. [ops, eqc])
+            metadata:    Values merged into data['metadata'] (e.g. region)
+            data_source: Overrides for the configured data source
+                         (e.g. the json_path of a past week for backfills)
+            filename:    Output filename pattern for this report
+
+        Args:
+            spec_path: Path to the batch spec file
+            workers: Process pool size (default: config batch.workers)
+
+        Returns:
+            Batch summary from WeeklyReportGenerator.generate_batch
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"\n{'='*60}")
+        print(f"Starting batch report generation at {timestamp}")
+        print(f"{'='*60}")
+
+        with run_context('batch', spec=spec_path):
+            steps = 4 if self.exporter else 3
+            print(f"\n[1/{steps}] Fetching data for batch: {spec_path}")
+            with span('fetch'):
+                specs = self._load_batch_specs(spec_path)
+                resolved = self._resolve_batch_specs(specs)
+
+            print(f"\n[2/{steps}] Generating PowerPoint reports...")
+            with span('generate', reports=len(resolved)) as generate_span:
+                summary = self.report_generator.generate_batch(resolved, max_workers=workers)
+                generate_span.update({k: v for k, v in summary.items() if k != 'reports'})
+
+            if self.exporter:
+                print(f"\n[3/{steps}] Exporting PDF/PNG...")
+                self._export([r['output_path'] for r in summary['reports'] if r['status'] == 'success'])
+
+            print(f"\n[{steps}/{steps}] Post-processing...")
+            with span('post_process'):
+                for spec, result in zip(resolved, summary['reports']):
+                    if result['status'] == 'success':
+                        data = spec.get('data') if isinstance(spec, dict) else None
+                        self._post_process(result['output_path'], (data or {}).get('metadata'))
+                    else:
+                        self._handle_error(RuntimeError(f"{result['name']}: {result['error']}"))
+                self.apply_retention()
+
+        print(f"\n{'='*60}")
+        print(f"Batch completed: {summary['succeeded']} succeeded, {summary['failed']} failed")
+        print(f"{'='*60}\n")
+        return summary
+
+    def _load_batch_specs(self, spec_path: str) -> List[Any]:
+        """Load the list of report specs from a YAML or JSON file"""
+        import yaml
+
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            if spec_path.endswith('.json'):
+                specs = json.load(f)
+            else:
+                specs = yaml.safe_load(f)
 
-    def _post_process(self, output_path: str):
-        """Post-processing after report generation"""
-        # Add your post-processing logic here:
-        # - Send email with report
-        # - Upload to cloud storage
-        # - Create backup
-        # - Send notification to Slack/Teams
-        print(f"Post-processing complete for: {output_path}")
+        if isinstance(specs, dict):
+            specs = specs.get('reports', [])
+        if not isinstance(specs, list):
+            raise ValueError(f"Batch spec file must contain a list of reports: {spec_path}")
+        return specs
+
+    def _resolve_batch_specs(self, specs: List[Any]) -> List[Any]:
+        """
+        Attach data to each spec
+
+        Specs without a data_source override share one fetch of the
+        configured source. A spec whose data cannot be fetched is passed
+        on with an 'error' so it is reported as failed, not dropped.
+        """
+        shared_data = None
+        resolved = []
+
+        for spec in specs:
+            if not isinstance(spec, dict):
+                resolved.append(spec)
+                continue
+            try:
+                if spec.get('data_source'):
+                    config = copy.deepcopy(self.config)
+                    config.setdefault('data_source', {}).update(spec['data_source'])
+                    from data_fetcher import DataFetcher
+                    data = DataFetcher(config).fetch_data()
+                else:
+                    if shared_data is None:
+                        shared_data = self.data_fetcher.fetch_data()
+                    data = copy.deepcopy(shared_data)
+
+                if spec.get('metadata'):
+                    data.setdefault('metadata', {}).update(spec['metadata'])
+
+                resolved.append({**spec, 'data': data})
+            except Exception as e:
+                resolved.append({**spec, 'error': f"Data fetch failed: {e}"})
+
+        return resolved
+
+    def _post_process(self, output_path: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Post-processing after report generation
+
+        Queues email, Slack/Teams and uploads (notifications.*) in the
+        delivery outbox; they are sent in the background, so the job
+        finishes without waiting for them.
+        """
+        channels = self.delivery.deliver_report(output_path, metadata) if self.delivery else []
+        if channels:
+            print(f"Delivery queued ({', '.join(channels)}) for: {output_path}")
+        else:
+            print(f"Post-processing complete for: {output_path}")
 
     def _handle_error(self, error: Exception):
         """Handle errors during report generation"""
-        # Add error handling logic:
-        # - Log to file
-        # - Send error notification
-        # - Retry mechanism
+        log_error(error)
         print(f"Error logged: {error}")
+        if self.delivery:
+            self.delivery.notify_error(error)
+
+    def _export(self, deck_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Export decks on the exporter's worker pool
+
+        A failed export is logged but does not fail the job; the deck
+        itself was generated.
+        """
+        from exporter import ExportError, format_export
+
+        with span('export', decks=len(deck_paths)) as export_span:
+            results = self.exporter.export_many(deck_paths)
+            export_span['results'] = [{k: r.get(k) for k in ('deck', 'cached', 'timings', 'seconds', 'error')}
+                                      for r in results]
+        for result in results:
+            print(("✗ " if result.get('error') else "✓ ") + format_export(result))
+            if result.get('error'):
+                log_error(ExportError(result['error']), deck=result['deck'])
+        return results
+
+    def apply_retention(self):
+        """Delete catalogued reports older than output.retention_days (output.catalog)"""
+        days = (self.config.get('output', {}) or {}).get('retention_days')
+        if not days:
+            return
+        from output_catalog import open_catalog
+
+        catalog = open_catalog(self.config)
+        if catalog is None:
+            return
+        with catalog:
+            removed = catalog.prune(days)
+        if self.exporter:
+            for path in removed:
+                self.exporter.remove_exports(path)
+        if removed:
+            print(f"Retention: removed {len(removed)} report(s) older than {days} days")
+
+    def finish_deliveries(self):
+        """
+        Wait up to notifications.drain_seconds for queued deliveries
+
+        Used by one-shot commands before the process exits; whatever is
+        still pending stays in the outbox and is sent by the next run.
+        """
+        if self._delivery is None:
+            return
+        timeout = float((self.config.get('notifications', {}) or {}).get('drain_seconds', 120))
+        if not self._delivery.drain(timeout):
+            print(f"Deliveries still pending after {timeout:g}s; kept in {self._delivery.outbox.directory}")
+        self._delivery.stop()
 
     def run_now(self):
         """Run report generation immediately (for testing)"""
         print("Running report generation immediately...")
         self.generate_report_job()
 
+    def run_profiled(self) -> bool:
+        """Run report generation once under cProfile/tracemalloc; True if it succeeded"""
+        log_file = self.config.get('logging', {}).get('file') or 'logs/reports_automation.log'
+        output_dir = os.path.dirname(log_file) or '.'
+        print("Running report generation with profiling (slower than a normal run)...")
+        succeeded, report_path = profile_run(self.generate_report_job, output_dir)
+        print(f"Profile report written to {report_path}")
+        return bool(succeeded)
+
+    def use_data_file(self, data_path: str):
+        """Read report data from a JSON file instead of the configured source"""
+        self.config = copy.deepcopy(self.config)
+        self.config['data_source'] = {'type': 'json', 'json_path': data_path}
+        self._data_fetcher = None
+
+    def use_snapshot(self, week: str):
+        """Read report data for a past week from the snapshot store (backfills)"""
+        self.config = copy.deepcopy(self.config)
+        self.config['data_source'] = {'type': 'snapshot', 'week': week}
+        self._data_fetcher = None
+
+    def fetch(self, output_path: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch report data only (no template or PowerPoint work) and write it as JSON"""
+        with run_context('fetch') as spans:
+            with span('fetch', source=self.data_fetcher.data_source_type):
+                data = self.data_fetcher.fetch_data()
+
+        text = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+        if output_path:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"Data written to {output_path} ({format_spans(spans, 'fetch')})")
+        else:
+            print(text)
+        return data
+
+    def validate(self) -> List[str]:
+        """
+        Check the configuration without fetching data or opening PowerPoint
+
+        Verifies that the template is a readable .pptx package, that local
+        JSON data files parse and match the report model, and that every
+        schedule job builds.
+
+        Returns:
+            List of problems (empty when everything is valid)
+        """
+        import zipfile
+        from json_stream import load_sections
+        from report_model import parse_report
+
+        problems = []
+        template_path = (self.config.get('template', {}) or {}).get('path', '')
+        if not os.path.exists(template_path):
+            problems.append(f"template not found: {template_path}")
+        elif not zipfile.is_zipfile(template_path):
+            problems.append(f"template is not a .pptx file: {template_path}")
+        else:
+            with zipfile.ZipFile(template_path) as package:
+                if 'ppt/presentation.xml' not in package.namelist():
+                    problems.append(f"template has no presentation part: {template_path}")
+
+        source = self.config.get('data_source', {}) or {}
+        required = (self.config.get('validation', {}) or {}).get('required_sections', ['metadata'])
+        data_files = []
+        if source.get('type') == 'json':
+            data_files.append((source.get('json_path', 'data/weekly_data.json'), None))
+        for name, section_source in (source.get('sections') or {}).items():
+            if isinstance(section_source, dict) and section_source.get('type') == 'json':
+                data_files.append((section_source.get('json_path', f"data/{name}.json"), name))
+
+        for path, section in data_files:
+            if not os.path.exists(path):
+                problems.append(f"data file not found: {path}")
+                continue
+            try:
+                data = load_sections(path)
+            except (OSError, ValueError) as e:
+                problems.append(f"data file not readable: {path} ({e})")
+                continue
+            if section is None:
+                _, errors = parse_report(data, required)
+            else:
+                # A section file holds the bare section or a document containing it
+                _, errors = parse_report(data if section in data else {section: data}, [section])
+            problems.extend(f"{path}: {error}" for error in errors)
+
+        try:
+            self._build_jobs(self.config.get('schedule', {}) or {})
+        except (KeyError, ValueError) as e:
+            problems.append(f"schedule: {e}")
+
+        output_dir = (self.config.get('output', {}) or {}).get('directory', './reports')
+        if os.path.exists(output_dir) and not os.access(output_dir, os.W_OK):
+            problems.append(f"output directory not writable: {output_dir}")
+        return problems
+
     def start_scheduler(self):
         """Start the scheduler to run reports automatically"""
-        schedule_config = self.config.get('schedule', {})
-        day = schedule_config.get('day', 'monday').lower()
-        time_str = schedule_config.get('time', '09:00')
+        from cron import CronScheduler
+
+        schedule_config = self.config.get('schedule', {}) or {}
+        jobs = self._build_jobs(schedule_config)
+        cron = CronScheduler(
+            jobs,
+            state_path=schedule_config.get('state_file', 'data/scheduler_state.json'),
+            workers=schedule_config.get('workers', 2)
+        )
 
         print(f"\n{'='*60}")
         print(f"VLines Weekly Reports Automation - Scheduler Started")
         print(f"{'='*60}")
-        print(f"Schedule: Every {day.capitalize()} at {time_str}")
+        for job in jobs:
+            print(f"Job {job.name}: {job.cron.expression} (max {job.max_concurrent} at a time, "
+                  f"catch-up: {job.catch_up})")
         print(f"Configuration: {self.config_path}")
         print(f"Output directory: {self.config.get('output', {}).get('directory', './reports')}")
         print(f"{'='*60}\n")
+        print("Press Ctrl+C to stop the scheduler\n")
 
-        # Schedule the job
-        if day == 'monday':
-            schedule.every().monday.at(time_str).do(self.generate_report_job)
-        elif day == 'tuesday':
-            schedule.every().tuesday.at(time_str).do(self.generate_report_job)
-        elif day == 'wednesday':
-            schedule.every().wednesday.at(time_str).do(self.generate_report_job)
-        elif day == 'thursday':
-            schedule.every().thursday.at(time_str).do(self.generate_report_job)
-        elif day == 'friday':
-            schedule.every().friday.at(time_str).do(self.generate_report_job)
-        elif day == 'saturday':
-            schedule.every().saturday.at(time_str).do(self.generate_report_job)
-        elif day == 'sunday':
-            schedule.every().sunday.at(time_str).do(self.generate_report_job)
-        else:
-            print(f"Warning: Unknown day '{day}', defaulting to Monday")
-            schedule.every().monday.at(time_str).do(self.generate_report_job)
+        self.apply_retention()
 
-        print(f"Next scheduled run: {schedule.next_run()}\n")
-        print("Press Ctrl+C to stop the scheduler\n")
+        # Resume deliveries left in the outbox by earlier runs
+        if self.delivery:
+            self.delivery.start()
+
+        # Sleep in a worker thread so Ctrl+C reaches the main thread promptly
+        loop = threading.Thread(target=cron.run_forever, name='cron', daemon=True)
+        loop.start()
+        try:
+            while loop.is_alive():
+                loop.join(1)
+        except KeyboardInterrupt:
+            print("\n\nStopping scheduler (waiting for running jobs)...")
+            cron.stop()
+            loop.join()
+            print("Scheduler stopped by user")
+        finally:
+            if self._delivery is not None:
+                self._delivery.stop()
+
+    def run_triggered(self):
+        """
+        Generate as soon as fresh data arrives instead of at a fixed time
+
+        Watches the JSON data files (triggers.watch) and/or listens for
+        POST /data-ready (triggers.http); events are debounced by
+        triggers.debounce_seconds and runs never overlap.
+        """
+        from triggers import DataReadyServer, FileWatcher, TriggeredRunner
+
+        trigger_config = self.config.get('triggers', {}) or {}
+        watch_config = trigger_config.get('watch', {}) or {}
+        http_config = trigger_config.get('http', {}) or {}
+
+        watching = watch_config.get('enabled', True)
+        paths = (watch_config.get('paths') or self._data_files()) if watching else []
+        runner = TriggeredRunner(self.generate_report_job, paths,
+                                 trigger_config.get('debounce_seconds', 30))
+
+        print(f"\n{'='*60}")
+        print(f"VLines Weekly Reports Automation - Trigger Mode")
+        print(f"{'='*60}")
+
+        watcher = None
+        if paths:
+            watcher = FileWatcher(paths, runner.file_changed, watch_config.get('poll_seconds', 2))
+            watcher.start()
+            print(f"Watching ({watcher.mode}): {', '.join(paths)}")
+
+        server = None
+        if http_config.get('enabled'):
+            token = os.path.expandvars(str(http_config.get('token') or ''))
+            if token.startswith('$'):
+                token = ''  # environment variable not set
+            server = DataReadyServer(http_config.get('host', '127.0.0.1'), http_config.get('port', 8765),
+                                     runner.data_ready, token or None)
+            server.start()
+            host, port = server.address[:2]
+            print(f"Listening for POST http://{host}:{port}/data-ready")
+
+        if watcher is None and server is None:
+            print("No triggers enabled (triggers.watch / triggers.http)")
+            return
+
+        print(f"Debounce: {runner.debouncer.delay:g}s")
+        if self.delivery:
+            self.delivery.start()
+        print(f"{'='*60}\n")
+        print("Press Ctrl+C to stop\n")
 
-        # Keep the scheduler running
         try:
             while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                time.sleep(1)
         except KeyboardInterrupt:
-            print("\n\nScheduler stopped by user")
+            print("\n\nTrigger mode stopped by user")
+        finally:
+            runner.debouncer.cancel()
+            if watcher is not None:
+                watcher.stop()
+            if server is not None:
+                server.stop()
+            if self._delivery is not None:
+                self._delivery.stop()
+
+    def _data_files(self) -> List[str]:
+        """Local JSON files the configured data source reads"""
+        source = self.config.get('data_source', {}) or {}
+        paths = []
+        if source.get('type') == 'json':
+            paths.append(source.get('json_path', 'data/weekly_data.json'))
+        for section_source in (source.get('sections') or {}).values():
+            if isinstance(section_source, dict) and section_source.get('type') == 'json':
+                paths.append(section_source.get('json_path'))
+        return [p for p in paths if p]
+
+    def _build_jobs(self, schedule_config: Dict[str, Any]) -> List[Any]:
+        """
+        Jobs from schedule.jobs, or one weekly job from schedule.day/time
 
+        Each job has a cron expression and an action: 'weekly' (the normal
+        report) or 'batch' (with a spec file, as --batch).
+        """
+        from cron import Job
 
-def main():
+        jobs_config = schedule_config.get('jobs')
+        if not jobs_config:
+            day = str(schedule_config.get('day', 'monday')).lower()
+            if day not in WEEKDAYS and day not in [d[:3] for d in WEEKDAYS]:
+                print(f"Warning: Unknown day '{day}', defaulting to Monday")
+                day = 'monday'
+            day = day[:3]
+            hour, minute = str(schedule_config.get('time', '09:00')).split(':')
+            jobs_config = {'weekly': {'cron': f"{int(minute)} {int(hour)} * * {day}"}}
+
+        jobs = []
+        for name, job_config in jobs_config.items():
+            jobs.append(Job(
+                name=name,
+                cron=job_config['cron'],
+                action=self._job_action(name, job_config),
+                max_concurrent=job_config.get('max_concurrent', 1),
+                catch_up=job_config.get('catch_up', 'latest'),
+                max_catch_up=job_config.get('max_catch_up', 10)
+            ))
+        return jobs
+
+    def _job_action(self, name: str, job_config: Dict[str, Any]):
+        action = job_config.get('action', 'weekly')
+        if action == 'weekly':
+            # Own fetcher/generator per run, so jobs on different workers share no state
+            def run_weekly():
+                from data_fetcher import DataFetcher
+                from generator import WeeklyReportGenerator
+                data_fetcher = DataFetcher(self.config)
+                try:
+                    return self.generate_report_job(data_fetcher=data_fetcher,
+                                                    report_generator=WeeklyReportGenerator(self.config))
+                finally:
+                    # Session, connection pool and snapshot store are per run
+                    data_fetcher.close()
+            return run_weekly
+        if action == 'batch':
+            if not job_config.get('spec'):
+                raise ValueError(f"Job {name}: batch action needs a 'spec' file")
+            return lambda: self.run_batch(job_config['spec'], job_config.get('workers'))['failed'] == 0
+        raise ValueError(f"Job {name}: unknown action '{action}'")
+
+
+COMMANDS = ('start', 'render', 'validate', 'fetch', 'serve', 'watch', 'batch')
+
+# Old flag-style invocations and the subcommands they map to
+LEGACY_FLAGS = {
+    '--now': ['render'], '-n': ['render'],
+    '--profile': ['render', '--profile'],
+    '--watch': ['watch'], '-w': ['watch'],
+    '--batch': ['batch'], '-b': ['batch'],
+}
+
+
+def build_parser():
+    """Command line parser (stdlib only, so --help stays fast)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='scheduler.py',
+        description="VLines Weekly Reports Automation",
+        epilog="Without a command the scheduler starts and runs the configured jobs. "
+               "The old flags --now, --now --profile, --watch and --batch still work."
+    )
+    parser.add_argument('--config', default='config/config.yaml', help="Configuration file")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    commands.add_parser('start', help="Start the scheduler (default)")
+
+    render = commands.add_parser('render', help="Generate the report once, now")
+    render.add_argument('--data', help="Read data from this JSON file instead of the configured source")
+    render.add_argument('--week', help="Render a past week from the snapshot store (e.g. 2025-W40)")
+    render.add_argument('--profile', action='store_true',
+                        help="Write a cProfile/tracemalloc report next to the log file")
+
+    validate = commands.add_parser('validate', help="Check config, template and data files")
+    validate.add_argument('--data', help="Also check this JSON data file")
+
+    fetch = commands.add_parser('fetch', help="Fetch report data and write it as JSON")
+    fetch.add_argument('-o', '--output', help="Output file (default: stdout)")
+
+    serve = commands.add_parser('serve', help="Run the warm render server")
+    serve.add_argument('--host', help="Bind address (default: server.host)")
+    serve.add_argument('--port', type=int, help="Port (default: server.port)")
+    serve.add_argument('--socket', help="Serve on this Unix socket instead of TCP")
+    serve.add_argument('--workers', type=int, help="Concurrent renders (default: server.workers)")
+    serve.add_argument('--queue-size', type=int, help="Requests waiting for a worker before 503s")
+
+    commands.add_parser('watch', help="Generate as soon as fresh data arrives")
+
+    batch = commands.add_parser('batch', help="Generate every report listed in a spec file")
+    batch.add_argument('spec', help="YAML or JSON spec file")
+    batch.add_argument('--workers', type=int, help="Parallel workers")
+    return parser
+
+
+def _translate_legacy(argv: List[str]) -> List[str]:
+    """Rewrite '--now --profile' style arguments as subcommands"""
+    for i, arg in enumerate(argv):
+        if arg in COMMANDS:
+            break
+        if arg in LEGACY_FLAGS:
+            command = list(LEGACY_FLAGS[arg])
+            rest = argv[i + 1:]
+            if command == ['render'] and '--profile' in rest:
+                command.append('--profile')
+                rest = [a for a in rest if a != '--profile']
+            return argv[:i] + command + rest
+    return argv
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Main entry point"""
     import sys
 
-    scheduler = ReportScheduler()
-
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--now' or sys.argv[1] == '-n':
-            # Run immediately
-            scheduler.run_now()
-        elif sys.argv[1] == '--help' or sys.argv[1] == '-h':
-            print("VLines Weekly Reports Automation")
-            print("\nUsage:")
-            print("  python scheduler.py           Start the scheduler (runs weekly)")
-            print("  python scheduler.py --now     Generate report immediately")
-            print("  python scheduler.py --help    Show this help message")
-        else:
-            print(f"Unknown argument: {sys.argv[1]}")
-            print("Use --help for usage information")
-    else:
-        # Start scheduler
-        scheduler.start_scheduler()
+    args = build_parser().parse_args(_translate_legacy(list(sys.argv[1:] if argv is None else argv)))
+    command = args.command or 'start'
+
+    scheduler = ReportScheduler(args.config)
+    if getattr(args, 'data', None):
+        scheduler.use_data_file(args.data)
+    elif getattr(args, 'week', None):
+        scheduler.use_snapshot(args.week)
+
+    if command == 'render':
+        try:
+            if args.profile:
+                return 0 if scheduler.run_profiled() else 1
+            return 0 if scheduler.generate_report_job() else 1
+        finally:
+            scheduler.finish_deliveries()
+    if command == 'validate':
+        problems = scheduler.validate()
+        for problem in problems:
+            print(f"✗ {problem}")
+        print("✓ Configuration valid" if not problems else f"{len(problems)} problem(s) found")
+        return 1 if problems else 0
+    if command == 'fetch':
+        scheduler.fetch(args.output)
+        return 0
+    if command == 'serve':
+        from render_server import serve
+        return serve(scheduler.config, host=args.host, port=args.port, socket_path=args.socket,
+                     workers=args.workers, queue_size=args.queue_size)
+    if command == 'watch':
+        scheduler.run_triggered()
+        return 0
+    if command == 'batch':
+        try:
+            summary = scheduler.run_batch(args.spec, workers=args.workers)
+        finally:
+            scheduler.finish_deliveries()
+        return 1 if summary['failed'] else 0
+
+    scheduler.start_scheduler()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    sys.exit(main())
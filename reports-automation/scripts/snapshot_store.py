@@ -0,0 +1,208 @@
+"""
+Snapshot Store
+Compressed per-week snapshots of fetched report data in SQLite, for history and backfills
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+
+
+# Top-level keys that are derived at render time, not fetched
+DERIVED_SECTIONS = ('metrics',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    week TEXT NOT NULL,
+    section TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (week, section)
+) WITHOUT ROWID
+"""
+
+
+class SnapshotStore:
+    """
+    Fetched report data, one compressed row per (week, section)
+
+    Each section is stored as zlib-compressed JSON in its own row, so a
+    query for a few sections over many weeks never reads or decompresses
+    the others. The (week, section) primary key is the index for week
+    range queries; ISO weeks ('YYYY-Www') sort chronologically as text.
+    Saving a week again only rewrites sections whose content changed.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        self.path = path
+        self.compression_level = int(compression_level)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def save(self, data: Dict[str, Any], skip_sections: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Store the sections of one fetched report under metadata.week
+
+        Args:
+            data: Report data with metadata.week
+            skip_sections: Sections not to store (e.g. sample or stale fallbacks)
+
+        Returns:
+            Dictionary with week, written/unchanged section names and byte counts
+        """
+        week = (data.get('metadata') or {}).get('week')
+        if not week:
+            raise ValueError("Snapshot needs metadata.week")
+
+        skip = set(skip_sections) | set(DERIVED_SECTIONS)
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        raw_total = stored_total = 0
+        for section, value in data.items():
+            if section in skip:
+                continue
+            raw = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'),
+                             default=str).encode('utf-8')
+            payload = zlib.compress(raw, self.compression_level)
+            rows.append((week, section, fetched_at, hashlib.sha256(raw).hexdigest(), len(raw), payload))
+            raw_total += len(raw)
+            stored_total += len(payload)
+
+        with self._lock:
+            before = self._conn.total_changes
+            written = []
+            for row in rows:
+                self._conn.execute(
+                    "INSERT INTO snapshots (week, section, fetched_at, digest, raw_bytes, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (week, section) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                    "digest = excluded.digest, raw_bytes = excluded.raw_bytes, payload = excluded.payload "
+                    "WHERE snapshots.digest != excluded.digest", row)
+                if self._conn.total_changes > before:
+                    written.append(row[1])
+                    before = self._conn.total_changes
+            self._conn.commit()
+
+        return {
+            'week': week,
+            'written': written,
+            'unchanged': [row[1] for row in rows if row[1] not in written],
+            'raw_bytes': raw_total,
+            'stored_bytes': stored_total,
+        }
+
+    def load(self, week: str, sections: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """One week's data (only the given sections), or None if the week is not stored"""
+        reports = self.range(week, week, sections)
+        return reports[0] if reports else None
+
+    def latest_week(self, before: Optional[str] = None) -> Optional[str]:
+        """Most recent stored week (strictly before `before` when given)"""
+        query = "SELECT MAX(week) FROM snapshots"
+        params: tuple = ()
+        if before:
+            query += " WHERE week < ?"
+            params = (before,)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def range(self, start: Optional[str] = None, end: Optional[str] = None,
+              sections: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Stored reports with start <= week <= end (open-ended when None), oldest first
+
+        metadata is always included so each report carries its week.
+        """
+        clauses, params = [], []
+        if start:
+            clauses.append("week >= ?")
+            params.append(start)
+        if end:
+            clauses.append("week <= ?")
+            params.append(end)
+        if sections is not None:
+            wanted = sorted(set(sections) | {'metadata'})
+            clauses.append(f"section IN ({', '.join('?' * len(wanted))})")
+            params.extend(wanted)
+
+        query = "SELECT week, section, payload FROM snapshots"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY week"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        reports: Dict[str, Dict[str, Any]] = {}
+        for week, section, payload in rows:
+            report = reports.setdefault(week, {})
+            report[section] = json.loads(zlib.decompress(payload))
+        for week, report in reports.items():
+            report.setdefault('metadata', {}).setdefault('week', week)
+        return list(reports.values())
+
+    def previous(self, week: str, count: int, sections: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """The `count` stored weeks before `week`, oldest first"""
+        if count <= 0:
+            return []
+        with self._lock:
+            weeks = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT week FROM snapshots WHERE week < ? ORDER BY week DESC LIMIT ?",
+                (week, int(count)))]
+        if not weeks:
+            return []
+        return self.range(weeks[-1], weeks[0], sections)
+
+    def digests(self, week: str, count: int, sections: Optional[Iterable[str]] = None) -> List[tuple]:
+        """(week, section, digest) of the `count` stored weeks before `week`, without loading payloads"""
+        if count <= 0:
+            return []
+        query = ("SELECT week, section, digest FROM snapshots WHERE week IN "
+                 "(SELECT DISTINCT week FROM snapshots WHERE week < ? ORDER BY week DESC LIMIT ?)")
+        params: list = [week, int(count)]
+        if sections is not None:
+            wanted = sorted(set(sections))
+            query += f" AND section IN ({', '.join('?' * len(wanted))})"
+            params.extend(wanted)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY week, section", params).fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored weeks, rows and raw vs compressed size"""
+        with self._lock:
+            weeks, rows, raw, stored, first, last = self._conn.execute(
+                "SELECT COUNT(DISTINCT week), COUNT(*), COALESCE(SUM(raw_bytes), 0), "
+                "COALESCE(SUM(LENGTH(payload)), 0), MIN(week), MAX(week) FROM snapshots").fetchone()
+        return {'weeks': weeks, 'rows': rows, 'raw_bytes': raw, 'stored_bytes': stored,
+                'first_week': first, 'last_week': last}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_store(config: Dict[str, Any]) -> Optional[SnapshotStore]:
+    """Snapshot store from config.yaml snapshots.*, or None when disabled"""
+    snapshot_config = config.get('snapshots', {}) or {}
+    if not snapshot_config.get('enabled', False):
+        return None
+    return SnapshotStore(snapshot_config.get('path', 'data/snapshots.db'),
+                         snapshot_config.get('compression_level', 6))
@@ -0,0 +1,167 @@
+"""
+Template Cache
+Keeps parsed PowerPoint templates in memory so repeated renders skip the unzip, XML parse and placeholder scan
+"""
+
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+from pptx import Presentation
+from pptx.opc.oxml import CT_Relationships
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import PACKAGE_URI
+from pptx.oxml import parse_xml
+from pptx.package import Package
+
+from template_index import PlaceholderIndex
+
+
+class TemplateCache:
+    """
+    Bounded LRU cache of templates
+
+    Entries are keyed on (absolute path, mtime, content hash), so editing or
+    replacing the template file is picked up on the next load. Each entry
+    holds a TemplateParts snapshot of the parsed template and its
+    PlaceholderIndex; callers get a Presentation built from the snapshot,
+    so every load is an independent object graph without touching disk,
+    unzipping or parsing XML, or scanning for placeholders again.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple[str, int, str], Tuple[TemplateParts, PlaceholderIndex]]' = OrderedDict()
+        # (path, mtime_ns, size) -> sha256, so unchanged files are not re-hashed
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, template_path: str) -> Tuple[Any, PlaceholderIndex]:
+        """
+        Get a fresh copy of a template and its placeholder index
+
+        Args:
+            template_path: Path to the .pptx template
+
+        Returns:
+            Tuple of (Presentation safe to modify, PlaceholderIndex)
+        """
+        parts, index = self._entry(template_path)
+        return parts.presentation(), index
+
+    def index(self, template_path: str) -> PlaceholderIndex:
+        """Placeholder index of a template, without opening a copy of it (hits are not counted)"""
+        return self._entry(template_path, count=False)[1]
+
+    def _entry(self, template_path: str, count: bool = True) -> Tuple['TemplateParts', PlaceholderIndex]:
+        key = self._key(template_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += count
+            else:
+                self.misses += 1
+                parts = TemplateParts(Presentation(key[0]))
+                entry = (parts, PlaceholderIndex.build(parts.presentation()))
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def key_for(self, template_path: str) -> Tuple[str, int, str]:
+        """Cache key (path, mtime, content hash) for a template file"""
+        with self._lock:
+            return self._key(template_path)
+
+    def clear(self):
+        """Drop all cached templates and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries
+        }
+
+    def _key(self, template_path: str) -> Tuple[str, int, str]:
+        path = os.path.abspath(template_path)
+        st = os.stat(path)
+        stat_key = (path, st.st_mtime_ns, st.st_size)
+
+        digest = self._digests.get(stat_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._digests = {k: v for k, v in self._digests.items() if k[0] != path}
+            self._digests[stat_key] = digest
+
+        return path, st.st_mtime_ns, digest
+
+
+class TemplateParts:
+    """
+    Pristine parts of a parsed template, from which independent copies are built
+
+    XML parts keep their parsed tree and are deep-copied per copy (an lxml
+    copy, far cheaper than unzipping and parsing the package again); binary
+    parts (images, media, embedded workbooks) share their immutable bytes.
+    Relationships are re-linked between the new parts of each copy.
+    """
+
+    def __init__(self, prs):
+        package = prs.part.package
+        self._parts: List[Tuple[type, Any, str, Any]] = []
+        self._rels: Dict[Any, Any] = {PACKAGE_URI: parse_xml(package._rels.xml)}
+        for part in package.iter_parts():
+            payload = part._element if isinstance(part, XmlPart) else part.blob
+            self._parts.append((type(part), part.partname, part.content_type, payload))
+            self._rels[part.partname] = (parse_xml(part.rels.xml) if len(part.rels)
+                                         else CT_Relationships.new())
+
+    def presentation(self):
+        """A new Presentation with its own copy of every XML part"""
+        package = Package(None)
+        parts = {}
+        for part_class, partname, content_type, payload in self._parts:
+            if issubclass(part_class, XmlPart):
+                parts[partname] = part_class(partname, content_type, package, copy.deepcopy(payload))
+            else:
+                parts[partname] = part_class.load(partname, content_type, package, payload)
+        for partname, part in parts.items():
+            part.load_rels_from_xml(self._rels[partname], parts)
+        package._rels.load_from_xml(PACKAGE_URI, self._rels[PACKAGE_URI], parts)
+        return package.main_document_part.presentation
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_template_cache(max_entries: int = 4) -> TemplateCache:
+    """Process-wide cache shared by all generators (grows to the largest requested size)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TemplateCache(max_entries)
+        elif max_entries > _shared_cache.max_entries:
+            _shared_cache.max_entries = max_entries
+        return _shared_cache
@@ -0,0 +1,189 @@
+"""
+Template Placeholder Index
+Scans a presentation once and records where every {{PLACEHOLDER}} lives
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
+
+from pptx.oxml.ns import qn
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([A-Za-z0-9_.]+)\s*\}\}')
+
+
+class PlaceholderLocation(NamedTuple):
+    """Position of one placeholder occurrence inside a presentation"""
+    slide: int
+    shape: str
+    paragraph: int
+    runs: Tuple[int, int]
+    start: int
+    end: int
+
+
+class PlaceholderIndex:
+    """
+    Map from placeholder name to every location it occurs in a presentation
+
+    Locations are stored as indices (slide number, paragraph ordinal within
+    the slide, run range) rather than object references, so an index built
+    from one copy of a template can be applied to any other copy of it.
+    Placeholders split across several runs (PowerPoint does this whenever
+    spell-check or an edit touches the middle of a token) are detected by
+    matching against the concatenated text of each paragraph.
+    """
+
+    def __init__(self, locations: Dict[str, List[PlaceholderLocation]]):
+        self.locations = locations
+
+    @classmethod
+    def build(cls, prs) -> 'PlaceholderIndex':
+        """
+        Scan every slide of a presentation once
+
+        Args:
+            prs: python-pptx Presentation to index
+
+        Returns:
+            PlaceholderIndex for the presentation
+        """
+        locations: Dict[str, List[PlaceholderLocation]] = {}
+
+        for slide_idx, slide in enumerate(prs.slides):
+            for para_idx, p in enumerate(slide._element.iter(qn('a:p'))):
+                runs = p.findall(qn('a:r'))
+                if not runs:
+                    continue
+
+                texts = [_run_text(r) for r in runs]
+                text = ''.join(texts)
+                if '{{' not in text:
+                    continue
+
+                bounds = _run_bounds(texts)
+                shape_name = _shape_name(p)
+                for match in PLACEHOLDER_PATTERN.finditer(text):
+                    first = _run_at(bounds, match.start())
+                    last = _run_at(bounds, match.end() - 1)
+                    locations.setdefault(match.group(1), []).append(PlaceholderLocation(
+                        slide=slide_idx,
+                        shape=shape_name,
+                        paragraph=para_idx,
+                        runs=(first, last),
+                        start=match.start(),
+                        end=match.end()
+                    ))
+
+        return cls(locations)
+
+    @property
+    def names(self) -> List[str]:
+        """Placeholder names found in the template"""
+        return sorted(self.locations)
+
+    def slides_for(self, name: str) -> List[int]:
+        """Slide indices containing the given placeholder"""
+        return sorted({loc.slide for loc in self.locations.get(name, [])})
+
+    def render(self, prs, values: Dict[str, Any],
+               slides: Optional[Set[int]] = None) -> Dict[str, List[str]]:
+        """
+        Substitute all placeholders in a single pass
+
+        Text is written into the first run a placeholder touches, so that
+        run's formatting is kept; the remainder of the token is removed
+        from the following runs.
+
+        Args:
+            prs: Presentation built from the same template as the index
+            values: Placeholder name -> replacement value
+            slides: Only substitute on these slide indices (default: all)
+
+        Returns:
+            Dictionary with 'unresolved' (in template, no value) and
+            'unused' (value given, not in template) placeholder names
+        """
+        # Group by paragraph so each paragraph is resolved and rewritten once
+        by_paragraph: Dict[Tuple[int, int], List[Tuple[str, PlaceholderLocation]]] = {}
+        for name, locs in self.locations.items():
+            if name not in values:
+                continue
+            for loc in locs:
+                if slides is not None and loc.slide not in slides:
+                    continue
+                by_paragraph.setdefault((loc.slide, loc.paragraph), []).append((name, loc))
+
+        slides = list(prs.slides)
+        paragraphs_by_slide: Dict[int, List[Any]] = {}
+
+        for (slide_idx, para_idx), items in by_paragraph.items():
+            if slide_idx not in paragraphs_by_slide:
+                paragraphs_by_slide[slide_idx] = list(slides[slide_idx]._element.iter(qn('a:p')))
+            runs = paragraphs_by_slide[slide_idx][para_idx].findall(qn('a:r'))
+            original = [_run_text(r) for r in runs]
+            texts = list(original)
+            bounds = _run_bounds(original)
+
+            # Right to left so earlier offsets stay valid
+            for name, loc in sorted(items, key=lambda item: item[1].start, reverse=True):
+                _splice(texts, bounds, loc, str(values[name]))
+
+            for run, old, new in zip(runs, original, texts):
+                if new != old:
+                    run.find(qn('a:t')).text = new
+
+        return {
+            'unresolved': sorted(n for n in self.locations if n not in values),
+            'unused': sorted(n for n in values if n not in self.locations)
+        }
+
+
+def _run_text(r) -> str:
+    t = r.find(qn('a:t'))
+    return (t.text or '') if t is not None else ''
+
+
+def _run_bounds(texts: List[str]) -> List[int]:
+    """Start offset of each run within the paragraph text"""
+    bounds = []
+    offset = 0
+    for text in texts:
+        bounds.append(offset)
+        offset += len(text)
+    return bounds
+
+
+def _run_at(bounds: List[int], offset: int) -> int:
+    """Index of the run containing a character offset"""
+    return bisect_right(bounds, offset) - 1
+
+
+def _splice(texts: List[str], bounds: List[int], loc: PlaceholderLocation, value: str):
+    """Replace one placeholder occurrence in the list of run texts"""
+    first, last = loc.runs
+    start = loc.start - bounds[first]
+    end = loc.end - bounds[last]
+
+    if first == last:
+        texts[first] = texts[first][:start] + value + texts[first][end:]
+        return
+
+    texts[first] = texts[first][:start] + value
+    for i in range(first + 1, last):
+        texts[i] = ''
+    texts[last] = texts[last][end:]
+
+
+def _shape_name(p) -> str:
+    """Name of the shape (or graphic frame) that owns a paragraph"""
+    node = p.getparent()
+    while node is not None:
+        if node.tag in (qn('p:sp'), qn('p:graphicFrame')):
+            c_nv_pr = node.find('.//' + qn('p:cNvPr'))
+            if c_nv_pr is not None:
+                return c_nv_pr.get('name', '')
+            break
+        node = node.getparent()
+    return ''
@@ -0,0 +1,299 @@
+"""
+Triggers
+Starts report generation when source data lands: file watching and a data-ready HTTP endpoint
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, List, Optional
+
+from instrumentation import emit
+from json_stream import load_sections
+
+
+class Debouncer:
+    """
+    Calls an action once events have stopped arriving for `delay` seconds
+
+    Every trigger() restarts the timer, so a burst of writes (a file copied
+    in chunks, several section files landing together) causes one call.
+    Reasons passed to trigger() are collected and handed to the action.
+    """
+
+    def __init__(self, delay: float, action: Callable[[List[str]], Any]):
+        self.delay = max(0.0, float(delay))
+        self.action = action
+        self._timer: Optional[threading.Timer] = None
+        self._reasons: List[str] = []
+        self._lock = threading.Lock()
+
+    def trigger(self, reason: str):
+        with self._lock:
+            if reason not in self._reasons:
+                self._reasons.append(reason)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._reasons = []
+
+    def _fire(self):
+        with self._lock:
+            reasons, self._reasons = self._reasons, []
+            self._timer = None
+        self.action(reasons)
+
+
+class FileWatcher:
+    """
+    Reports changes to a set of files
+
+    Uses the watchdog package (inotify/FSEvents/ReadDirectoryChangesW) when
+    it is installed, otherwise polls each file's size and mtime every
+    poll_seconds. The parent directories are watched, so files that do not
+    exist yet, or are replaced by rename, are picked up.
+    """
+
+    def __init__(self, paths: List[str], on_change: Callable[[str], Any], poll_seconds: float = 2.0):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.on_change = on_change
+        self.poll_seconds = max(0.1, float(poll_seconds))
+        self.mode = None
+        self._observer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        try:
+            self._start_watchdog()
+            self.mode = 'events'
+        except ImportError:
+            self._thread = threading.Thread(target=self._poll, name='file-watch', daemon=True)
+            self._thread.start()
+            self.mode = 'polling'
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _start_watchdog(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watched = set(self.paths)
+        on_change = self.on_change
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+                    if path and os.path.abspath(path) in watched:
+                        on_change(os.path.abspath(path))
+
+        observer = Observer()
+        for directory in {os.path.dirname(p) for p in self.paths}:
+            os.makedirs(directory, exist_ok=True)
+            observer.schedule(_Handler(), directory, recursive=False)
+        observer.start()
+        self._observer = observer
+
+    def _poll(self):
+        last = {path: _stat_key(path) for path in self.paths}
+        while not self._stop.wait(self.poll_seconds):
+            for path in self.paths:
+                current = _stat_key(path)
+                if current != last[path]:
+                    last[path] = current
+                    if current is not None:
+                        self.on_change(path)
+
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class DataReadyServer:
+    """
+    Local HTTP endpoint for "data ready" pushes
+
+        POST /data-ready   body (optional JSON): {"source": "...", "week": "..."}
+        GET  /health
+
+    A POST is acknowledged with 202 and handed to on_ready; generation
+    runs in the background. When a token is configured, requests must
+    send it in the X-Trigger-Token header.
+    """
+
+    def __init__(self, host: str, port: int, on_ready: Callable[[Dict[str, Any]], Any],
+                 token: Optional[str] = None):
+        self.on_ready = on_ready
+        self.token = token or None
+        self._server = ThreadingHTTPServer((host, int(port)), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='data-ready', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _handler_class(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') == '/health':
+                    self._reply(200, {'status': 'ok'})
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/data-ready':
+                    self._reply(404, {'error': 'not found'})
+                    return
+                if server.token and not hmac.compare_digest(
+                        self.headers.get('X-Trigger-Token', ''), server.token):
+                    self._reply(401, {'error': 'invalid token'})
+                    return
+
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                try:
+                    payload = json.loads(body) if body.strip() else {}
+                except json.JSONDecodeError:
+                    self._reply(400, {'error': 'body must be JSON'})
+                    return
+                if not isinstance(payload, dict):
+                    payload = {'value': payload}
+
+                server.on_ready(payload)
+                self._reply(202, {'status': 'accepted'})
+
+            def _reply(self, status: int, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                emit('http_request', component='data-ready', message=format % args)
+
+        return _Handler
+
+
+class TriggeredRunner:
+    """
+    Runs a job when data arrives, at most one run at a time
+
+    Triggers are debounced. When the quiet period ends, each watched file
+    must be complete (non-empty and parseable JSON) and at least one must
+    differ from the content used by the previous run; otherwise the run
+    is skipped. A trigger during a run schedules exactly one follow-up
+    run after it, so data landing mid-run is never lost.
+    """
+
+    def __init__(self, job: Callable[[], Any], watch_paths: List[str], debounce_seconds: float = 30):
+        self.job = job
+        self.watch_paths = [os.path.abspath(p) for p in watch_paths]
+        self.debouncer = Debouncer(debounce_seconds, self._ready)
+        self.runs = 0
+        self._digests: Dict[str, str] = {path: _file_digest(path) for path in self.watch_paths}
+        self._running = False
+        self._pending: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def file_changed(self, path: str):
+        self.debouncer.trigger(f"file:{os.path.relpath(path)}")
+
+    def data_ready(self, payload: Dict[str, Any]):
+        source = payload.get('source') or payload.get('week') or 'push'
+        # An explicit push means "generate", even if the files are unchanged
+        self.debouncer.trigger(f"http:{source}")
+
+    def _ready(self, reasons: List[str]):
+        with self._lock:
+            if self._running:
+                self._pending = (self._pending or []) + reasons
+                return
+            self._running = True
+
+        while True:
+            try:
+                self._run(reasons)
+            finally:
+                with self._lock:
+                    reasons, self._pending = self._pending, None
+                    if reasons is None:
+                        self._running = False
+                        return
+
+    def _run(self, reasons: List[str]):
+        pushed = any(reason.startswith('http:') for reason in reasons)
+        incomplete = [p for p in self.watch_paths if os.path.exists(p) and not _is_complete(p)]
+        if incomplete:
+            print(f"Trigger ignored, data not complete yet: {', '.join(incomplete)}")
+            emit('trigger_skipped', reasons=reasons, reason='incomplete', paths=incomplete)
+            return
+
+        digests = {path: _file_digest(path) for path in self.watch_paths}
+        if not pushed and digests == self._digests:
+            emit('trigger_skipped', reasons=reasons, reason='unchanged')
+            return
+
+        print(f"\nData ready ({', '.join(reasons)}), generating report...")
+        emit('trigger', reasons=reasons)
+        self.runs += 1
+        self._digests = digests
+        self.job()
+
+
+def _is_complete(path: str) -> bool:
+    """A data file is complete when it is non-empty and parses as JSON/NDJSON"""
+    try:
+        if os.path.getsize(path) == 0:
+            return False
+        # Streams through the file keeping only metadata, so this is cheap in memory
+        load_sections(path, ['metadata'])
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,144 @@
+"""
+Shared test fixtures
+Puts scripts/ on the import path and provides a scripted local HTTP server and a report template
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+
+class StubHTTPServer:
+    """
+    HTTP server on 127.0.0.1 answering each request with the next scripted response
+
+    Responses are (status, body, headers, delay) tuples added with respond();
+    once the script runs out every request gets a 500. Requests are recorded
+    as dicts with method, path, headers and body.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                with stub._lock:
+                    stub.requests.append({'method': self.command, 'path': self.path,
+                                          'headers': dict(self.headers), 'body': body})
+                    status, payload, headers, delay = (stub.responses.pop(0) if stub.responses
+                                                       else (500, b'script exhausted', {}, 0))
+                if delay:
+                    time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if payload:
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def respond(self, status=200, body=b'', headers=None, delay=0.0):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        with self._lock:
+            self.responses.append((status, body, headers or {}, delay))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def http_stub():
+    stub = StubHTTPServer()
+    yield stub
+    stub.close()
+
+
+SHIP_COLUMNS = ['ship_name', 'voyage', 'route', 'status']
+
+
+def build_report_template(path):
+    """
+    Four-slide template: week title, ship schedule table (header plus a
+    bold 11pt prototype row), domestic performance chart, receivables text
+    """
+    from pptx import Presentation
+    from pptx.chart.data import CategoryChartData
+    from pptx.enum.chart import XL_CHART_TYPE
+    from pptx.util import Inches, Pt
+
+    prs = Presentation()
+    layout = prs.slide_layouts[5]
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = 'Week {{REPORT_WEEK}}'
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = 'Ship schedule'
+    frame = slide.shapes.add_table(2, len(SHIP_COLUMNS), Inches(0.3), Inches(1.5), Inches(9), Inches(1))
+    frame.name = 'ShipScheduleTable'
+    for c, column in enumerate(SHIP_COLUMNS):
+        frame.table.cell(0, c).text = column
+        run = frame.table.cell(1, c).text_frame.paragraphs[0].add_run()
+        run.text = '-'
+        run.font.bold = True
+        run.font.size = Pt(11)
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = 'Domestic performance'
+    seed = CategoryChartData()
+    seed.categories = ['-']
+    for name in ('Allocated', 'Actual'):
+        seed.add_series(name, [0])
+    frame = slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(0.5), Inches(1.5),
+                                   Inches(9), Inches(5), seed)
+    frame.name = 'DomesticPerformanceChart'
+
+    slide = prs.slides.add_slide(layout)
+    slide.shapes.title.text = 'Receivables {{TOTAL_RECEIVABLES}}'
+
+    prs.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def render_config(tmp_path):
+    """Incremental render settings for build_report_template (3 schedule rows per slide)"""
+    return {
+        'data_source': {'type': 'sample'},
+        'template': {
+            'path': build_report_template(tmp_path / 'template.pptx'),
+            'placeholders': {'report_week': '{{REPORT_WEEK}}', 'total_receivables': '{{TOTAL_RECEIVABLES}}'},
+            'tables': {'ship_schedule': {'shape': 'ShipScheduleTable', 'columns': SHIP_COLUMNS,
+                                         'header_rows': 1, 'rows_per_slide': 3}},
+            'charts': {'domestic_performance': {'shape': 'DomesticPerformanceChart',
+                                                'data': 'kinh_doanh.domestic_performance',
+                                                'categories': 'weeks',
+                                                'series': {'Allocated': 'allocated', 'Actual': 'actual'}}},
+        },
+        'output': {'directory': str(tmp_path / 'reports'), 'filename_pattern': 'Report_{week}.pptx',
+                   'incremental': True},
+    }
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from cron import CronExpression
+from scheduler import ReportScheduler
+
+
+def test_step_of_one_day_of_month_is_unrestricted():
+    # 2026-10-17 is a Saturday; only Mondays match
+    assert CronExpression('0 9 */1 * mon').next_after(datetime(2026, 10, 17)) == datetime(2026, 10, 19, 9, 0)
+
+
+def test_full_weekday_range_is_unrestricted():
+    assert CronExpression('0 9 1 * 0-6').next_after(datetime(2026, 10, 17)) == datetime(2026, 11, 1, 9, 0)
+
+
+def test_both_day_fields_restricted_match_either():
+    # The 20th (a Tuesday) or any Monday
+    cron = CronExpression('0 9 20 * mon')
+    assert cron.next_after(datetime(2026, 10, 17)) == datetime(2026, 10, 19, 9, 0)
+    assert cron.next_after(datetime(2026, 10, 19, 10)) == datetime(2026, 10, 20, 9, 0)
+
+
+@pytest.mark.parametrize('day, expected', [('Friday', 'fri'), ('wed', 'wed'), ('funday', 'mon')])
+def test_schedule_day(tmp_path, capsys, day, expected):
+    config = tmp_path / 'config.yaml'
+    config.write_text(f"schedule:\n  day: {day}\n  time: '08:30'\n", encoding='utf-8')
+
+    jobs = ReportScheduler(str(config))._build_jobs({'day': day, 'time': '08:30'})
+
+    assert jobs[0].cron.expression == f"30 8 * * {expected}"
+    if day == 'funday':
+        assert "Unknown day 'funday', defaulting to Monday" in capsys.readouterr().out
+
+
+def test_weekly_job_closes_its_fetcher(tmp_path, monkeypatch):
+    import data_fetcher
+
+    closed = []
+    monkeypatch.setattr(data_fetcher.DataFetcher, 'close', lambda self: closed.append(self))
+    config = tmp_path / 'config.yaml'
+    config.write_text("schedule:\n  day: monday\n", encoding='utf-8')
+    scheduler = ReportScheduler(str(config))
+
+    def failing_job(data_fetcher, report_generator):
+        raise RuntimeError('render crashed')
+
+    monkeypatch.setattr(scheduler, 'generate_report_job', failing_job)
+
+    with pytest.raises(RuntimeError):
+        scheduler._job_action('weekly', {})()
+
+    assert len(closed) == 1
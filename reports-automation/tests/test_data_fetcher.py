@@ -0,0 +1,116 @@
+import json
+
+import pytest
+import requests
+
+from data_fetcher import DataFetcher, DataFetchError
+
+
+def _fetcher(tmp_path, cache=False):
+    return DataFetcher({'data_source': {
+        'type': 'api',
+        'cache': {'enabled': cache, 'directory': str(tmp_path / 'http_cache'), 'ttl_seconds': 0},
+    }})
+
+
+SOURCE = {'timeout': 2, 'retries': 2, 'backoff': 0.01}
+
+
+def test_retries_server_errors_then_succeeds(tmp_path, http_stub):
+    http_stub.respond(503)
+    http_stub.respond(502)
+    http_stub.respond(200, json.dumps({'ok': 1}))
+
+    payload, info = _fetcher(tmp_path)._http_get_json(http_stub.url + '/week', SOURCE)
+
+    assert payload == {'ok': 1}
+    assert info['attempts'] == 3
+    assert len(http_stub.requests) == 3
+
+
+def test_client_error_is_not_retried(tmp_path, http_stub):
+    http_stub.respond(404)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        _fetcher(tmp_path)._http_get_json(http_stub.url + '/week', SOURCE)
+    assert len(http_stub.requests) == 1
+
+
+def test_invalid_json_is_not_retried(tmp_path, http_stub):
+    http_stub.respond(200, '{"truncated": ')
+
+    with pytest.raises(requests.exceptions.RequestException, match='Invalid JSON'):
+        _fetcher(tmp_path)._http_get_json(http_stub.url + '/week', SOURCE)
+    assert len(http_stub.requests) == 1
+
+
+def test_timeout_is_retried(tmp_path, http_stub):
+    http_stub.respond(200, '{}', delay=0.5)
+    http_stub.respond(200, json.dumps({'ok': 2}))
+
+    payload, info = _fetcher(tmp_path)._http_get_json(
+        http_stub.url + '/week', {'timeout': 0.2, 'retries': 1, 'backoff': 0.01})
+
+    assert payload == {'ok': 2}
+    assert info['attempts'] == 2
+
+
+def test_not_modified_serves_cached_body(tmp_path, http_stub):
+    fetcher = _fetcher(tmp_path, cache=True)
+    http_stub.respond(200, json.dumps({'v': 1}), {'ETag': '"abc"'})
+    http_stub.respond(304)
+
+    first, _ = fetcher._http_get_json(http_stub.url + '/week', SOURCE)
+    second, info = fetcher._http_get_json(http_stub.url + '/week', SOURCE)
+
+    assert first == second == {'v': 1}
+    assert info['cache'] == 'revalidated'
+    assert http_stub.requests[1]['headers'].get('If-None-Match') == '"abc"'
+
+
+def test_not_modified_without_cache_entry_refetches(tmp_path, http_stub):
+    http_stub.respond(304)
+    http_stub.respond(200, json.dumps({'v': 2}))
+
+    payload, info = _fetcher(tmp_path, cache=True)._http_get_json(http_stub.url + '/week', SOURCE)
+
+    assert payload == {'v': 2}
+    assert info['cache'] == 'miss'
+    assert http_stub.requests[1]['headers'].get('Cache-Control') == 'no-cache'
+
+
+def test_stale_cache_served_when_backend_fails(tmp_path, http_stub):
+    fetcher = _fetcher(tmp_path, cache=True)
+    http_stub.respond(200, json.dumps({'v': 3}), {'ETag': '"x"'})
+    fetcher._http_get_json(http_stub.url + '/week', SOURCE)
+    for _ in range(3):
+        http_stub.respond(500)
+
+    payload, info = fetcher._http_get_json(http_stub.url + '/week', SOURCE)
+
+    assert payload == {'v': 3}
+    assert info['cache'] == 'stale'
+    assert info['attempts'] == 3
+
+
+def test_failed_fetch_without_cache_raises(tmp_path, http_stub):
+    http_stub.respond(404)
+    fetcher = DataFetcher({'data_source': {
+        'type': 'api', 'url': http_stub.url + '/week', 'retries': 0,
+        'cache': {'enabled': False},
+    }})
+
+    with pytest.raises(DataFetchError):
+        fetcher.fetch_data()
+
+
+def test_failed_database_fetch_raises(tmp_path):
+    fetcher = DataFetcher({'data_source': {
+        'type': 'database',
+        'database': {'driver': 'sqlite', 'path': str(tmp_path / 'db.sqlite'),
+                     'queries': {'ops.ship_schedule': 'SELECT * FROM missing_table'}},
+    }})
+
+    with pytest.raises(DataFetchError, match='missing_table'):
+        fetcher.fetch_data()
+    fetcher.close()
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from db_source import ConnectionPool, DatabaseSource
+
+
+def test_waiter_opens_replacement_for_discarded_connection():
+    pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), size=1, timeout=5)
+    held = threading.Event()
+    got = []
+
+    def fail_while_holding():
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                held.set()
+                time.sleep(0.2)
+                raise RuntimeError('broken connection')
+
+    def wait_for_connection():
+        held.wait()
+        with pool.connection() as conn:
+            got.append(conn.execute('SELECT 1').fetchone()[0])
+
+    threads = [threading.Thread(target=fail_while_holding), threading.Thread(target=wait_for_connection)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert got == [1]
+    pool.close()
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), size=1, timeout=0.1)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+    pool.close()
+
+
+class _ServerSideCursor:
+    """sqlite cursor that, like a psycopg2 named cursor, has no description before the first fetch"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.description = None
+
+    def execute(self, sql, params):
+        self._cursor.execute(sql, params)
+
+    def fetchmany(self, size):
+        rows = self._cursor.fetchmany(size)
+        self.description = self._cursor.description
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+
+def test_columns_are_read_after_the_first_fetch(tmp_path):
+    db_path = str(tmp_path / 'vlines.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE voyages (ship_name TEXT, voyage TEXT)')
+        conn.executemany('INSERT INTO voyages VALUES (?, ?)', [('BD Star', 'BS2527'), ('BD Mariner', 'MB2525')])
+    source = DatabaseSource({'driver': 'sqlite', 'path': db_path, 'fetch_size': 1, 'queries': {
+        'ops.ship_schedule': 'SELECT ship_name, voyage FROM voyages ORDER BY ship_name'}})
+    source._cursor = lambda conn: _ServerSideCursor(conn.cursor())
+
+    data = source.fetch('2025-W40')
+    source.close()
+
+    assert data['ops']['ship_schedule'] == [
+        {'ship_name': 'BD Mariner', 'voyage': 'MB2525'},
+        {'ship_name': 'BD Star', 'voyage': 'BS2527'},
+    ]
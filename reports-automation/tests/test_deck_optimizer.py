@@ -0,0 +1,24 @@
+import os
+import stat
+
+import pytest
+
+from deck_optimizer import write_atomic
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='POSIX permissions')
+def test_new_deck_follows_umask_and_replaced_deck_keeps_its_mode(tmp_path):
+    path = tmp_path / 'report.pptx'
+    previous = os.umask(0o027)
+    try:
+        write_atomic(str(path), b'first')
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+    path.chmod(0o600)
+    write_atomic(str(path), b'second')
+
+    assert path.read_bytes() == b'second'
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert [p.name for p in tmp_path.iterdir()] == ['report.pptx']
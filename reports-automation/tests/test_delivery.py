@@ -0,0 +1,163 @@
+import json
+import os
+import socketserver
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from delivery import DeliveryPipeline, Outbox, _expand
+
+
+def _pipeline(tmp_path, http_stub, **settings):
+    return DeliveryPipeline({'notifications': {
+        'outbox': str(tmp_path / 'outbox'),
+        'max_attempts': 3,
+        'backoff_seconds': 0.01,
+        'poll_seconds': 0.05,
+        'slack': {'enabled': True, 'webhook_url': f"{http_stub.url}/slack", 'timeout': 5},
+        **settings,
+    }})
+
+
+def _report(tmp_path):
+    path = tmp_path / 'VLines_Weekly_Report_test.pptx'
+    path.write_bytes(b'PK' + os.urandom(1024))
+    return str(path)
+
+
+def test_failed_send_is_retried(tmp_path, http_stub):
+    http_stub.respond(500)
+    http_stub.respond(200)
+    pipeline = _pipeline(tmp_path, http_stub)
+
+    pipeline.deliver_report(_report(tmp_path), {'week': '2026-W42'})
+    assert pipeline.drain(10)
+    pipeline.stop()
+
+    assert len(http_stub.requests) == 2
+    assert 'W42' in json.loads(http_stub.requests[1]['body'])['text']
+    assert pipeline.outbox.pending() == [] and pipeline.outbox.failed_count() == 0
+
+
+def test_task_fails_after_max_attempts(tmp_path, http_stub):
+    for _ in range(3):
+        http_stub.respond(503)
+    pipeline = _pipeline(tmp_path, http_stub)
+
+    pipeline.deliver_report(_report(tmp_path), {'week': '2026-W42'})
+    assert pipeline.drain(10)
+    pipeline.stop()
+
+    assert len(http_stub.requests) == 3
+    failed = os.listdir(pipeline.outbox.failed_dir)
+    assert len(failed) == 1
+    with open(os.path.join(pipeline.outbox.failed_dir, failed[0]), encoding='utf-8') as f:
+        task = json.load(f)
+    assert task['attempts'] == 3 and '503' in task['last_error']
+
+
+def test_pending_tasks_resume_in_next_run(tmp_path, http_stub):
+    http_stub.respond(200)
+    outbox = Outbox(str(tmp_path / 'outbox'))
+    outbox.add('slack', 'report', report={'path': _report(tmp_path), 'week': '2026-W41', 'bytes': 1026})
+
+    pipeline = _pipeline(tmp_path, http_stub)
+    assert pipeline.drain(10)
+    pipeline.stop()
+
+    assert len(http_stub.requests) == 1
+    assert 'W41' in json.loads(http_stub.requests[0]['body'])['text']
+
+
+def test_claim_of_exited_process_is_requeued(tmp_path, http_stub):
+    http_stub.respond(200)
+    outbox = Outbox(str(tmp_path / 'outbox'))
+    task = outbox.add('slack', 'report', report={'path': _report(tmp_path), 'week': '2026-W40', 'bytes': 1026})
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True).stdout.strip()
+    os.rename(outbox._pending_path(task['id']),
+              os.path.join(outbox.inflight_dir, f"{task['id']}~{outbox._owner.split('~')[0]}~{exited}.json"))
+
+    pipeline = _pipeline(tmp_path, http_stub)
+    assert pipeline.drain(10)
+    pipeline.stop()
+
+    assert len(http_stub.requests) == 1
+    assert os.listdir(outbox.inflight_dir) == []
+
+
+def test_senders_sharing_an_outbox_send_each_task_once(tmp_path, http_stub):
+    outbox = Outbox(str(tmp_path / 'outbox'))
+    for week in range(1, 21):
+        http_stub.respond(200, delay=0.01)
+        outbox.add('slack', 'report', report={'path': _report(tmp_path), 'week': f"2026-W{week:02d}",
+                                              'bytes': 1026})
+
+    pipelines = [_pipeline(tmp_path, http_stub) for _ in range(2)]
+    for pipeline in pipelines:
+        pipeline.start()
+    for pipeline in pipelines:
+        assert pipeline.drain(20)
+        pipeline.stop()
+
+    weeks = sorted(json.loads(r['body'])['text'] for r in http_stub.requests)
+    assert len(weeks) == 20 and len(set(weeks)) == 20
+
+
+class _SmtpSink(socketserver.StreamRequestHandler):
+    messages = []
+
+    def handle(self):
+        self.wfile.write(b"220 stub\r\n")
+        for line in iter(self.rfile.readline, b''):
+            command = line.strip().upper()
+            if command == b'DATA':
+                self.wfile.write(b"354 go ahead\r\n")
+                message = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                self.messages.append(message)
+                self.wfile.write(b"250 queued\r\n")
+            elif command == b'QUIT':
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+@pytest.fixture
+def smtp_stub():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SmtpSink)
+    server.daemon_threads = True
+    _SmtpSink.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], _SmtpSink.messages
+    server.shutdown()
+    server.server_close()
+
+
+def test_email_carries_the_report(tmp_path, smtp_stub):
+    port, messages = smtp_stub
+    pipeline = DeliveryPipeline({'notifications': {
+        'outbox': str(tmp_path / 'outbox'),
+        'email': {'enabled': True, 'smtp_server': '127.0.0.1', 'smtp_port': port, 'starttls': False,
+                  'recipients': ['team@example.com'], 'timeout': 5},
+    }})
+
+    pipeline.deliver_report(_report(tmp_path), {'week': '2026-W42'})
+    assert pipeline.drain(10)
+    pipeline.stop()
+
+    assert len(messages) == 1
+    assert b'VLines_Weekly_Report_test.pptx' in messages[0]
+
+
+def test_expand_blanks_only_an_unset_variable_reference(monkeypatch):
+    monkeypatch.setenv('VLINES_TEST_TOKEN', 'abc')
+    monkeypatch.delenv('VLINES_UNSET', raising=False)
+
+    assert _expand('${VLINES_TEST_TOKEN}') == 'abc'
+    assert _expand('${VLINES_UNSET}') == ''
+    assert _expand('$ecretPass') == '$ecretPass'
+    assert _expand('pa${ss') == 'pa${ss'
+    assert _expand(None) == ''
@@ -0,0 +1,45 @@
+import os
+import stat
+import sys
+import zipfile
+
+from exporter import DeckExporter
+
+SOFFICE = """#!{python}
+import os, sys
+outdir = sys.argv[sys.argv.index('--outdir') + 1]
+stem = os.path.splitext(os.path.basename(sys.argv[-1]))[0]
+open(os.path.join(outdir, stem + '.pdf'), 'w').write('%PDF')
+"""
+
+PDFTOPPM = """#!{python}
+import sys
+for page in range(1, {pages} + 1):
+    open('%s-%0{width}d.png' % (sys.argv[-1], page), 'w').write(str(page))
+"""
+
+
+def _tool(directory, name, source):
+    path = directory / name
+    path.write_text(source.format(python=sys.executable, pages=120, width=3))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def test_png_pages_are_in_slide_order_past_99(tmp_path):
+    deck = tmp_path / 'Report.pptx'
+    with zipfile.ZipFile(deck, 'w') as z:
+        z.writestr('ppt/presentation.xml', '<p/>')
+    exporter = DeckExporter({'export': {
+        'directory': str(tmp_path / 'exports'),
+        'soffice': _tool(tmp_path, 'soffice', SOFFICE),
+        'pdftoppm': _tool(tmp_path, 'pdftoppm', PDFTOPPM),
+        'cache': {'directory': str(tmp_path / 'cache')},
+    }})
+
+    result = exporter.export(str(deck))
+
+    pages = [int(open(path).read()) for path in result['png']]
+    assert pages == list(range(1, 121))
+    assert os.path.basename(result['png'][0]) == 'slide-001.png'
+    assert sorted(os.listdir(os.path.dirname(result['png'][0])))[:2] == ['Report.pdf', 'slide-001.png']
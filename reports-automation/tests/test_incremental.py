@@ -0,0 +1,103 @@
+import copy
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+from data_fetcher import DataFetcher
+from generator import WeeklyReportGenerator
+from incremental import _collect_owned_parts, splice_slides
+
+
+@pytest.fixture
+def data():
+    return DataFetcher({'data_source': {'type': 'sample'}})._get_sample_data()
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def _owned(path, partname):
+    with zipfile.ZipFile(path) as z:
+        owned = set()
+        _collect_owned_parts(z, set(z.namelist()), partname, owned, top=True)
+    return owned
+
+
+def _render(config, data):
+    generator = WeeklyReportGenerator(config)
+    path = generator.generate_report(copy.deepcopy(data))
+    return path, generator.last_render_summary
+
+
+def test_slide_owns_its_chart_and_workbook_not_its_layout(render_config, data):
+    path, _ = _render(render_config, data)
+
+    owned = _owned(path, 'ppt/slides/slide3.xml')
+
+    assert 'ppt/slides/_rels/slide3.xml.rels' in owned
+    assert any(name.startswith('ppt/charts/chart') and name.endswith('.xml') for name in owned)
+    assert any(name.startswith('ppt/embeddings/') for name in owned)
+    assert not any(name.startswith(('ppt/slideLayouts/', 'ppt/slideMasters/')) for name in owned)
+
+
+def test_unchanged_slides_are_copied_byte_for_byte(render_config, data):
+    path, _ = _render(render_config, data)
+    before = _parts(path)
+    changed = copy.deepcopy(data)
+    changed['tckt']['overview']['receivables']['total'] = 99
+
+    path, summary = _render(render_config, changed)
+    after = _parts(path)
+
+    assert summary['mode'] == 'incremental'
+    assert (summary['rebuilt_slides'], summary['copied_slides']) == (1, 3)
+    copied = set()
+    for slide in ('slide1.xml', 'slide2.xml', 'slide3.xml'):
+        copied |= _owned(path, f"ppt/slides/{slide}")
+    assert any(name.startswith('ppt/charts/') for name in copied)
+    assert {name: after[name] for name in copied} == {name: before[name] for name in copied}
+    assert after['ppt/slides/slide4.xml'] != before['ppt/slides/slide4.xml']
+
+    prs = Presentation(path)
+    assert prs.slides[3].shapes.title.text == 'Receivables 99'
+    chart = next(shape for shape in prs.slides[2].shapes if shape.has_chart).chart
+    assert list(chart.plots[0].categories) == data['kinh_doanh']['domestic_performance']['weeks']
+
+
+def test_splice_takes_copied_slides_from_the_previous_deck(tmp_path, render_config, data):
+    previous, _ = _render(render_config, data)
+    changed = copy.deepcopy(data)
+    changed['kinh_doanh']['domestic_performance']['actual'] = [1] * len(changed['kinh_doanh']['domestic_performance']['weeks'])
+    render_config['output'].update(incremental=False, directory=str(tmp_path / 'full'))
+    current, _ = _render(render_config, changed)
+    old, new = _parts(previous), _parts(current)
+    chart_parts = {name for name in _owned(previous, 'ppt/slides/slide3.xml') if name.startswith('ppt/charts/')}
+    assert any(new[name] != old[name] for name in chart_parts)
+
+    with open(current, 'rb') as f:
+        merged_path = tmp_path / 'merged.pptx'
+        merged_path.write_bytes(splice_slides(f.read(), previous, ['/ppt/slides/slide3.xml']))
+    merged = _parts(merged_path)
+
+    assert all(merged[name] == old[name] for name in chart_parts)
+    assert merged['ppt/slides/slide4.xml'] == new['ppt/slides/slide4.xml']
+    assert set(merged) == set(new)
+    assert len(Presentation(str(merged_path)).slides) == 4
+
+
+def test_pagination_change_falls_back_to_full_render(render_config, data):
+    _render(render_config, data)
+    more_ships = copy.deepcopy(data)
+    more_ships['ops']['ship_schedule'] *= 2  # 6 rows over 2 slides
+
+    path, summary = _render(render_config, more_ships)
+
+    assert summary['mode'] == 'full'
+    assert summary['rebuilt_slides'] == 5
+    assert len(Presentation(path).slides) == 5
+
+    _, summary = _render(render_config, more_ships)
+    assert summary['mode'] == 'incremental'
@@ -0,0 +1,33 @@
+import tracemalloc
+
+from instrumentation import span
+
+
+def test_outer_span_keeps_peak_from_before_nested_span():
+    tracemalloc.start()
+    try:
+        with span('outer') as outer:
+            block = bytearray(8 * 1024 * 1024)
+            del block
+            with span('inner') as inner:
+                small = bytearray(1024)
+                del small
+    finally:
+        tracemalloc.stop()
+
+    assert inner['py_peak_mb'] < 1
+    assert outer['py_peak_mb'] >= 8
+
+
+def test_outer_span_includes_nested_peak():
+    tracemalloc.start()
+    try:
+        with span('outer') as outer:
+            with span('inner') as inner:
+                block = bytearray(8 * 1024 * 1024)
+                del block
+    finally:
+        tracemalloc.stop()
+
+    assert inner['py_peak_mb'] >= 8
+    assert outer['py_peak_mb'] >= 8
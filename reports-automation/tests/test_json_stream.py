@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+import json_stream
+from json_stream import load_sections
+
+
+DOCUMENT = {
+    'metadata': {'week': '2026-W41'},
+    'ops': {'speeds': [12.5, -0.25, 1e3, 6.02e-23, -17, 0], 'ratio': 3.14159},
+    'tckt': {'total': 112282563.75, 'flags': [True, False, None]},
+}
+
+
+@pytest.mark.parametrize('chunk', range(1, 24))
+@pytest.mark.parametrize('use_mmap', [True, False])
+def test_numbers_split_across_chunks(tmp_path, monkeypatch, chunk, use_mmap):
+    path = tmp_path / 'weekly_data.json'
+    path.write_text(json.dumps(DOCUMENT), encoding='utf-8')
+    monkeypatch.setattr(json_stream._Reader, 'CHUNK', chunk)
+
+    assert load_sections(str(path), use_mmap=use_mmap) == DOCUMENT
+
+
+def test_skipped_sections_are_not_returned(tmp_path):
+    path = tmp_path / 'weekly_data.json'
+    path.write_text(json.dumps(DOCUMENT), encoding='utf-8')
+
+    assert load_sections(str(path), ['metadata', 'tckt']) == {
+        'metadata': DOCUMENT['metadata'], 'tckt': DOCUMENT['tckt']}
@@ -0,0 +1,85 @@
+import copy
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from data_fetcher import DataFetcher
+from generator import WeeklyReportGenerator
+
+
+def _template(path, text):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_textbox(Inches(1), Inches(1), Inches(6), Inches(1)).text_frame.text = text
+    prs.save(str(path))
+    return str(path)
+
+
+def _config(tmp_path, template, pattern):
+    return {
+        'data_source': {'type': 'sample'},
+        'template': {'path': template, 'placeholders': {'report_date': '{{REPORT_DATE}}',
+                                                        'report_week': '{{REPORT_WEEK}}'}},
+        'output': {'directory': str(tmp_path / 'reports'), 'filename_pattern': pattern,
+                   'catalog': {'enabled': True, 'path': str(tmp_path / 'outputs.db')}},
+    }
+
+
+def _render_on(monkeypatch, config, data, day):
+    monkeypatch.setattr(WeeklyReportGenerator, '_rendered_values',
+                        staticmethod(lambda: {'report_date': day, 'generated_date': f"{day} 09:00"}))
+    generator = WeeklyReportGenerator(config)
+    path = generator.generate_report(copy.deepcopy(data))
+    return path, generator.last_render_summary['mode']
+
+
+@pytest.fixture
+def data():
+    return DataFetcher({'data_source': {'type': 'sample'}})._get_sample_data()
+
+
+def test_identical_render_is_skipped(tmp_path, monkeypatch, data):
+    config = _config(tmp_path, _template(tmp_path / 't.pptx', 'Week {{REPORT_WEEK}}'), 'R_{week}.pptx')
+
+    first, _ = _render_on(monkeypatch, config, data, '2026-10-19')
+    second, mode = _render_on(monkeypatch, config, data, '2026-10-19')
+
+    assert (second, mode) == (first, 'duplicate')
+
+
+def test_shown_date_change_renders_again(tmp_path, monkeypatch, data):
+    config = _config(tmp_path, _template(tmp_path / 't.pptx', 'As of {{REPORT_DATE}}'), 'R_{week}.pptx')
+
+    _render_on(monkeypatch, config, data, '2026-10-19')
+    path, mode = _render_on(monkeypatch, config, data, '2026-10-20')
+
+    assert mode != 'duplicate'
+    texts = [shape.text_frame.text for shape in Presentation(path).slides[0].shapes]
+    assert texts == ['As of 2026-10-20']
+
+
+def test_new_output_path_renders_again(tmp_path, monkeypatch, data):
+    config = _config(tmp_path, _template(tmp_path / 't.pptx', 'Week {{REPORT_WEEK}}'), 'R_{week}.pptx')
+    moved = copy.deepcopy(config)
+    moved['output']['directory'] = str(tmp_path / 'archive')
+
+    first, _ = _render_on(monkeypatch, config, data, '2026-10-19')
+    second, mode = _render_on(monkeypatch, moved, data, '2026-10-19')
+
+    assert mode != 'duplicate'
+    assert second != first
+
+
+def test_render_after_pagination_change_is_recognized(tmp_path, monkeypatch, data, render_config):
+    render_config['output']['catalog'] = {'enabled': True, 'path': str(tmp_path / 'outputs.db')}
+    more_ships = copy.deepcopy(data)
+    more_ships['ops']['ship_schedule'] *= 2  # 6 rows: a continuation slide
+
+    _render_on(monkeypatch, render_config, data, '2026-10-19')
+    generator = WeeklyReportGenerator(render_config)
+    first = generator.generate_report(more_ships)
+    assert 'metrics' not in more_ships
+    second, mode = _render_on(monkeypatch, render_config, more_ships, '2026-10-19')
+
+    assert (second, mode) == (first, 'duplicate')
@@ -0,0 +1,63 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from render_server import RenderService, create_server
+
+
+@pytest.fixture
+def render_url(tmp_path):
+    config = {
+        'data_source': {'type': 'sample'},
+        'template': {'path': str(tmp_path / 'missing.pptx')},
+        'output': {'directory': str(tmp_path / 'reports'), 'filename_pattern': 'Report_{week}.pptx',
+                   'catalog': {'enabled': True, 'path': str(tmp_path / 'outputs.db')}},
+    }
+    server = create_server(RenderService(config), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://{}:{}/render'.format(*server.server_address[:2])
+    server.shutdown()
+    server.server_close()
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+@pytest.mark.parametrize('payload', [
+    {'data_source': {'type': 'json', 'json_path': '/etc/passwd'}},
+    {'data_source': {'type': 'api', 'url': 'http://169.254.169.254/'}},
+    {'data_source': {'cache': {'directory': '/tmp'}}},
+    {'name': '../../outside'},
+    {'metadata': {'week': '../2025-W40'}},
+])
+def test_unsafe_overrides_are_refused(render_url, payload):
+    status, _, body = _post(render_url, payload)
+
+    assert status == 400
+    assert 'error' in json.loads(body)
+
+
+def test_render_with_configured_source(render_url):
+    status, headers, body = _post(render_url, {'name': 'north'})
+
+    assert status == 200
+    assert body[:2] == b'PK'
+    assert 'north' in headers['Content-Disposition']
+
+
+def test_renders_are_not_catalogued(tmp_path, render_url):
+    for _ in range(2):
+        status, _, body = _post(render_url, {})
+        assert status == 200 and body[:2] == b'PK'
+
+    assert not (tmp_path / 'outputs.db').exists()
@@ -0,0 +1,125 @@
+import math
+import os
+import sqlite3
+from array import array
+
+import pytest
+
+from data_fetcher import DataFetcher
+from generator import WeeklyReportGenerator
+from report_model import ReportValidationError, parse_report, validate_report
+
+
+@pytest.fixture
+def data():
+    return DataFetcher({'data_source': {'type': 'sample'}})._get_sample_data()
+
+
+def test_sample_data_is_valid(data):
+    _, errors = parse_report(data)
+
+    assert errors == []
+
+
+def test_every_error_is_collected(data):
+    data['tckt']['overview']['receivables']['total'] = 'n/a'
+    del data['tckt']['overview']['receivables']['overdue']
+    data['ops']['ship_schedule'][1] = 'BD Mariner'
+    data['eqc'] = []
+
+    report, errors = parse_report(data)
+
+    assert errors == [
+        'data.tckt.overview.receivables.total: expected a number, got text',
+        'data.tckt.overview.receivables.overdue: missing',
+        'data.ops.ship_schedule[1]: expected an object, got text',
+        'data.eqc: expected an object, got list',
+    ]
+    assert report.tckt.overview.receivables.total is None
+    assert report.ops.ship_schedule[0].ship_name == data['ops']['ship_schedule'][0]['ship_name']
+    with pytest.raises(ReportValidationError) as raised:
+        validate_report(data)
+    assert raised.value.errors == errors
+
+
+def test_columns_must_have_equal_length(data):
+    block = data['kinh_doanh']['domestic_performance']
+    block['actual'] = block['actual'][:-1]
+
+    _, errors = parse_report(data)
+
+    assert len(errors) == 1
+    assert errors[0].startswith('data.kinh_doanh.domestic_performance: columns differ in length')
+    assert f"actual={len(block['weeks']) - 1}" in errors[0]
+
+
+def test_series_are_float_arrays(data):
+    data['kinh_doanh']['domestic_performance']['actual'][0] = None
+
+    report, _ = parse_report(data)
+    actual = report.kinh_doanh.domestic_performance.actual
+
+    assert isinstance(actual, array) and actual.typecode == 'd'
+    assert math.isnan(actual[0])
+    assert list(actual[1:]) == [float(v) for v in data['kinh_doanh']['domestic_performance']['actual'][1:]]
+    assert isinstance(report.kinh_doanh.domestic_performance.weeks, tuple)
+
+
+def test_required_sections(data):
+    del data['ops']
+
+    _, errors = parse_report(data, ['metadata', 'ops'])
+
+    assert errors == ['data.ops: missing']
+
+
+def test_disabled_validation_renders_anyway(tmp_path, data, capsys):
+    data['tckt']['overview']['receivables']['total'] = 'n/a'
+    config = {
+        'template': {'path': str(tmp_path / 'missing.pptx')},
+        'output': {'directory': str(tmp_path / 'reports'), 'filename_pattern': 'Report_{week}.pptx'},
+    }
+
+    with pytest.raises(ReportValidationError):
+        WeeklyReportGenerator(config).generate_report(data)
+
+    config['validation'] = {'enabled': False}
+    path = WeeklyReportGenerator(config).generate_report(data)
+
+    assert os.path.exists(path)
+    assert 'data.tckt.overview.receivables.total: expected a number, got text' in capsys.readouterr().out
+
+
+def test_database_example_data_validates(tmp_path):
+    # The queries of the database example in config.yaml, on SQLite
+    db_path = str(tmp_path / 'vlines.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript("""
+            CREATE TABLE voyages (ship_name, voyage, route, position, speed_sb_nb, weather,
+                                  days_notes, status, actual_ports, report_week);
+            CREATE TABLE bookings (voyage_week, allocated_teu, actual_teu, etd);
+            CREATE TABLE receivables_summary (total, within_term, overdue, report_week);
+            INSERT INTO voyages VALUES ('BD Star', 'BS2527', 'NSS', '', '11.2', '', '', '', '', '2025-W40');
+            INSERT INTO bookings VALUES ('W40', 500, 430, '2025-10-01');
+            INSERT INTO receivables_summary VALUES (112282563, 107816808, 3465756, '2025-W40');
+        """)
+    fetcher = DataFetcher({'data_source': {'type': 'database', 'database': {
+        'driver': 'sqlite', 'path': db_path, 'queries': {
+            'ops.ship_schedule': "SELECT ship_name, voyage, route, position, speed_sb_nb, weather, "
+                                 "days_notes, status, actual_ports FROM voyages WHERE report_week = :week",
+            'kinh_doanh.domestic_performance': {
+                'sql': "SELECT voyage_week AS weeks, allocated_teu AS allocated, actual_teu AS actual "
+                       "FROM bookings WHERE etd BETWEEN :week_start AND :week_end",
+                'shape': 'group_sum'},
+            'tckt.overview.receivables': "SELECT total, within_term, overdue FROM receivables_summary "
+                                         "WHERE report_week = :week",
+        }}}})
+    fetcher._get_current_week = lambda: '2025-W40'
+
+    data = fetcher.fetch_data()
+    fetcher.close()
+    report = validate_report(data)
+
+    assert report.kinh_doanh.domestic_performance.percentage is None
+    assert report.tckt.overview.payables is None
+    assert report.ops.ship_schedule[0].ship_name == 'BD Star'
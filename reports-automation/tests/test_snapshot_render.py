@@ -0,0 +1,35 @@
+import copy
+import os
+from datetime import datetime
+
+from data_fetcher import DataFetcher
+from generator import WeeklyReportGenerator
+
+
+def _config(tmp_path, **data_source):
+    return {
+        'data_source': data_source,
+        'snapshots': {'enabled': True, 'path': str(tmp_path / 'snapshots.db')},
+        'template': {'path': str(tmp_path / 'missing.pptx')},
+        'output': {'directory': str(tmp_path / 'reports'),
+                   'filename_pattern': 'VLines_Weekly_Report_{date}.pptx'},
+    }
+
+
+def test_backfill_is_named_after_its_week(tmp_path):
+    live = DataFetcher(_config(tmp_path, type='sample'))
+    data = live._get_sample_data()
+    data['metadata']['week'] = '2025-W40'
+    live._get_snapshot_store().save(data)
+    live.close()
+
+    fetcher = DataFetcher(_config(tmp_path, type='snapshot', week='2025-W40'))
+    backfill = fetcher.fetch_data()
+    fetcher.close()
+    generator = WeeklyReportGenerator(_config(tmp_path, type='snapshot'))
+
+    backfill_path = generator._get_output_path(backfill)
+    today_path = generator._get_output_path(copy.deepcopy(data))
+
+    assert os.path.basename(backfill_path) == 'VLines_Weekly_Report_2025-09-29.pptx'
+    assert os.path.basename(today_path) == f"VLines_Weekly_Report_{datetime.now():%Y-%m-%d}.pptx"
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+import bench_startup  # noqa: E402
+
+
+@pytest.mark.parametrize('command', sorted(bench_startup.CASES))
+def test_command_imports_only_what_it_needs(tmp_path, command):
+    config_path = bench_startup.write_config(str(tmp_path))
+    baseline = bench_startup.run_case([], None, str(tmp_path))
+
+    result = bench_startup.measure(command, 1, config_path, str(tmp_path), baseline)
+
+    assert result['forbidden'] == []
+
+
+def test_profiled_render_exit_status_reflects_the_job(tmp_path):
+    template = tmp_path / 'broken.pptx'
+    template.write_bytes(b'not a presentation')
+    config = tmp_path / 'config.yaml'
+    config.write_text(json.dumps({
+        'data_source': {'type': 'sample'},
+        'template': {'path': str(template)},
+        'output': {'directory': str(tmp_path / 'reports')},
+        'logging': {'file': str(tmp_path / 'logs' / 'run.log')},
+    }), encoding='utf-8')
+
+    proc = subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'scripts', 'scheduler.py'),
+                           '--config', str(config), 'render', '--profile'],
+                          cwd=str(tmp_path), capture_output=True, text=True, timeout=120)
+
+    assert proc.returncode == 1, proc.stdout + proc.stderr
+    assert 'Profile report written to' in proc.stdout
@@ -0,0 +1,96 @@
+from lxml import etree
+from pptx import Presentation
+from pptx.oxml.ns import qn
+
+from conftest import SHIP_COLUMNS, build_report_template
+from table_binding import TableBinding
+
+
+def _rows(count):
+    return [{'ship_name': f"Ship {i}", 'voyage': f"V{i:03d}", 'route': 'HPH-HCM', 'status': None}
+            for i in range(count)]
+
+
+def _table_texts(prs, slide_index):
+    frame = next(shape for shape in prs.slides[slide_index].shapes if shape.has_table)
+    return [[cell.text for cell in row.cells] for row in frame.table.rows]
+
+
+def _template(tmp_path):
+    return Presentation(build_report_template(tmp_path / 'template.pptx'))
+
+
+def test_rows_are_written_below_the_header(tmp_path):
+    prs = _template(tmp_path)
+    rows = _rows(5)
+    rows[0]['status'] = 'Delayed <2 days> & waiting'
+
+    result = TableBinding('ShipScheduleTable', SHIP_COLUMNS).fill(prs, rows)
+
+    assert result == {'rows': 5, 'slides': 1}
+    texts = _table_texts(prs, 1)
+    assert texts[0] == SHIP_COLUMNS
+    assert texts[1] == ['Ship 0', 'V000', 'HPH-HCM', 'Delayed <2 days> & waiting']
+    assert texts[1:] == [[str(row['ship_name']), row['voyage'], row['route'], row['status'] or '']
+                         for row in rows]
+
+
+def test_rows_keep_the_prototype_formatting(tmp_path):
+    prs = _template(tmp_path)
+
+    TableBinding('ShipScheduleTable', SHIP_COLUMNS).fill(prs, _rows(3))
+
+    frame = next(shape for shape in prs.slides[1].shapes if shape.has_table)
+    header, *data_rows = frame.table._tbl.tr_lst
+    assert all(r.get('b') is None for r in header.iter(qn('a:rPr')))
+    for tr in data_rows:
+        for tc in tr.findall(qn('a:tc')):
+            runs = tc.findall(f".//{qn('a:r')}")
+            assert len(runs) == 1
+            props = runs[0].find(qn('a:rPr'))
+            assert (props.get('b'), props.get('sz')) == ('1', '1100')
+
+
+def test_bulk_fill_matches_cell_by_cell_fill(tmp_path):
+    bulk, cellwise = _template(tmp_path), _template(tmp_path)
+    binding = TableBinding('ShipScheduleTable', SHIP_COLUMNS)
+
+    binding.fill(bulk, _rows(20))
+    binding.fill_cellwise(cellwise, _rows(20))
+
+    def tbl(prs):
+        frame = next(shape for shape in prs.slides[1].shapes if shape.has_table)
+        return etree.tostring(frame.table._tbl, method='c14n')
+
+    assert tbl(bulk) == tbl(cellwise)
+
+
+def test_rows_beyond_capacity_go_onto_continuation_slides(tmp_path):
+    prs = _template(tmp_path)
+
+    result = TableBinding('ShipScheduleTable', SHIP_COLUMNS, rows_per_slide=3).fill(prs, _rows(7))
+
+    assert result == {'rows': 7, 'slides': 3}
+    titles = [slide.shapes.title.text for slide in prs.slides]
+    assert titles == ['Week {{REPORT_WEEK}}', 'Ship schedule', 'Ship schedule', 'Ship schedule',
+                      'Domestic performance', 'Receivables {{TOTAL_RECEIVABLES}}']
+    pages = [[row[0] for row in _table_texts(prs, i)[1:]] for i in (1, 2, 3)]
+    assert pages == [['Ship 0', 'Ship 1', 'Ship 2'], ['Ship 3', 'Ship 4', 'Ship 5'], ['Ship 6']]
+
+
+def test_rows_that_fit_use_no_continuation_slide(tmp_path):
+    prs = _template(tmp_path)
+
+    result = TableBinding('ShipScheduleTable', SHIP_COLUMNS, rows_per_slide=3).fill(prs, _rows(3))
+
+    assert result == {'rows': 3, 'slides': 1}
+    assert len(prs.slides) == 4
+
+
+def test_no_rows_leaves_only_the_header(tmp_path):
+    prs = _template(tmp_path)
+
+    result = TableBinding('ShipScheduleTable', SHIP_COLUMNS, rows_per_slide=3).fill(prs, [])
+
+    assert result == {'rows': 0, 'slides': 1}
+    assert _table_texts(prs, 1) == [SHIP_COLUMNS]
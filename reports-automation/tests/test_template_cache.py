@@ -0,0 +1,90 @@
+import io
+import os
+import zipfile
+
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from template_cache import TemplateCache
+
+PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082')
+
+
+def _template(path, title='{{REPORT_DATE}}'):
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = title
+    chart_data = CategoryChartData()
+    chart_data.categories = ['W1', 'W2']
+    chart_data.add_series('Volume', (1, 2))
+    slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(1), Inches(1), Inches(4), Inches(3), chart_data)
+    slide.shapes.add_picture(io.BytesIO(PNG), Inches(6), Inches(1))
+    prs.save(path)
+    return str(path)
+
+
+def _package(prs):
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    with zipfile.ZipFile(buffer) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def test_hit_returns_an_identical_independent_copy(tmp_path):
+    path = _template(tmp_path / 'a.pptx')
+    cache = TemplateCache()
+
+    first, index = cache.load(path)
+    second, _ = cache.load(path)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert index.names == ['REPORT_DATE']
+    assert _package(second) == _package(Presentation(path))
+    first.slides[0].shapes.title.text = 'changed'
+    first.slides.add_slide(first.slide_layouts[0])
+    third, _ = cache.load(path)
+    assert third.slides[0].shapes.title.text == '{{REPORT_DATE}}'
+    assert len(third.slides) == 1
+
+
+def test_least_recently_used_template_is_evicted(tmp_path):
+    a, b, c = (_template(tmp_path / f"{name}.pptx") for name in 'abc')
+    cache = TemplateCache(max_entries=2)
+
+    cache.load(a)
+    cache.load(b)
+    cache.load(a)
+    cache.load(c)  # evicts b
+    cache.load(a)
+    cache.load(b)
+
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.stats()['entries'] == 2
+
+
+def test_changed_file_is_loaded_again(tmp_path):
+    path = _template(tmp_path / 'a.pptx')
+    cache = TemplateCache()
+    cache.load(path)
+
+    _template(tmp_path / 'a.pptx', title='{{WEEK_NUMBER}}')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    prs, index = cache.load(path)
+
+    assert cache.misses == 2
+    assert index.names == ['WEEK_NUMBER']
+    assert prs.slides[0].shapes.title.text == '{{WEEK_NUMBER}}'
+
+
+def test_index_does_not_count_hits(tmp_path):
+    path = _template(tmp_path / 'a.pptx')
+    cache = TemplateCache()
+
+    cache.index(path)
+    cache.index(path)
+
+    assert (cache.hits, cache.misses) == (0, 1)